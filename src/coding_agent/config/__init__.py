@@ -25,6 +25,7 @@ from coding_agent.config.config import (
     set_runtime_config,
 )
 from coding_agent.config.project_instructions import (
+    clear_git_root_cache,
     find_git_root,
     find_project_instructions,
     get_agent_docs_dir,
@@ -43,4 +44,4 @@ from coding_agent.config.skills import (
     parse_skills,
     parse_yaml_frontmatter,
 )
-from coding_agent.config.utils import truncate_output
+from coding_agent.config.utils import json_dumps_bytes, json_loads, truncate_output
@@ -1,5 +1,8 @@
 """Configuration management - Pydantic model with YAML loading and CLI overrides."""
 
+import os
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -20,6 +23,11 @@ class ModelCapabilities:
 
 
 _model_capabilities_cache: dict[str, ModelCapabilities] = {}
+_model_capabilities_ts: dict[str, float] = {}
+_model_capabilities_loaded = False
+_model_capabilities_lock = threading.Lock()
+
+_CAPABILITIES_TTL_SECONDS = 30 * 24 * 60 * 60
 
 
 @dataclass
@@ -34,13 +42,20 @@ class RuntimeConfig:
 
 
 def get_model_capabilities(model: str) -> ModelCapabilities | None:
-    """Get cached model capabilities."""
+    """Get cached model capabilities, loading the on-disk cache on first use."""
+    if not _model_capabilities_loaded:
+        load_model_capabilities_cache()
     return _model_capabilities_cache.get(model)
 
 
 def set_model_capabilities(model: str, caps: ModelCapabilities) -> None:
-    """Cache model capabilities."""
-    _model_capabilities_cache[model] = caps
+    """Cache model capabilities in memory and persist them to disk."""
+    if not _model_capabilities_loaded:
+        load_model_capabilities_cache()
+    with _model_capabilities_lock:
+        _model_capabilities_cache[model] = caps
+        _model_capabilities_ts[model] = time.time()
+        save_model_capabilities_cache()
 
 
 def get_docs_dir(cwd: Path | None = None) -> Path:
@@ -335,7 +350,12 @@ def apply_cli_overrides(
         return config
 
     try:
-        return AgentConfig.model_validate(config.model_dump() | overrides)
+        # Shallow-copy and validate only the overridden fields, rather than
+        # dumping and re-validating the whole model (including the skills list).
+        updated = config.model_copy()
+        for name, value in overrides.items():
+            AgentConfig.__pydantic_validator__.validate_assignment(updated, name, value)
+        return updated
     except ValidationError as e:
         errors = []
         for err in e.errors():
@@ -427,33 +447,55 @@ def _capabilities_cache_path() -> Path:
 
 
 def save_model_capabilities_cache() -> None:
-    """Persist model capabilities cache to disk."""
+    """Persist model capabilities cache to disk.
+
+    The file is written to a temporary sibling and renamed into place so a
+    concurrent reader never sees a partial file. Write failures are ignored;
+    the cache only saves a probe request.
+    """
     if not _model_capabilities_cache:
         return
     cache_path = _capabilities_cache_path()
-    DEFAULT_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     import json
+    now = time.time()
     data = {
-        model: {"temperature_supported": caps.temperature_supported, "top_p_supported": caps.top_p_supported}
+        model: {
+            "temperature_supported": caps.temperature_supported,
+            "top_p_supported": caps.top_p_supported,
+            "ts": _model_capabilities_ts.get(model, now),
+        }
         for model, caps in _model_capabilities_cache.items()
     }
-    cache_path.write_text(json.dumps(data), encoding="utf-8")
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
 
 
 def load_model_capabilities_cache() -> None:
-    """Load model capabilities cache from disk."""
+    """Load model capabilities cache from disk, skipping entries older than 30 days."""
+    global _model_capabilities_loaded
+    _model_capabilities_loaded = True
     cache_path = _capabilities_cache_path()
     if not cache_path.exists():
         return
     import json
+    cutoff = time.time() - _CAPABILITIES_TTL_SECONDS
     try:
         data = json.loads(cache_path.read_text(encoding="utf-8"))
         for model, caps in data.items():
+            ts = caps.get("ts", 0)
+            if ts < cutoff or model in _model_capabilities_cache:
+                continue
             _model_capabilities_cache[model] = ModelCapabilities(
                 temperature_supported=caps.get("temperature_supported", False),
                 top_p_supported=caps.get("top_p_supported", False),
             )
-    except (json.JSONDecodeError, OSError):
+            _model_capabilities_ts[model] = ts
+    except (json.JSONDecodeError, OSError, AttributeError, TypeError):
         pass
 
 
@@ -1,5 +1,7 @@
 """Project instructions loader for AGENTS.md and CLAUDE.md files."""
 
+import os
+import stat
 from pathlib import Path
 
 from coding_agent.config.config import get_docs_dir
@@ -17,6 +19,16 @@ def get_agent_docs_dir(cwd: Path | None = None) -> Path:
     return get_docs_dir(cwd) / "agent"
 
 
+# resolved start path -> git root, for lookups that found one.
+_git_root_cache: dict[str, Path] = {}
+_GIT_ROOT_CACHE_SIZE = 32
+
+
+def clear_git_root_cache() -> None:
+    """Forget all cached git root lookups."""
+    _git_root_cache.clear()
+
+
 def find_git_root(start_path: Path | None = None) -> Path | None:
     """Find the git root directory by scanning upward for .git folder.
     
@@ -26,20 +38,66 @@ def find_git_root(start_path: Path | None = None) -> Path | None:
     Returns:
         Path to git root or None if not found.
     """
-    if start_path is None:
-        start_path = Path.cwd()
-    
-    current = start_path.resolve()
-    
+    start = os.getcwd() if start_path is None else start_path
+    resolved = os.path.realpath(start)
+    root = _git_root_cache.get(resolved)
+    if root is None:
+        root = _walk_to_git_root(resolved)
+        # Only hits are cached: a directory without a repo may gain one later
+        # in the session (``git init``), and that must be picked up.
+        if root is not None:
+            if len(_git_root_cache) >= _GIT_ROOT_CACHE_SIZE:
+                del _git_root_cache[next(iter(_git_root_cache))]
+            _git_root_cache[resolved] = root
+    return root
+
+
+def _walk_to_git_root(resolved: str) -> Path | None:
+    """Walk upward from an already-resolved path looking for a .git folder."""
+    current = resolved
+    
+    # Plain string ops per hop; a Path is only built for the result.
     while True:
-        if (current / ".git").is_dir():
-            return current
-        parent = current.parent
+        if os.path.isdir(os.path.join(current, ".git")):
+            return Path(current)
+        parent = os.path.dirname(current)
         if parent == current:
-            break
+            return None
         current = parent
+
+
+# file path -> ((mtime_ns, size), content) for project and global instruction files.
+_instructions_cache: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def _read_instructions_file(file_path: str) -> str | None:
+    """Read an instructions file, reusing the cached content while unchanged.
+    
+    Args:
+        file_path: Candidate instructions file as a plain string path.
+        
+    Returns:
+        File content, or None if it is missing or unreadable.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _instructions_cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
     
-    return None
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        return None
+    _instructions_cache[file_path] = (signature, content)
+    return content
 
 
 def find_project_instructions(start_path: Path | None = None) -> tuple[Path | None, str | None]:
@@ -54,24 +112,17 @@ def find_project_instructions(start_path: Path | None = None) -> tuple[Path | No
     Returns:
         Tuple of (file_path, instructions_content) or (None, None) if not found.
     """
-    if start_path is None:
-        start_path = Path.cwd()
-    
     git_root = find_git_root(start_path)
     
     if git_root is None:
         return None, None
     
-    candidates = ["AGENTS.md", "CLAUDE.md"]
-    
-    for candidate in candidates:
-        file_path = git_root / candidate
-        if file_path.is_file():
-            try:
-                content = file_path.read_text(encoding="utf-8")
-                return file_path, content
-            except OSError:
-                continue
+    root = os.fspath(git_root)
+    for candidate in ("AGENTS.md", "CLAUDE.md"):
+        file_path = os.path.join(root, candidate)
+        content = _read_instructions_file(file_path)
+        if content is not None:
+            return Path(file_path), content
     
     return None, None
 
@@ -82,14 +133,7 @@ def load_global_instructions() -> str | None:
     Returns:
         Content of global instructions file or None if not found.
     """
-    global_path = get_global_instructions_path()
-    if global_path.is_file():
-        try:
-            return global_path.read_text(encoding="utf-8")
-        except OSError:
-            pass
-    
-    return None
+    return _read_instructions_file(os.fspath(get_global_instructions_path()))
 
 
 def get_enhanced_system_prompt(default_prompt: str) -> tuple[str, list[str]]:
@@ -104,24 +148,29 @@ def get_enhanced_system_prompt(default_prompt: str) -> tuple[str, list[str]]:
         Tuple of (enhanced_prompt, list of loaded file paths for logging).
     """
     loaded_files: list[str] = []
-    parts: list[str] = [default_prompt]
     
     project_path, project_content = find_project_instructions()
+    global_content = load_global_instructions()
+    agent_docs = load_agent_docs()
+    
+    # Sections are appended in display order and joined once.
+    parts: list[str] = []
+    if agent_docs:
+        parts.append(f"# Agent Documentation\n\n{agent_docs}")
+    if global_content:
+        parts.append(f"# Global Instructions\n\n{global_content}")
     if project_path and project_content:
-        parts.insert(0, f"\n\n# Project Instructions\n\n{project_content}")
-        loaded_files.append(str(project_path))
+        parts.append(f"# Project Instructions\n\n{project_content}")
+    parts.append(default_prompt)
     
-    global_content = load_global_instructions()
+    if project_path and project_content:
+        loaded_files.append(str(project_path))
     if global_content:
-        parts.insert(0, f"\n\n# Global Instructions\n\n{global_content}")
         loaded_files.append(str(get_global_instructions_path()))
-    
-    agent_docs = load_agent_docs()
     if agent_docs:
-        parts.insert(0, f"\n\n# Agent Documentation\n\n{agent_docs}")
         loaded_files.append(str(get_agent_docs_dir()))
     
-    enhanced = "\n".join(parts)
+    enhanced = "\n\n".join(parts)
     return enhanced, loaded_files
 
 
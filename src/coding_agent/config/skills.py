@@ -3,6 +3,13 @@
 from dataclasses import dataclass, field
 from pathlib import Path
 
+import yaml
+
+try:
+    from yaml import CBaseLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import BaseLoader as _YamlLoader
+
 from coding_agent.config.project_instructions import find_git_root
 
 DEFAULT_CONFIG_DIR = Path.home() / ".coding-agent"
@@ -33,6 +40,9 @@ class Skill:
     hooks: dict = field(default_factory=dict)
 
 
+_BOOL_KEYS = ("disable-model-invocation", "user-invocable")
+
+
 def _parse_bool(value: str) -> bool:
     """Parse a YAML boolean string."""
     return value.lower() in ("true", "yes", "1")
@@ -46,9 +56,59 @@ def _parse_list(value: str) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def _parse_frontmatter_lines(yaml_block: str) -> dict:
+    """Parse frontmatter as flat ``key: value`` lines, keeping values as written."""
+    frontmatter: dict = {}
+    for line in yaml_block.strip().splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip()
+            if key in _BOOL_KEYS:
+                frontmatter[key] = _parse_bool(value)
+            elif key == "allowed-tools":
+                frontmatter[key] = _parse_list(value)
+            else:
+                frontmatter[key] = value
+    return frontmatter
+
+
+def _has_nested_structure(yaml_block: str) -> bool:
+    """True if the block has indented or list-item lines a flat parse cannot represent."""
+    for line in yaml_block.splitlines():
+        if line.strip() and (line[0] in " \t" or line.startswith("-")):
+            return True
+    return False
+
+
+def _coerce_yaml_frontmatter(data: dict) -> dict:
+    """Coerce the control fields of YAML-loaded frontmatter; other values pass through."""
+    frontmatter: dict = {}
+    for key, value in data.items():
+        if key in _BOOL_KEYS:
+            frontmatter[key] = _parse_bool(value) if isinstance(value, str) else False
+        elif key == "allowed-tools":
+            if isinstance(value, list):
+                frontmatter[key] = [str(item) for item in value]
+            else:
+                frontmatter[key] = _parse_list(value if isinstance(value, str) else "")
+        elif key == "hooks":
+            frontmatter[key] = value if isinstance(value, dict) else {}
+        else:
+            frontmatter[key] = value
+    return frontmatter
+
+
 def parse_yaml_frontmatter(content: str) -> tuple[dict, str]:
     """Parse YAML frontmatter from SKILL.md content.
 
+    Flat ``key: value`` blocks, the usual SKILL.md form, are parsed line by
+    line with every value kept exactly as written (``#``, ``1.10``, ``on``
+    and quotes included). Blocks with nested structure (indented lines, such
+    as a block list or a ``hooks`` mapping) are loaded as YAML with the base
+    loader, so scalars stay strings and YAML's quoting and comment rules
+    apply. If such a block is not valid YAML, the line parser is used.
+
     Args:
         content: Raw SKILL.md file content.
 
@@ -63,17 +123,16 @@ def parse_yaml_frontmatter(content: str) -> tuple[dict, str]:
         if len(parts) >= 3:
             yaml_block = parts[1]
             remaining_content = parts[2]
-            for line in yaml_block.strip().splitlines():
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    if key in ("disable-model-invocation", "user-invocable"):
-                        frontmatter[key] = _parse_bool(value)
-                    elif key == "allowed-tools":
-                        frontmatter[key] = _parse_list(value)
-                    else:
-                        frontmatter[key] = value
+            data = None
+            if _has_nested_structure(yaml_block):
+                try:
+                    data = yaml.load(yaml_block, Loader=_YamlLoader)
+                except yaml.YAMLError:
+                    data = None
+            if isinstance(data, dict):
+                frontmatter = _coerce_yaml_frontmatter(data)
+            else:
+                frontmatter = _parse_frontmatter_lines(yaml_block)
 
     return frontmatter, remaining_content.strip()
 
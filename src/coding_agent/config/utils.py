@@ -1,5 +1,55 @@
 """Shared utilities - will be implemented as needed."""
 
+import json
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps_bytes(value, indent: bool) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, option=option)
+except ImportError:  # orjson is an optional speed-up
+    _loads = json.loads
+
+    def _dumps_bytes(value, indent: bool) -> bytes:
+        return json.dumps(value, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(data: str | bytes):
+    """Parse JSON, using orjson when it is installed.
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        The decoded Python value
+
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON (orjson's error
+            type subclasses it).
+    """
+    return _loads(data)
+
+
+def json_dumps_bytes(value, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed.
+
+    Args:
+        value: JSON-serializable value
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        The encoded JSON document
+
+    Raises:
+        TypeError: If the value contains something that is not JSON-serializable.
+    """
+    return _dumps_bytes(value, indent)
+
 
 def truncate_output(text: str, max_length: int = 30000) -> str:
     """Truncate output to max_length characters.
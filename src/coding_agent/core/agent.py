@@ -36,7 +36,7 @@ _log = logging.getLogger(__name__)
 from coding_agent.core.llm import ModelRejectionError
 from coding_agent.core.permissions import PermissionSystem
 from coding_agent.tools import execute_tool, get_openai_tools
-from coding_agent.config.utils import truncate_output
+from coding_agent.config.utils import json_loads, truncate_output
 
 
 class Agent:
@@ -73,7 +73,7 @@ class Agent:
     def _has_tool_messages(messages: list[dict]) -> bool:
         """Return True if messages contain any tool call or tool result entries."""
         return any(
-            m.get("role") == "tool" or (m.get("role") == "assistant" and m.get("tool_calls"))
+            m["role"] == "tool" or (m["role"] == "assistant" and m.get("tool_calls"))
             for m in messages
         )
 
@@ -245,7 +245,7 @@ class Agent:
         tool_id = tool_call.id
         
         try:
-            arguments = json.loads(tool_call.function.arguments)
+            arguments = json_loads(tool_call.function.arguments)
         except json.JSONDecodeError:
             error_msg = f"Invalid JSON in tool arguments: {tool_call.function.arguments}"
             self.conversation.add_message(
@@ -342,7 +342,7 @@ class Agent:
         if self.session_manager and self.session_data:
             if self._pre_save_hook:
                 self._pre_save_hook(self.session_data)
-            self.session_data["messages"] = self.conversation.get_messages()
+            self.session_data["messages"] = self.conversation.get_messages_copy()
             self.session_manager.save(self.session_data)
 
     def set_session(self, session_manager, session_data) -> None:
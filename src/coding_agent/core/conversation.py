@@ -1,38 +1,242 @@
 """Conversation management for LLM context."""
 
+import hashlib
 import json
 import logging
+import sys
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
 from typing import Any
 
-import litellm
-
 _log = logging.getLogger(__name__)
 
 _MAX_TOOL_OUTPUT_CHARS = 1000
+_MAX_INGEST_TOOL_OUTPUT_CHARS = 8000  # well under the tools' 30000-char truncate_output() limit
 _MAX_TOOL_RESULT_PREVIEW = 300
 _TOOL_CALL_TOKEN_OVERHEAD = 50
-_CHARS_PER_TOKEN = 4  # rough heuristic: ~4 ASCII chars per token
+_CHARS_PER_TOKEN = 4  # rough heuristic: ~4 UTF-8 bytes per token
+_TOKEN_COUNT_CACHE_SIZE = 4096
+_FAST_ESTIMATE_SLACK = 1.3  # headroom for BPE expansion over the byte heuristic
+_MESSAGE_TOKEN_OVERHEAD = 8  # per-message framing; chat formats add ~4 (role, separators)
+
+_ROLE_SYSTEM = "system"
+_ROLE_ASSISTANT = "assistant"
+_ROLE_TOOL = "tool"
+
+# Bound %-format templates for flattening tool calls in get_messages_simplified()
+_TOOL_FMT = "[Tool: %s(%s)]".__mod__
+_RESULT_FMT = "[Result: %s]".__mod__
+
+# (model, content digest) -> litellm token count, shared by all conversations
+_token_count_cache: OrderedDict[tuple[str, bytes | None], int] = OrderedDict()
+
+# litellm is slow to import and only needed for token counting, so it is
+# imported on first use rather than at module load.
+_litellm: Any = None
+
+
+def _get_litellm() -> Any:
+    """Return the litellm module, importing it on first call."""
+    global _litellm
+    if _litellm is None:
+        import litellm
+        _litellm = litellm
+    return _litellm
+
+
+def _count_tokens(model: str, message: dict[str, Any] | None) -> int:
+    """Return litellm's token count for one message, memoized by content hash.
+
+    Passing ``None`` counts an empty request, i.e. the fixed priming overhead
+    litellm adds on top of the messages.  Results are kept in a bounded LRU so
+    identical messages (restored sessions, sub-agents, repeated tool output)
+    are only tokenized once per model.
+    """
+    if message is None:
+        key: tuple[str, bytes | None] = (model, None)
+    else:
+        payload = json.dumps(message, sort_keys=True, default=str).encode("utf-8")
+        key = (model, hashlib.blake2b(payload, digest_size=16).digest())
+    count = _token_count_cache.get(key)
+    if count is not None:
+        _token_count_cache.move_to_end(key)
+        return count
+    count = _get_litellm().token_counter(model=model, messages=[] if message is None else [message])
+    _token_count_cache[key] = count
+    if len(_token_count_cache) > _TOKEN_COUNT_CACHE_SIZE:
+        _token_count_cache.popitem(last=False)
+    return count
+
+
+def _utf8_len(text: str | None) -> int:
+    """Return the UTF-8 encoded length of text (0 for None/empty)."""
+    if not text:
+        return 0
+    # ASCII fast path: code-point count equals byte count
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+@dataclass(slots=True)
+class _Msg:
+    """Compact in-memory message record.
+
+    Messages are kept as slotted objects rather than dicts to cut per-message
+    memory and attribute-access cost; they are converted to API dicts only
+    when handed out.
+    """
+
+    role: str
+    content: str | None
+    tool_calls: tuple[dict[str, Any], ...] | None = None
+    tool_call_id: str | None = None
+    extra: dict[str, Any] | None = None
+    size: int = 0  # UTF-8 bytes of content + tool-call arguments, computed once
+    tokens: int | None = None  # litellm count excluding priming; None = not yet counted
+
+    @classmethod
+    def create(
+        cls,
+        role: str,
+        content: str | None,
+        tool_calls: tuple[dict[str, Any], ...] | None = None,
+        tool_call_id: str | None = None,
+        extra: dict[str, Any] | None = None,
+    ) -> "_Msg":
+        """Build a message with its byte size precomputed for token estimation."""
+        size = _utf8_len(content)
+        if tool_calls:
+            for tc in tool_calls:
+                size += _utf8_len(tc.get("function", {}).get("arguments"))
+        return cls(role, content, tool_calls, tool_call_id, extra, size)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the message in the dict form expected by the LLM API."""
+        message: dict[str, Any] = {"role": self.role, "content": self.content}
+        if self.tool_calls is not None:
+            message["tool_calls"] = list(self.tool_calls)
+        if self.tool_call_id is not None:
+            message["tool_call_id"] = self.tool_call_id
+        if self.extra:
+            message.update(self.extra)
+        return message
+
+
+def _is_prunable(msg: _Msg) -> bool:
+    """Return True for tool results long enough to be pruned under pressure."""
+    return msg.role == _ROLE_TOOL and msg.content is not None and len(msg.content) > _MAX_TOOL_OUTPUT_CHARS
 
 
 class ConversationManager:
     """Manages message history for LLM context."""
 
-    def __init__(self, system_prompt: str, model: str = "gpt-4") -> None:
-        """Initialize with system prompt (never dropped).
+    def __init__(
+        self,
+        system_prompt: str,
+        model: str = "gpt-4",
+        max_tool_output_chars: int = _MAX_INGEST_TOOL_OUTPUT_CHARS,
+    ) -> None:
+        """Initialize with system prompt (never dropped; always at index 0).
 
         Args:
             system_prompt: The system prompt to use
             model: The model to use for token counting (default: gpt-4)
+            max_tool_output_chars: Tool results longer than this are cut when
+                added, so oversized outputs never sit in history (default: 8000)
         """
-        self._messages: list[dict[str, Any]] = [
-            {"role": "system", "content": system_prompt}
-        ]
+        self._messages: list[_Msg] = []
         self._model = model
+        self._max_tool_output_chars = max_tool_output_chars
         self._token_cache: int | None = None
+        # Running totals backing the O(1) heuristic estimate
+        self._total_bytes = 0
+        self._tool_call_messages = 0
+        # Running total of per-message litellm counts, and messages not yet counted
+        self._counted_total = 0
+        self._uncounted = 0
+        self._priming_tokens: int | None = None
+        # Index before which no tool output is left to prune
+        self._prune_from = 0
+        # API-form (dict) messages handed out by get_messages(); built lazily,
+        # extended on append and dropped on any other mutation
+        self._api_messages: list[dict[str, Any]] | None = None
+        self._fingerprint_cache: bytes | None = None
+        self._suspend_invalidation = False
+        self._append(_Msg.create(_ROLE_SYSTEM, system_prompt))
 
     def _invalidate_cache(self) -> None:
-        """Invalidate the token count cache."""
+        """Invalidate the token count and fingerprint caches (deferred inside batch())."""
+        if self._suspend_invalidation:
+            return
         self._token_cache = None
+        self._fingerprint_cache = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group related additions so the caches are invalidated once, on exit.
+
+        Inside the block ``token_count`` and ``messages_fingerprint()`` may
+        report the state from before the batch started.
+        """
+        if self._suspend_invalidation:
+            yield  # already batching; the outer block invalidates
+            return
+        self._suspend_invalidation = True
+        try:
+            yield
+        finally:
+            self._suspend_invalidation = False
+            self._invalidate_cache()
+
+    def _track(self, msg: _Msg, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) a message from the running totals."""
+        self._total_bytes += sign * msg.size
+        if msg.tool_calls:
+            self._tool_call_messages += sign
+
+    def _untrack_tokens(self, msg: _Msg) -> None:
+        """Drop a message's litellm count from the running totals."""
+        if msg.tokens is None:
+            self._uncounted -= 1
+        else:
+            self._counted_total -= msg.tokens
+
+    def _append(self, msg: _Msg) -> None:
+        """Append a message and update running totals."""
+        self._messages.append(msg)
+        self._uncounted += 1
+        self._track(msg, 1)
+        if self._api_messages is not None:
+            self._api_messages.append(msg.to_dict())
+        self._invalidate_cache()
+
+    def _replace(self, index: int, msg: _Msg) -> None:
+        """Replace the message at index and update running totals."""
+        self._track(self._messages[index], -1)
+        self._untrack_tokens(self._messages[index])
+        self._messages[index] = msg
+        self._uncounted += 1
+        self._track(msg, 1)
+        if index < self._prune_from and _is_prunable(msg):
+            self._prune_from = index
+        self._api_messages = None
+        self._invalidate_cache()
+
+    def _delete(self, start: int, end: int) -> None:
+        """Delete messages[start:end] in one slice and update running totals."""
+        removed = self._messages[start:end]
+        # Bulk-adjust the running totals with C-level sum() reductions
+        self._total_bytes -= sum([m.size for m in removed])
+        self._tool_call_messages -= sum([1 for m in removed if m.tool_calls])
+        counted = [m.tokens for m in removed if m.tokens is not None]
+        self._counted_total -= sum(counted)
+        self._uncounted -= len(removed) - len(counted)
+        del self._messages[start:end]
+        if start < self._prune_from:
+            self._prune_from -= min(end, self._prune_from) - start
+        self._api_messages = None
+        self._invalidate_cache()
 
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """Add a message to the conversation history.
@@ -42,10 +246,16 @@ class ConversationManager:
             content: The message content
             **kwargs: Additional fields (e.g. tool_calls, tool_call_id)
         """
-        message: dict[str, Any] = {"role": role, "content": content}
-        message.update(kwargs)
-        self._messages.append(message)
-        self._invalidate_cache()
+        if role == _ROLE_TOOL:
+            content = self._cap_tool_output(content)
+        tool_calls = kwargs.pop("tool_calls", None)
+        self._append(_Msg.create(
+            sys.intern(role),  # roles from restored sessions arrive as fresh strings
+            content,
+            tuple(tool_calls) if tool_calls is not None else None,
+            kwargs.pop("tool_call_id", None),
+            kwargs or None,
+        ))
 
     def add_assistant_tool_call(self, content: str, tool_calls: list[dict]) -> None:
         """Add an assistant message that includes native tool_calls.
@@ -54,24 +264,22 @@ class ConversationManager:
             content: Text content from the assistant (may be empty)
             tool_calls: List of tool call dicts with id, name, arguments
         """
-        message: dict[str, Any] = {
-            "role": "assistant",
-            "content": content,
-            "tool_calls": [
-                {
-                    "id": tc["id"],
-                    "type": "function",
-                    "function": {
-                        "name": tc["name"],
-                        "arguments": tc["arguments"] if isinstance(tc["arguments"], str)
-                        else json.dumps(tc["arguments"]),
-                    },
-                }
-                for tc in tool_calls
-            ],
-        }
-        self._messages.append(message)
-        self._invalidate_cache()
+        # Serialize arguments exactly once and size the message in the same pass,
+        # so neither token estimation path has to re-walk or re-encode them.
+        calls = []
+        size = _utf8_len(content)
+        for tc in tool_calls:
+            arguments = tc["arguments"]
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments)
+            size += _utf8_len(arguments)
+            calls.append({
+                "id": tc["id"],
+                "type": "function",
+                # Tool names repeat across many calls; share one string object each
+                "function": {"name": sys.intern(tc["name"]), "arguments": arguments},
+            })
+        self._append(_Msg(_ROLE_ASSISTANT, content, tuple(calls), size=size))
 
     def add_tool_result(self, tool_call_id: str, content: str) -> None:
         """Add a tool result message.
@@ -80,16 +288,60 @@ class ConversationManager:
             tool_call_id: The ID of the tool call this is responding to
             content: The tool execution result
         """
-        self._messages.append({
-            "role": "tool",
-            "tool_call_id": tool_call_id,
-            "content": content,
-        })
-        self._invalidate_cache()
+        self._append(_Msg.create(_ROLE_TOOL, self._cap_tool_output(content), tool_call_id=tool_call_id))
+
+    def _cap_tool_output(self, content: str) -> str:
+        """Cut an oversized tool result at ingestion time."""
+        if content and len(content) > self._max_tool_output_chars:
+            return content[:self._max_tool_output_chars] + "\n...[truncated]"
+        return content
+
+    def append_to_system_prompt(self, text: str) -> None:
+        """Append text to the system prompt.
+
+        Args:
+            text: Text to append to the existing system prompt content
+        """
+        system = self._messages[0]
+        self._replace(0, _Msg.create(_ROLE_SYSTEM, (system.content or "") + text, extra=system.extra))
+
+    def get_messages(self) -> Sequence[dict[str, Any]]:
+        """Return all messages for LLM API.
+
+        The returned list is shared and kept up to date by this manager, so
+        repeated calls cost nothing.  Treat it as read-only; use
+        ``get_messages_copy()`` when an independent snapshot is needed.
+        """
+        if self._api_messages is None:
+            self._api_messages = [m.to_dict() for m in self._messages]
+        return self._api_messages
+
+    def get_messages_copy(self) -> list[dict[str, Any]]:
+        """Return a snapshot list of all messages that callers may modify."""
+        return list(self.get_messages())
 
-    def get_messages(self) -> list[dict[str, Any]]:
-        """Return all messages for LLM API."""
-        return self._messages.copy()
+    def messages_fingerprint(self) -> bytes:
+        """Return a stable 16-byte digest of the conversation contents.
+
+        Covers each message's role, content and tool calls (tool-call and
+        result IDs are excluded), so identical turns hash identically and the
+        LLM layer can use the digest as an exact-match response cache key.
+        Cached until the next mutation.
+        """
+        if self._fingerprint_cache is None:
+            h = hashlib.blake2b(digest_size=16)
+            for m in self._messages:
+                h.update(m.role.encode("utf-8"))
+                h.update(b"\x00")
+                h.update((m.content or "").encode("utf-8"))
+                if m.tool_calls:
+                    h.update(b"\x02")
+                    h.update(json.dumps(
+                        [tc.get("function", {}) for tc in m.tool_calls], sort_keys=True
+                    ).encode("utf-8"))
+                h.update(b"\x01")
+            self._fingerprint_cache = h.digest()
+        return self._fingerprint_cache
 
     def get_messages_simplified(self) -> list[dict[str, Any]]:
         """Return messages with tool call/result pairs flattened to plain text.
@@ -97,30 +349,37 @@ class ConversationManager:
         Converts assistant messages with tool_calls and role=tool messages into
         plain assistant text, for use with models that don't support tool calling.
         """
+        messages = self._messages
+        count = len(messages)
         simplified: list[dict[str, Any]] = []
         i = 0
-        while i < len(self._messages):
-            msg = self._messages[i]
-            role = msg.get("role")
-            if role == "assistant" and msg.get("tool_calls"):
-                parts = [msg.get("content") or ""]
-                for tc in msg.get("tool_calls", []):
-                    fn = tc.get("function", {})
-                    parts.append(f"[Tool: {fn.get('name', '?')}({fn.get('arguments', '')})]")
+        while i < count:
+            msg = messages[i]
+            role = msg.role
+            if role == _ROLE_ASSISTANT and msg.tool_calls:
+                # Build one materialized list so join() can size the result in one pass
+                parts = [msg.content] if msg.content else []
+                parts.extend([
+                    _TOOL_FMT((fn.get("name", "?"), fn.get("arguments", "")))
+                    for fn in [tc.get("function", {}) for tc in msg.tool_calls]
+                ])
                 # Absorb following tool result messages
-                while i + 1 < len(self._messages) and self._messages[i + 1].get("role") == "tool":
-                    i += 1
-                    tool_content = self._messages[i].get("content", "")
-                    if tool_content:
-                        parts.append(f"[Result: {tool_content[:_MAX_TOOL_RESULT_PREVIEW]}]")
+                end = i + 1
+                while end < count and messages[end].role == _ROLE_TOOL:
+                    end += 1
+                parts.extend([
+                    _RESULT_FMT(m.content[:_MAX_TOOL_RESULT_PREVIEW])
+                    for m in messages[i + 1:end] if m.content
+                ])
+                i = end - 1
                 simplified.append({
-                    "role": "assistant",
-                    "content": "\n".join(p for p in parts if p) or "[Tool call]",
+                    "role": _ROLE_ASSISTANT,
+                    "content": "\n".join(parts) or "[Tool call]",
                 })
-            elif role == "tool":
+            elif role == _ROLE_TOOL:
                 pass  # Orphaned tool result — skip
             else:
-                simplified.append({k: v for k, v in msg.items()})
+                simplified.append(msg.to_dict())
             i += 1
         return simplified
 
@@ -135,6 +394,16 @@ class ConversationManager:
         Args:
             max_tokens: Maximum estimated tokens before truncation (default: 128K)
         """
+        # A total that is already known (cached, or every message counted)
+        # settles the common no-truncation case without entering the loop.
+        # Otherwise an O(1) upper bound skips exact tokenization when the
+        # conversation is comfortably under the limit.
+        known = self._known_token_total()
+        if known is not None:
+            if known <= max_tokens:
+                return
+        elif self._estimate_tokens_upper_bound() <= max_tokens:
+            return
         prev_estimate = -1
         while True:
             estimate = self._estimate_tokens()
@@ -144,8 +413,9 @@ class ConversationManager:
             # Step 1: Try to prune tool outputs first
             if self._prune_oldest_tool_output():
                 continue
-            # Step 2: Remove oldest message pair (user + assistant + their tool results)
-            if not self._remove_oldest_message_pair():
+            # Step 2: Remove enough of the oldest message pairs (user + assistant +
+            # their tool results) to cover the excess, in a single deletion
+            if not self._remove_oldest_messages(estimate - max_tokens):
                 break  # Nothing more to remove
 
     def _prune_oldest_tool_output(self) -> bool:
@@ -154,21 +424,26 @@ class ConversationManager:
         Returns:
             True if a tool output was pruned, False if none found.
         """
-        for i, msg in enumerate(self._messages):
-            if msg.get("role") == "tool":
-                content = msg.get("content", "")
-                if content and len(content) > _MAX_TOOL_OUTPUT_CHARS:
-                    truncated = content[:_MAX_TOOL_OUTPUT_CHARS]
-                    # Avoid splitting in the middle of a JSON structure — look for a
-                    # safe boundary (last newline or comma) within the last 20% of the
-                    # kept portion so the model sees a valid partial response.
-                    for sep in ("\n", ",", " "):
-                        boundary = truncated.rfind(sep, len(truncated) // 2)
-                        if boundary != -1:
-                            truncated = truncated[:boundary]
-                            break
-                    msg["content"] = truncated + "\n...[truncated]"
-                    return True
+        # Resume from where the previous prune stopped instead of rescanning
+        # the (already pruned) head of the history on every call.
+        for i in range(self._prune_from, len(self._messages)):
+            msg = self._messages[i]
+            if _is_prunable(msg):
+                truncated = msg.content[:_MAX_TOOL_OUTPUT_CHARS]
+                # Avoid splitting in the middle of a JSON structure — look for a
+                # safe boundary (last newline or comma) within the last 20% of the
+                # kept portion so the model sees a valid partial response.
+                for sep in ("\n", ",", " "):
+                    boundary = truncated.rfind(sep, len(truncated) // 2)
+                    if boundary != -1:
+                        truncated = truncated[:boundary]
+                        break
+                self._replace(i, _Msg.create(
+                    msg.role, truncated + "\n...[truncated]", msg.tool_calls, msg.tool_call_id, msg.extra,
+                ))
+                self._prune_from = i + 1
+                return True
+        self._prune_from = len(self._messages)
         return False
 
     def _remove_oldest_message_pair(self) -> bool:
@@ -177,81 +452,144 @@ class ConversationManager:
         Returns:
             True if a pair was removed, False if nothing to remove.
         """
-        non_system = [i for i, m in enumerate(self._messages) if m["role"] != "system"]
-        if not non_system:
-            return False
+        return self._remove_oldest_messages(0)
 
-        oldest_idx = non_system[0]
-        remove_indices: set[int] = {oldest_idx}
+    def _remove_oldest_messages(self, excess_tokens: int) -> bool:
+        """Remove the oldest message blocks covering at least excess_tokens.
 
-        # If oldest is assistant, also remove following tool results
-        if self._messages[oldest_idx].get("role") == "assistant":
-            for i in range(oldest_idx + 1, len(self._messages)):
-                if self._messages[i].get("role") == "tool":
-                    remove_indices.add(i)
-                else:
-                    break
+        A block is one non-system message plus, for assistant messages, the
+        tool results that follow it.  At least one block is removed; removal
+        stops early at the next system message, which is never dropped.  All
+        selected blocks are deleted with one slice, so dropping many pairs
+        costs a single list shift rather than one per pair.
+
+        Args:
+            excess_tokens: Estimated tokens that need to be freed
+
+        Returns:
+            True if anything was removed, False if nothing to remove.
+        """
+        messages = self._messages
+        # Index 0 always holds the system prompt, so the oldest candidate is
+        # normally index 1; only skip further past injected system messages.
+        start = 1
+        while start < len(messages) and messages[start].role == _ROLE_SYSTEM:
+            start += 1
+        if start >= len(messages):
+            return False
 
-        # Remove in reverse order to maintain indices
-        for idx in sorted(remove_indices, reverse=True):
-            del self._messages[idx]
+        end = start
+        freed = 0
+        while end < len(messages) and messages[end].role != _ROLE_SYSTEM:
+            block_start = end
+            end += 1
+            # If the block is an assistant message, also remove following tool results
+            if messages[block_start].role == _ROLE_ASSISTANT:
+                while end < len(messages) and messages[end].role == _ROLE_TOOL:
+                    end += 1
+            for msg in messages[block_start:end]:
+                freed += msg.tokens if msg.tokens is not None else msg.size // _CHARS_PER_TOKEN
+            if freed >= excess_tokens:
+                break
 
+        self._delete(start, end)
         return True
 
+    def _known_token_total(self) -> int | None:
+        """Return the exact token total if known without tokenizing anything, else None."""
+        if self._token_cache is not None and not self._suspend_invalidation:
+            return self._token_cache
+        if not self._uncounted and self._priming_tokens is not None:
+            return self._counted_total + self._priming_tokens
+        return None
+
     def _estimate_tokens(self) -> int:
         """Estimate total tokens using litellm.token_counter() with fallback.
 
+        Each message is counted once and the result cached alongside it, so
+        repeated estimates only tokenize messages added or changed since the
+        last call.
+
         Returns:
             Estimated token count
         """
         try:
             # Try to use litellm's token counter for accuracy
-            return litellm.token_counter(model=self._model, messages=self._messages)
+            if self._priming_tokens is None:
+                # Fixed per-request overhead litellm adds on top of the messages
+                self._priming_tokens = _count_tokens(self._model, None)
+            if self._uncounted:
+                for msg in self._messages:
+                    if msg.tokens is None:
+                        msg.tokens = _count_tokens(self._model, msg.to_dict()) - self._priming_tokens
+                        self._counted_total += msg.tokens
+                        self._uncounted -= 1
+            return self._counted_total + self._priming_tokens
         except Exception as e:
             # Fallback to character heuristic if litellm unavailable
             _log.debug("litellm token_counter failed, using heuristic: %s", e)
             return self._estimate_tokens_heuristic()
 
     def _estimate_tokens_heuristic(self) -> int:
-        """Estimate tokens using a character-count heuristic.
+        """Estimate tokens using a byte-count heuristic.
 
-        Uses ``_CHARS_PER_TOKEN`` (4) characters per token as a rough
-        approximation.  This underestimates for non-ASCII text (e.g. CJK or
-        emoji) and is only used when the litellm token counter is unavailable.
+        Uses ``_CHARS_PER_TOKEN`` (4) UTF-8 bytes per token as a rough
+        approximation, counting tool-call arguments as well as content.  Byte
+        sizes are computed once per message, so this is O(1).  Used as the
+        fallback when the litellm token counter is unavailable, and as the
+        basis of ``_estimate_tokens_upper_bound``.
 
         Returns:
             Estimated token count
         """
-        total = 0
-        for m in self._messages:
-            content = m.get("content") or ""
-            total += len(content) // _CHARS_PER_TOKEN
-            # Add overhead for tool_calls
-            if m.get("tool_calls"):
-                total += _TOOL_CALL_TOKEN_OVERHEAD
-        return total
+        return (
+            self._total_bytes // _CHARS_PER_TOKEN
+            + self._tool_call_messages * _TOOL_CALL_TOKEN_OVERHEAD
+        )
+
+    def _estimate_tokens_upper_bound(self) -> int:
+        """Cheap, deliberately generous token estimate for the truncation pre-check.
+
+        Adds per-message framing overhead to the byte heuristic and scales by
+        ``_FAST_ESTIMATE_SLACK``, so a history of many short messages is not
+        mistaken for a small one.  O(1).
+
+        Returns:
+            Estimated upper bound on the token count
+        """
+        return int(
+            (self._estimate_tokens_heuristic() + len(self._messages) * _MESSAGE_TOKEN_OVERHEAD)
+            * _FAST_ESTIMATE_SLACK
+        )
 
     def remove_message(self, content: str) -> bool:
         """Remove the first message matching the given content.
 
+        The system prompt at index 0 is never removed.
+
         Args:
             content: The content to match against
 
         Returns:
             True if a message was found and removed, False otherwise.
         """
-        for i, msg in enumerate(self._messages):
-            if msg.get("content") == content:
-                del self._messages[i]
-                self._invalidate_cache()
+        for i in range(1, len(self._messages)):
+            if self._messages[i].content == content:
+                self._delete(i, i + 1)
                 return True
         return False
 
     def clear(self) -> None:
         """Clear all non-system messages (called on session end)."""
-        system_prompt = self._messages[0]["content"] if self._messages else ""
-        self._messages = [{"role": "system", "content": system_prompt}]
-        self._invalidate_cache()
+        system_prompt = self._messages[0].content if self._messages else ""
+        self._messages = []
+        self._total_bytes = 0
+        self._tool_call_messages = 0
+        self._counted_total = 0
+        self._uncounted = 0
+        self._prune_from = 0
+        self._api_messages = None
+        self._append(_Msg.create(_ROLE_SYSTEM, system_prompt))
 
     @property
     def token_count(self) -> int:
@@ -1,16 +1,70 @@
 """LiteLLM client wrapper - connectivity verification and LLM communication."""
 
+import importlib.util
 import json
 import logging
 import re
+import sys
+import threading
 import uuid
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Mapping
 from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import NoReturn
 
-import litellm
+import httpx
 
 _log = logging.getLogger(__name__)
 
+# litellm takes seconds to import, so it is imported inside the functions that
+# call it; CLI paths that never reach the model do not pay for it.
+
+
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=30)
+_HTTP_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+_PREWARM_TIMEOUT = 5.0
+_OLLAMA_PROBE_TIMEOUT = 5.0
+# HTTP/2 lets concurrent requests share one connection; it needs the optional
+# h2 package (``pip install coding-agent[http2]``).
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_http_client: httpx.Client | None = None
+_http_client_lock = threading.Lock()
+
+
+def _get_http_client() -> httpx.Client:
+    """Return the shared keep-alive HTTP client, creating it on first use.
+
+    The client is installed as ``litellm.client_session`` so that every
+    completion reuses pooled connections instead of paying a fresh TCP+TLS
+    handshake. It is created lazily so that proxy settings applied during
+    CLI start-up are picked up. HTTP/2 is negotiated when h2 is installed;
+    httpx already advertises and decodes gzip responses.
+    """
+    global _http_client
+    client = _http_client
+    if client is None or client.is_closed:
+        import litellm
+
+        with _http_client_lock:
+            if _http_client is None or _http_client.is_closed:
+                _http_client = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=_HTTP2_AVAILABLE)
+                litellm.client_session = _http_client
+            client = _http_client
+    return client
+
+
+def close_http_client() -> None:
+    """Close the shared HTTP client; the next request opens a new one."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            litellm = sys.modules.get("litellm")
+            if litellm is not None and litellm.client_session is _http_client:
+                litellm.client_session = None
+            _http_client = None
+
 
 def _is_minimax_openrouter(model: str) -> bool:
     """True when MiniMax is accessed via OpenRouter (which does not normalize tool-call format)."""
@@ -146,11 +200,12 @@ def _parse_minimax_tool_calls(content: str) -> list[dict]:
 class ModelRejectionError(ConnectionError):
     """Raised when the model rejects the request, e.g. due to unsupported tool format."""
 
+from coding_agent.config.utils import json_loads
 from coding_agent.config.config import AgentConfig, ModelCapabilities, get_model_capabilities, is_ollama_model, set_model_capabilities
 from coding_agent.tools import get_openai_tools
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamToken:
     """A single streamed token, tagged by type."""
 
@@ -164,7 +219,54 @@ def _is_claude_model(model: str) -> bool:
     return "claude" in m or "anthropic" in m
 
 
-@dataclass
+_EPHEMERAL_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _with_system_prompt_cache(messages: list[dict]) -> list[dict]:
+    """Mark the leading system prompt as cacheable for Anthropic prompt caching.
+
+    Returns a new list whose first message is a marked copy; the caller's
+    messages (often the conversation's shared list) are left untouched.
+    OpenAI-style providers cache stable prefixes automatically and need no
+    marker.
+    """
+    if not messages:
+        return messages
+    first = messages[0]
+    if first.get("role") != "system" or "cache_control" in first:
+        return messages
+    return [{**first, "cache_control": _EPHEMERAL_CACHE_CONTROL}, *messages[1:]]
+
+
+def _accumulate_tool_call_deltas(accum: dict[int, list], deltas: list) -> None:
+    """Merge streamed tool-call deltas into ``accum`` keyed by tool-call index.
+
+    Each entry is ``[id, name, argument_fragments]``; the id and name arrive
+    on the first delta for a call and the arguments as string fragments.
+    Tool names are interned: the same few names recur on every turn and are
+    used as tool-registry keys.
+    """
+    for tc in deltas:
+        index = tc.index
+        if index is None:
+            # No index: a new id starts a call, otherwise continue the last one
+            index = len(accum) if tc.id or not accum else next(reversed(accum))
+        entry = accum.get(index)
+        if entry is None:
+            entry = accum[index] = [None, "", []]
+        if tc.id:
+            entry[0] = tc.id
+        function = tc.function
+        if function is None:
+            continue
+        if function.name:
+            entry[1] = sys.intern(function.name)
+        arguments = function.arguments
+        if arguments:
+            entry[2].append(arguments if isinstance(arguments, str) else json.dumps(arguments))
+
+
+@dataclass(slots=True)
 class LLMResponse:
     """Assembled response from streaming LLM completion."""
 
@@ -176,6 +278,7 @@ class LLMClient:
     """LiteLLM client for model communication."""
 
     def __init__(self, config: AgentConfig) -> None:
+        self._sampling_params: Mapping[str, float] | None = None
         self.model = config.model
         self.api_base = config.api_base
         self.api_key = config.api_key
@@ -186,90 +289,197 @@ class LLMClient:
         self.last_response = None
         self.last_llm_response: LLMResponse | None = None
         self._capabilities: ModelCapabilities | None = None
+        self._prewarm_thread: threading.Thread | None = None
+
+    def prewarm(self) -> None:
+        """Start opening a pooled connection to api_base in the background.
+
+        Called once from CLI start-up so the first completion finds a warm
+        keep-alive connection. Local Ollama servers are skipped.
+        """
+        if self._prewarm_thread is not None:
+            return
+        if self.api_base and not is_ollama_model(self.model or ""):
+            self._prewarm_thread = threading.Thread(target=self._prewarm, name="llm-prewarm", daemon=True)
+            self._prewarm_thread.start()
+
+    def _prewarm(self) -> None:
+        """Open a pooled connection to api_base so the first request skips the handshake.
+
+        Any response status (404/405 included) means the connection is up;
+        failures are left for verify_connection to report.
+        """
+        try:
+            _get_http_client().head(self.api_base, timeout=_PREWARM_TIMEOUT)
+        except Exception as e:
+            _log.debug("Connection pre-warm to %s failed: %s", self.api_base, e)
+
+    def _wait_for_prewarm(self) -> None:
+        """Block until the background pre-warm request, if any, has finished."""
+        thread = self._prewarm_thread
+        if thread is not None:
+            thread.join()
+            self._prewarm_thread = None
+
+    def __enter__(self) -> "LLMClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for any pre-warm request to finish.
+
+        The pooled HTTP client is process-wide and may be shared with other
+        clients, so it is released separately with ``close_http_client()``.
+        """
+        self._wait_for_prewarm()
+
+    @property
+    def temperature(self) -> float:
+        """Sampling temperature; setting it refreshes the cached sampling params."""
+        return self._temperature
+
+    @temperature.setter
+    def temperature(self, value: float) -> None:
+        self._temperature = value
+        self._sampling_params = None
+
+    @property
+    def top_p(self) -> float:
+        """Nucleus sampling top_p; setting it refreshes the cached sampling params."""
+        return self._top_p
+
+    @top_p.setter
+    def top_p(self, value: float) -> None:
+        self._top_p = value
+        self._sampling_params = None
 
     def set_capabilities(self, caps: ModelCapabilities) -> None:
         """Set the model capabilities."""
         self._capabilities = caps
+        self._sampling_params = None
 
     def get_capabilities(self) -> ModelCapabilities | None:
         """Get the model capabilities."""
         return self._capabilities
 
-    def _get_sampling_params(self) -> dict:
+    def _get_sampling_params(self) -> Mapping[str, float]:
         """Get sampling parameters based on model capabilities.
 
         Omits parameters entirely when the model doesn't support them —
         sending any value (even a neutral default) causes a BadRequestError
         on models that reject these parameters.
+
+        The result is built once and reused until temperature, top_p or the
+        capabilities change; it is read-only.
         """
-        params = {}
-        caps = self._capabilities
-        if caps is None or caps.temperature_supported:
-            params["temperature"] = self.temperature
-        if caps is None or caps.top_p_supported:
-            params["top_p"] = self.top_p
+        params = self._sampling_params
+        if params is None:
+            built = {}
+            caps = self._capabilities
+            if caps is None or caps.temperature_supported:
+                built["temperature"] = self.temperature
+            if caps is None or caps.top_p_supported:
+                built["top_p"] = self.top_p
+            params = self._sampling_params = MappingProxyType(built)
         return params
 
-    def _handle_llm_error(self, error: Exception) -> None:
+    def _raise_auth_error(self, error: Exception) -> NoReturn:
+        raise ConnectionError(
+            f"Authentication failed connecting to LiteLLM server.\n\n"
+            f"  Server: {self.api_base}\n"
+            f"  Error: {error.message}\n\n"
+            f"Check your api_key in ~/.coding-agent/config.yaml"
+        ) from None
+
+    def _raise_connection_error(self, error: Exception) -> NoReturn:
+        if is_ollama_model(self.model):
+            model_name = self.model.split("/", 1)[-1]
+            raise ConnectionError(
+                f"Cannot connect to Ollama.\n\n"
+                f"  Server: {self.api_base}\n\n"
+                f"Suggestions:\n"
+                f"  1. Start Ollama:     ollama serve\n"
+                f"  2. Pull the model:   ollama pull {model_name}\n"
+                f"  3. Verify api_base in ~/.coding-agent/config.yaml"
+            ) from None
+        raise ConnectionError(
+            f"Cannot connect to LiteLLM server.\n\n"
+            f"  Server: {self.api_base}\n"
+            f"  Error: {error.message}\n\n"
+            f"Suggestions:\n"
+            f"  1. Verify the server is running at {self.api_base}\n"
+            f"  2. Check your network/firewall settings\n"
+            f"  3. Verify api_base in ~/.coding-agent/config.yaml"
+        ) from None
+
+    def _raise_timeout_error(self, error: Exception) -> NoReturn:
+        raise ConnectionError(
+            f"Connection to LiteLLM server timed out.\n\n"
+            f"  Server: {self.api_base}\n\n"
+            f"The server may be overloaded or unreachable. "
+            f"Check your network connection."
+        ) from None
+
+    def _raise_api_error(self, error: Exception) -> NoReturn:
+        raise ConnectionError(
+            f"LiteLLM request failed (status {error.status_code}).\n\n"
+            f"  Server: {self.api_base}\n"
+            f"  Error: {error.message}\n\n"
+            f"Check your LiteLLM server configuration and logs."
+        ) from None
+
+    def _raise_rejection_error(self, error: Exception) -> NoReturn:
+        raise ModelRejectionError(
+            f"Model rejected the request.\n\n"
+            f"  Server: {self.api_base}\n"
+            f"  Error: {error}\n\n"
+            f"The model may not support tool calls or this message format.\n"
+            f"Try switching models with /model <name>."
+        ) from None
+
+    # Built on first error (litellm is imported lazily). Ordered by precedence:
+    # subclasses not listed here match the first base class they derive from.
+    _ERROR_HANDLERS: dict[type, Callable[["LLMClient", Exception], NoReturn]] = {}
+
+    @classmethod
+    def _error_handlers(cls) -> dict[type, Callable[["LLMClient", Exception], NoReturn]]:
+        """Return the exception-type dispatch table, building it on first use."""
+        handlers = cls._ERROR_HANDLERS
+        if not handlers:
+            import litellm
+
+            handlers.update({
+                litellm.AuthenticationError: cls._raise_auth_error,
+                litellm.APIConnectionError: cls._raise_connection_error,
+                litellm.Timeout: cls._raise_timeout_error,
+                litellm.APIError: cls._raise_api_error,
+                litellm.BadRequestError: cls._raise_rejection_error,
+            })
+        return handlers
+
+    def _handle_llm_error(self, error: Exception) -> NoReturn:
         """Convert exceptions from LiteLLM calls to ConnectionError with clear messages.
 
         Handles known LiteLLM exception types (AuthenticationError, APIConnectionError,
-        Timeout, APIError) with specific messages, and falls back to a generic message
-        for unexpected exception types.
+        Timeout, APIError, BadRequestError) with specific messages via
+        ``_ERROR_HANDLERS``, and falls back to a generic message for unexpected
+        exception types.
 
         Raises:
             ConnectionError: Always. With differentiated messages for connectivity,
                 authentication, timeout, server errors, and unexpected failures.
         """
-        if isinstance(error, litellm.AuthenticationError):
-            raise ConnectionError(
-                f"Authentication failed connecting to LiteLLM server.\n\n"
-                f"  Server: {self.api_base}\n"
-                f"  Error: {error.message}\n\n"
-                f"Check your api_key in ~/.coding-agent/config.yaml"
-            ) from None
-        if isinstance(error, litellm.APIConnectionError):
-            if is_ollama_model(self.model):
-                model_name = self.model.split("/", 1)[-1]
-                raise ConnectionError(
-                    f"Cannot connect to Ollama.\n\n"
-                    f"  Server: {self.api_base}\n\n"
-                    f"Suggestions:\n"
-                    f"  1. Start Ollama:     ollama serve\n"
-                    f"  2. Pull the model:   ollama pull {model_name}\n"
-                    f"  3. Verify api_base in ~/.coding-agent/config.yaml"
-                ) from None
-            raise ConnectionError(
-                f"Cannot connect to LiteLLM server.\n\n"
-                f"  Server: {self.api_base}\n"
-                f"  Error: {error.message}\n\n"
-                f"Suggestions:\n"
-                f"  1. Verify the server is running at {self.api_base}\n"
-                f"  2. Check your network/firewall settings\n"
-                f"  3. Verify api_base in ~/.coding-agent/config.yaml"
-            ) from None
-        if isinstance(error, litellm.Timeout):
-            raise ConnectionError(
-                f"Connection to LiteLLM server timed out.\n\n"
-                f"  Server: {self.api_base}\n\n"
-                f"The server may be overloaded or unreachable. "
-                f"Check your network connection."
-            ) from None
-        if isinstance(error, litellm.APIError):
-            raise ConnectionError(
-                f"LiteLLM request failed (status {error.status_code}).\n\n"
-                f"  Server: {self.api_base}\n"
-                f"  Error: {error.message}\n\n"
-                f"Check your LiteLLM server configuration and logs."
-            ) from None
-        if isinstance(error, litellm.BadRequestError):
-            raise ModelRejectionError(
-                f"Model rejected the request.\n\n"
-                f"  Server: {self.api_base}\n"
-                f"  Error: {error}\n\n"
-                f"The model may not support tool calls or this message format.\n"
-                f"Try switching models with /model <name>."
-            ) from None
+        handlers = self._error_handlers()
+        handler = handlers.get(type(error))
+        if handler is None:
+            for cls, candidate in handlers.items():
+                if isinstance(error, cls):
+                    handler = candidate
+                    break
+        if handler is not None:
+            handler(self, error)
         raise ConnectionError(
             f"Unexpected error from LiteLLM.\n\n"
             f"  Server: {self.api_base}\n"
@@ -282,17 +492,26 @@ class LLMClient:
         Detects model capabilities first so that unsupported parameters
         (temperature, top_p) are not sent to models that reject them.
         Then sends a lightweight test request to confirm the server is
-        reachable and authentication is valid.
+        reachable and authentication is valid. Local Ollama servers are only
+        checked for reachability, since a completion would load the model.
 
         Raises:
             ConnectionError: With differentiated messages for connectivity,
                 authentication, timeout, and server errors.
         """
+        self._wait_for_prewarm()
         caps = detect_model_capabilities(self)
         self.set_capabilities(caps)
 
+        if self.api_base and is_ollama_model(self.model or ""):
+            self._verify_ollama()
+            return
+
+        import litellm
+
         try:
             params = self._get_sampling_params()
+            _get_http_client()
             litellm.completion(
                 model=self.model,
                 messages=[{"role": "user", "content": "ping"}],
@@ -305,6 +524,20 @@ class LLMClient:
         except Exception as e:
             self._handle_llm_error(e)
 
+    def _verify_ollama(self) -> None:
+        """Check that the Ollama server answers, without loading the model.
+
+        Any HTTP response counts as reachable (even 404 from an older server);
+        only transport failures are reported.
+
+        Raises:
+            ConnectionError: With Ollama start-up hints when the server is unreachable.
+        """
+        try:
+            _get_http_client().get(f"{self.api_base.rstrip('/')}/api/tags", timeout=_OLLAMA_PROBE_TIMEOUT)
+        except httpx.HTTPError as e:
+            self._raise_connection_error(e)
+
     def send_message_stream(self, messages: list[dict], tools: list[dict] | None = None) -> Generator[StreamToken, None, LLMResponse]:
         """Stream a completion response, yielding StreamToken objects.
 
@@ -315,23 +548,36 @@ class LLMClient:
         tool_calls.
 
         The full reassembled ModelResponse is also available via self.last_response.
+        Content and tool-call argument fragments are accumulated as they
+        stream, so the response is assembled without a second pass over the
+        chunks (``litellm.stream_chunk_builder`` is not used).
 
         Raises:
             ConnectionError: With differentiated messages for connectivity,
                 authentication, timeout, and server errors.
         """
         self.last_response = None
-        chunks = []
+        content_parts: list[str] = []
+        # tool-call index -> [id, name, argument fragments]
+        tool_accum: dict[int, list] = {}
+        first_chunk = None
+        finish_reason = None
         sampling_params = self._get_sampling_params()
 
         extra_params: dict = {}
-        if self.thinking_budget_tokens and _is_claude_model(self.model or ""):
+        is_claude = _is_claude_model(self.model or "")
+        if is_claude:
+            messages = _with_system_prompt_cache(messages)
+        if self.thinking_budget_tokens and is_claude:
             extra_params["thinking"] = {
                 "type": "enabled",
                 "budget_tokens": self.thinking_budget_tokens,
             }
 
+        import litellm
+
         try:
+            _get_http_client()
             response_stream = litellm.completion(
                 model=self.model,
                 messages=messages,
@@ -344,9 +590,20 @@ class LLMClient:
                 **sampling_params,
                 **extra_params,
             )
+            # Hot per-token loop: bind bound methods and attributes to locals
+            content_parts_append = content_parts.append
             for chunk in response_stream:
-                chunks.append(chunk)
-                delta = chunk.choices[0].delta
+                choices = chunk.choices
+                if not choices:
+                    continue  # e.g. trailing usage-only chunk
+                if first_chunk is None:
+                    first_chunk = chunk
+                choice = choices[0]
+                delta = choice.delta
+                if delta.tool_calls:
+                    _accumulate_tool_call_deltas(tool_accum, delta.tool_calls)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
 
                 # Extended thinking blocks (Claude)
                 thinking_blocks = getattr(delta, "thinking_blocks", None)
@@ -359,9 +616,31 @@ class LLMClient:
                         if text:
                             yield StreamToken(text=text, is_thinking=True)
 
-                if delta.content:
-                    yield StreamToken(text=delta.content)
-            self.last_response = litellm.stream_chunk_builder(chunks)
+                text = delta.content
+                if text:
+                    content_parts_append(text)
+                    yield StreamToken(text=text)
+            if first_chunk is not None:
+                assembled: dict = {"role": "assistant", "content": "".join(content_parts) or None}
+                if tool_accum:
+                    assembled["tool_calls"] = [
+                        {
+                            "id": call_id or f"call_{uuid.uuid4().hex[:8]}",
+                            "type": "function",
+                            "function": {"name": name, "arguments": "".join(parts)},
+                        }
+                        for call_id, name, parts in tool_accum.values()
+                    ]
+                self.last_response = litellm.ModelResponse(
+                    id=first_chunk.id,
+                    created=first_chunk.created,
+                    model=first_chunk.model,
+                    choices=[{
+                        "index": 0,
+                        "finish_reason": finish_reason or ("tool_calls" if tool_accum else "stop"),
+                        "message": assembled,
+                    }],
+                )
         except Exception as e:
             self._handle_llm_error(e)
 
@@ -376,7 +655,7 @@ class LLMClient:
                     arguments = tc.function.arguments
                     if isinstance(arguments, str):
                         try:
-                            arguments = json.loads(arguments)
+                            arguments = json_loads(arguments)
                         except json.JSONDecodeError:
                             arguments = {}
                     result.tool_calls.append({
@@ -396,10 +675,36 @@ class LLMClient:
         return result
 
 
+# Model-name prefixes (provider prefix stripped) with well-known sampling
+# support: (prefix, temperature_supported, top_p_supported). Checked in order.
+# Claude is deliberately absent: newer models reject temperature and top_p
+# together, which the probe detects.
+_KNOWN_CAPABILITIES: tuple[tuple[str, bool, bool], ...] = (
+    ("o1", False, False),
+    ("o3", False, False),
+    ("o4-mini", False, False),
+    ("gpt-5", False, False),
+    ("gpt-4", True, True),
+    ("gpt-3.5", True, True),
+)
+
+
+def _known_capabilities(model: str) -> ModelCapabilities | None:
+    """Return baked-in capabilities for well-known models, or None if unknown."""
+    if is_ollama_model(model):
+        return ModelCapabilities(temperature_supported=True, top_p_supported=True)
+    name = model.rsplit("/", 1)[-1].lower()
+    for prefix, temperature_supported, top_p_supported in _KNOWN_CAPABILITIES:
+        if name.startswith(prefix):
+            return ModelCapabilities(temperature_supported=temperature_supported, top_p_supported=top_p_supported)
+    return None
+
+
 def detect_model_capabilities(client: "LLMClient") -> ModelCapabilities:
     """Detect if a model supports temperature and top_p parameters.
 
-    Makes a minimal request with temperature=0.5, top_p=0.9 to test support.
+    Well-known models are resolved from a static table. Otherwise makes a
+    minimal request with temperature=0.5, top_p=0.9 to test support.
 
     Args:
         client: LLMClient instance to test
@@ -413,7 +718,15 @@ def detect_model_capabilities(client: "LLMClient") -> ModelCapabilities:
     if cached:
         return cached
 
+    known = _known_capabilities(model or "")
+    if known is not None:
+        set_model_capabilities(model, known)
+        return known
+
+    import litellm
+
     try:
+        _get_http_client()
         litellm.completion(
             model=model,
             messages=[{"role": "user", "content": "ping"}],
@@ -433,3 +746,28 @@ def detect_model_capabilities(client: "LLMClient") -> ModelCapabilities:
 
     set_model_capabilities(model, caps)
     return caps
+
+
+def detect_model_capabilities_many(clients: list["LLMClient"]) -> dict[str, ModelCapabilities]:
+    """Detect capabilities for several models concurrently.
+
+    Each distinct model is resolved once via detect_model_capabilities; probes
+    for uncached models run in parallel over the shared connection pool.
+
+    Args:
+        clients: LLMClient instances, one per model to check
+
+    Returns:
+        Mapping of model name to its ModelCapabilities
+    """
+    by_model: dict[str, LLMClient] = {}
+    for client in clients:
+        by_model.setdefault(client.model, client)
+    if len(by_model) <= 1:
+        return {model: detect_model_capabilities(client) for model, client in by_model.items()}
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(16, len(by_model))) as pool:
+        futures = {model: pool.submit(detect_model_capabilities, client) for model, client in by_model.items()}
+        return {model: future.result() for model, future in futures.items()}
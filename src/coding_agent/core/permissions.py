@@ -10,9 +10,20 @@ def _fmt_params(params: dict) -> str:
     """Format params dict with long values truncated for display."""
     parts = []
     for k, v in params.items():
-        v_str = str(v)
-        if len(v_str) > _MAX_PARAM_DISPLAY:
-            v_str = v_str[:_MAX_PARAM_DISPLAY] + f"... ({len(v_str)} chars)"
+        # Slice strings and bytes before converting so large bodies (e.g. a
+        # file_write ``content``) are never copied in full.
+        if isinstance(v, str):
+            v_str = v
+            if len(v) > _MAX_PARAM_DISPLAY:
+                v_str = v[:_MAX_PARAM_DISPLAY] + f"... ({len(v)} chars)"
+        elif isinstance(v, (bytes, bytearray)):
+            v_str = bytes(v[:_MAX_PARAM_DISPLAY]).decode("utf-8", "replace")
+            if len(v) > _MAX_PARAM_DISPLAY:
+                v_str += f"... ({len(v)} bytes)"
+        else:
+            v_str = str(v)
+            if len(v_str) > _MAX_PARAM_DISPLAY:
+                v_str = v_str[:_MAX_PARAM_DISPLAY] + f"... ({len(v_str)} chars)"
         parts.append(f"{k}={v_str!r}")
     return "{" + ", ".join(parts) + "}"
 
@@ -30,7 +41,18 @@ DESTRUCTIVE_PATTERNS = [
     r"\bdd\b.*\bif=",                      # dd if= (disk duplicate)
 ]
 
-TOOLS_REQUIRING_APPROVAL = {"file_write", "file_edit", "shell"}
+# Every destructive pattern contains at least one of these literals, so a
+# command with none of them can skip the regex scan entirely.
+_DESTRUCTIVE_ANCHORS = ("rm", "rd", "del", "format", "mkfs", "shred", "/dev/", "dd")
+
+# All patterns fused into one alternation so each check is a single scan.
+_DESTRUCTIVE_RE = re.compile(
+    "|".join(f"(?:{p})" for p in DESTRUCTIVE_PATTERNS), re.IGNORECASE
+)
+
+# A short tuple: membership is a few identity checks against interned
+# literals (tool names from the stream are interned too), with no hashing.
+TOOLS_REQUIRING_APPROVAL = ("file_write", "file_edit", "shell")
 
 
 class PermissionSystem:
@@ -44,10 +66,16 @@ class PermissionSystem:
             auto_allow: If True, automatically approve tool executions
         """
         self.renderer = renderer
-        self.approved_operations = {}
+        self.approved_operations: set[str] = set()
         self.auto_allow = auto_allow
         self._prompt_callback = None
         self._tool_overrides: list[set[str]] = []
+        # One entry per tool in TOOLS_REQUIRING_APPROVAL; others need no prompt.
+        self._handlers = {
+            "shell": self._check_shell,
+            "file_write": self._check_remembered,
+            "file_edit": self._check_remembered,
+        }
 
     def set_prompt_callback(self, callback) -> None:
         """Set a callback for async prompting in TUI context.
@@ -92,23 +120,45 @@ class PermissionSystem:
         if self.auto_allow:
             return True
 
+        handler = self._handlers.get(tool_name)
+        if handler is None:
+            return True
+
         # Skill-scoped tool allowlist
         if any(tool_name in frame for frame in self._tool_overrides):
             return True
 
-        if tool_name not in TOOLS_REQUIRING_APPROVAL:
-            return True
+        return handler(tool_name, params)
 
-        if tool_name == "shell":
-            command = params.get("command", "")
-            if self._is_destructive(command):
-                return self._prompt_with_warning(tool_name, params)
+    def _check_shell(self, tool_name: str, params: dict) -> bool:
+        """Approve a shell command, always prompting for destructive ones.
 
+        Args:
+            tool_name: Name of the tool (``shell``)
+            params: Tool parameters
+
+        Returns:
+            True if approved, False if denied
+        """
+        if self._is_destructive(params.get("command", "")):
+            return self._prompt_with_warning(tool_name, params)
+        return self._check_remembered(tool_name, params)
+
+    def _check_remembered(self, tool_name: str, params: dict) -> bool:
+        """Approve from session memory, otherwise prompt the user.
+
+        Args:
+            tool_name: Name of the tool
+            params: Tool parameters
+
+        Returns:
+            True if approved, False if denied
+        """
         approval_key = self._get_approval_key(tool_name, params)
         if approval_key in self.approved_operations:
             return True
 
-        return self._prompt_user(tool_name, params)
+        return self._prompt_user(tool_name, params, approval_key)
 
     def _is_destructive(self, command: str) -> bool:
         """Check if command is potentially destructive.
@@ -120,17 +170,19 @@ class PermissionSystem:
             True if command is potentially destructive
         """
         command_lower = command.lower()
-        for pattern in DESTRUCTIVE_PATTERNS:
-            if re.search(pattern, command_lower):
-                return True
-        return False
+        if not any(anchor in command_lower for anchor in _DESTRUCTIVE_ANCHORS):
+            return False
+        return _DESTRUCTIVE_RE.search(command) is not None
 
-    def _prompt_user(self, tool_name: str, params: dict) -> bool:
+    def _prompt_user(
+        self, tool_name: str, params: dict, approval_key: str | None = None
+    ) -> bool:
         """Prompt user for approval.
 
         Args:
             tool_name: Name of the tool
             params: Tool parameters
+            approval_key: Precomputed approval key, if the caller has one
 
         Returns:
             True if approved (Y), False if denied (N)
@@ -144,7 +196,7 @@ class PermissionSystem:
         except EOFError:
             return False
         if response in ("", "y", "yes"):
-            self.approve(tool_name, params)
+            self.approve(tool_name, params, approval_key)
             return True
         return False
 
@@ -197,20 +249,26 @@ class PermissionSystem:
         if tool_name in ("file_write", "file_edit"):
             path = params.get("path", "")
             if path:
+                # Resolved on every call: a symlink repointed after approval
+                # must produce a new key and prompt again.
                 return f"{tool_name}:{Path(path).resolve()}"
 
         return f"{tool_name}:default"
 
-    def approve(self, tool_name: str, params: dict) -> None:
+    def approve(
+        self, tool_name: str, params: dict, approval_key: str | None = None
+    ) -> None:
         """Remember this approval for session.
 
         Args:
             tool_name: Name of the tool
             params: Tool parameters
+            approval_key: Precomputed approval key; derived from params if None
         """
-        approval_key = self._get_approval_key(tool_name, params)
-        self.approved_operations[approval_key] = True
+        if approval_key is None:
+            approval_key = self._get_approval_key(tool_name, params)
+        self.approved_operations.add(approval_key)
 
     def clear(self) -> None:
         """Clear session memory (call on session end)."""
-        self.approved_operations = {}
+        self.approved_operations = set()
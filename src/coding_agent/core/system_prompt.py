@@ -1,4 +1,8 @@
-"""System prompt for the coding agent."""
+"""System prompt for the coding agent.
+
+Keep the prompt byte-stable across turns (no timestamps or other per-request
+values): providers cache the unchanged prefix and skip re-processing it.
+"""
 
 SYSTEM_PROMPT = """You are an expert coding assistant with access to tools for \
 reading and writing files, executing shell commands, and navigating the file system.
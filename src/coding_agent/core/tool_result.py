@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResult:
     """Standard envelope for all tool responses.
 
@@ -13,49 +14,49 @@ class ToolResult:
 
     ok: bool
     error_code: Optional[str]
-    message: str
+    message: str = ""
     data: Dict[str, Any] = field(default_factory=dict)
     warnings: List[str] = field(default_factory=list)
     artifacts: List[Dict[str, Any]] = field(default_factory=list)
 
-    def __init__(
-        self,
+    @classmethod
+    def from_legacy(
+        cls,
+        *,
+        output: Optional[str] = None,
+        error: Optional[str] = None,
+        is_error: Optional[bool] = None,
         ok: Optional[bool] = None,
         error_code: Optional[str] = None,
         message: str = "",
         data: Optional[Dict[str, Any]] = None,
         warnings: Optional[List[str]] = None,
         artifacts: Optional[List[Dict[str, Any]]] = None,
-        # Legacy kwargs from older tools.base.ToolResult
-        output: Optional[str] = None,
-        error: Optional[str] = None,
-        is_error: Optional[bool] = None,
-    ) -> None:
-        # Resolve ok from is_error if not explicitly provided
+    ) -> "ToolResult":
+        """Build a result from the older tools.base.ToolResult keyword shape.
+
+        ``ok`` defaults to ``not is_error``; ``message`` falls back to
+        ``error`` then ``output``; ``data`` falls back to ``{"output": output}``.
+        """
         if ok is None:
-            self.ok = not is_error if is_error is not None else True
-        else:
-            self.ok = ok
+            ok = not is_error if is_error is not None else True
 
-        # Resolve message from legacy error/output fields
         if message == "" and error:
-            self.message = error
+            message = error
         elif message == "" and output:
-            self.message = output
-        else:
-            self.message = message
+            message = output
 
-        # Resolve data from legacy output field
-        if data is not None:
-            self.data = data
-        elif output is not None:
-            self.data = {"output": output}
-        else:
-            self.data = {}
+        if data is None:
+            data = {"output": output} if output is not None else {}
 
-        self.error_code = error_code
-        self.warnings = warnings or []
-        self.artifacts = artifacts or []
+        return cls(
+            ok=ok,
+            error_code=sys.intern(error_code) if error_code else None,
+            message=message,
+            data=data,
+            warnings=warnings or [],
+            artifacts=artifacts or [],
+        )
 
     @property
     def is_error(self) -> bool:
@@ -93,9 +94,11 @@ class ToolResult:
         warnings: Optional[List[str]] = None,
         artifacts: Optional[List[Dict[str, Any]]] = None,
     ) -> "ToolResult":
+        # Codes come from a small fixed vocabulary; interning makes codes built
+        # at runtime share one object with the literals used for comparison.
         return cls(
             ok=False,
-            error_code=error_code,
+            error_code=sys.intern(error_code),
             message=message,
             data=data or {},
             warnings=warnings or [],
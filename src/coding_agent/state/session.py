@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import heapq
 import json
 import logging
+import os
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from coding_agent.config.utils import json_dumps_bytes, json_loads
 from coding_agent.state.db import Database
 from coding_agent.state import schema
 
@@ -19,6 +22,40 @@ DEFAULT_DB_PATH = Path.home() / ".coding-agent" / "sessions.db"
 DEFAULT_SESSION_CAP = 50
 _MAX_TITLE_LEN = 80
 _CHARS_PER_TOKEN = 4  # rough heuristic: ~4 ASCII chars per token
+_META_SUFFIX = ".meta.json"
+_PARALLEL_PARSE_MIN = 4  # up to this many uncached files are parsed serially
+_HEADER_FIELDS = ("id", "title", "created_at", "updated_at", "model", "token_count", "_seq")
+
+
+def _recency_key(header: dict[str, Any]) -> tuple[str, int]:
+    """Sort key ordering legacy session headers from oldest to newest."""
+    return header.get("updated_at", ""), header.get("_seq", -1)
+
+
+def _read_session_header(stem: str, path: str) -> dict[str, Any] | None:
+    """Read the list() header fields from a session or sidecar file.
+
+    Args:
+        stem: Session file name without extension, used when the file has no id
+        path: Path to the JSON file
+
+    Returns:
+        Header dict, or None if the file is unreadable or not valid JSON
+    """
+    try:
+        with open(path, "rb") as f:
+            data = json_loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        return None
+    return {
+        "id": data.get("id", stem),
+        "title": data.get("title", "Untitled"),
+        "created_at": data.get("created_at", ""),
+        "updated_at": data.get("updated_at", ""),
+        "model": data.get("model", "unknown"),
+        "token_count": data.get("token_count", 0),
+        "_seq": data.get("_seq", -1),
+    }
 
 
 class SessionManager:
@@ -56,6 +93,10 @@ class SessionManager:
 
         self._session_cap = session_cap
         self._seq = 0  # monotonic counter for legacy mode ordering
+        # Legacy mode: parsed list() headers keyed by file path, validated by (mtime_ns, size)
+        self._list_cache: dict[str, tuple[int, int, dict[str, Any]]] = {}
+        # Per-session (message count, last message, token total) from the last save
+        self._token_totals: dict[str, tuple[int, dict[str, Any], int]] = {}
 
     def _ensure_compatibility(self) -> None:
         """Run migrations and check for JSON files to migrate."""
@@ -98,7 +139,9 @@ class SessionManager:
             _log.info("No sessions directory found, skipping migration")
             return stats
 
-        json_files = list(sessions_dir.glob("*.json"))
+        json_files = [
+            f for f in sessions_dir.glob("*.json") if not f.name.endswith(_META_SUFFIX)
+        ]
         if not json_files:
             _log.info("No JSON session files found, skipping migration")
             return stats
@@ -106,7 +149,7 @@ class SessionManager:
         with self._db.transaction():
             for json_file in json_files:
                 try:
-                    data = json.loads(json_file.read_text(encoding="utf-8"))
+                    data = json_loads(json_file.read_bytes())
                     session_id = data.get("id", json_file.stem)
                     messages = data.get("messages", [])
 
@@ -181,16 +224,45 @@ class SessionManager:
                 total += len(content) // _CHARS_PER_TOKEN
             return total
 
+    def _count_session_tokens(self, session_id: str, messages: list[dict[str, Any]]) -> int:
+        """Estimate tokens for a session, only counting messages added since the last save.
+
+        Saves almost always append to the history, so the previous total is
+        reused while the message it ended on is still in place. Anything else
+        (compaction, a shorter history, an edited tail) triggers a full recount.
+        """
+        cached = self._token_totals.get(session_id)
+        if cached is not None:
+            count, last, total = cached
+            if count <= len(messages) and messages[count - 1] == last:
+                if count < len(messages):
+                    total += self._estimate_tokens(messages[count:])
+            else:
+                total = self._estimate_tokens(messages)
+        else:
+            total = self._estimate_tokens(messages)
+
+        if messages:
+            self._token_totals[session_id] = (len(messages), dict(messages[-1]), total)
+        else:
+            self._token_totals.pop(session_id, None)
+        return total
+
     def _get_session_path(self, session_id: str) -> Path:
         """Get path for a legacy session file."""
         return self._sessions_dir / f"{session_id}.json"
 
-    def _atomic_write(self, path: Path, data: str) -> None:
-        """Write to .tmp file, then rename. Safe on crash/Ctrl+C."""
-        import os
+    def _get_meta_path(self, session_id: str) -> Path:
+        """Get path for a legacy session's header sidecar file."""
+        return self._sessions_dir / f"{session_id}{_META_SUFFIX}"
 
+    def _atomic_write(self, path: Path, data: str | bytes) -> None:
+        """Write to .tmp file, then rename. Safe on crash/Ctrl+C."""
         tmp_path = path.with_suffix(".tmp")
-        tmp_path.write_text(data, encoding="utf-8")
+        if isinstance(data, bytes):
+            tmp_path.write_bytes(data)
+        else:
+            tmp_path.write_text(data, encoding="utf-8")
         os.replace(str(tmp_path), str(path))
 
     def create_session(
@@ -246,7 +318,7 @@ class SessionManager:
                     token_count,
                     False,
                     json.dumps({}),
-                    json.dumps(messages),
+                    json_dumps_bytes(messages).decode("utf-8"),
                 ),
             )
 
@@ -286,14 +358,19 @@ class SessionManager:
 
         if self._legacy_mode:
             session["updated_at"] = now
-            session["token_count"] = self._estimate_tokens(session.get("messages", []))
+            session["token_count"] = self._count_session_tokens(session_id, session.get("messages", []))
             session_path = self._get_session_path(session_id)
-            self._atomic_write(session_path, json.dumps(session, indent=2, ensure_ascii=False))
+            self._atomic_write(session_path, json_dumps_bytes(session, indent=True))
+            meta_path = self._get_meta_path(session_id)
+            header = {k: session[k] for k in _HEADER_FIELDS if k in session}
+            self._atomic_write(meta_path, json_dumps_bytes(header))
+            self._list_cache.pop(str(meta_path), None)
+            self._list_cache.pop(str(session_path), None)
             return
 
-        token_count = self._estimate_tokens(session.get("messages", []))
+        token_count = self._count_session_tokens(session_id, session.get("messages", []))
         runtime_config_json = json.dumps(session.get("runtime_config", {}))
-        messages_json = json.dumps(session.get("messages", []))
+        messages_json = json_dumps_bytes(session.get("messages", [])).decode("utf-8")
 
         with self._db.transaction():
             self._db.execute(
@@ -368,7 +445,7 @@ class SessionManager:
         messages_json_raw = row["messages_json"] if "messages_json" in row.keys() else None
         if messages_json_raw:
             try:
-                messages = json.loads(messages_json_raw)
+                messages = json_loads(messages_json_raw)
             except (json.JSONDecodeError, ValueError):
                 messages = []
         else:
@@ -413,7 +490,7 @@ class SessionManager:
         if not session_path.exists():
             return None
         try:
-            return json.loads(session_path.read_text(encoding="utf-8"))
+            return json_loads(session_path.read_bytes())
         except (json.JSONDecodeError, OSError):
             return None
 
@@ -476,28 +553,66 @@ class SessionManager:
 
     def _list_json(self) -> list[dict[str, Any]]:
         """List sessions from JSON files (legacy mode)."""
-        if not self._sessions_dir.exists():
+        sessions = self._collect_json_headers()
+        sessions.sort(key=_recency_key, reverse=True)
+        return [dict(s) for s in sessions]
+
+    def _collect_json_headers(self) -> list[dict[str, Any]]:
+        """Collect session headers from JSON files in no particular order (legacy mode).
+
+        The returned dicts are shared with the header cache and must not be mutated.
+        """
+        # Prefer the small header sidecar; sessions saved before sidecars existed
+        # fall back to parsing the full file.
+        main_files: dict[str, os.DirEntry[str]] = {}
+        meta_files: dict[str, os.DirEntry[str]] = {}
+        try:
+            with os.scandir(self._sessions_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if not name.endswith(".json") or not entry.is_file(follow_symlinks=False):
+                        continue
+                    if name.endswith(_META_SUFFIX):
+                        meta_files[name[: -len(_META_SUFFIX)]] = entry
+                    else:
+                        main_files[name[: -len(".json")]] = entry
+        except FileNotFoundError:
             return []
 
         sessions = []
-        for session_file in self._sessions_dir.glob("*.json"):
-            if session_file.suffix == ".tmp":
-                continue
+        seen: set[str] = set()
+        pending: list[tuple[str, str, os.stat_result]] = []
+        for stem, main_entry in main_files.items():
+            entry = meta_files.get(stem, main_entry)
             try:
-                data = json.loads(session_file.read_text(encoding="utf-8"))
-                sessions.append({
-                    "id": data.get("id", session_file.stem),
-                    "title": data.get("title", "Untitled"),
-                    "created_at": data.get("created_at", ""),
-                    "updated_at": data.get("updated_at", ""),
-                    "model": data.get("model", "unknown"),
-                    "token_count": data.get("token_count", 0),
-                    "_seq": data.get("_seq", -1),
-                })
-            except (json.JSONDecodeError, OSError):
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            seen.add(entry.path)
+            cached = self._list_cache.get(entry.path)
+            if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                sessions.append(cached[2])
+            else:
+                pending.append((stem, entry.path, st))
+
+        # Cold reads are I/O-bound; overlap them once there are enough to pay for a pool.
+        if len(pending) > _PARALLEL_PARSE_MIN:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(8, len(pending))) as pool:
+                headers = list(pool.map(lambda p: _read_session_header(p[0], p[1]), pending))
+        else:
+            headers = [_read_session_header(stem, path) for stem, path, _ in pending]
+
+        for (_, path, st), header in zip(pending, headers):
+            if header is None:
                 continue
+            self._list_cache[path] = (st.st_mtime_ns, st.st_size, header)
+            sessions.append(header)
+
+        for stale in self._list_cache.keys() - seen:
+            del self._list_cache[stale]
 
-        sessions.sort(key=lambda s: (s.get("updated_at", ""), s.get("_seq", -1)), reverse=True)
         return sessions
 
     def delete(self, session_id: str) -> bool:
@@ -509,11 +624,16 @@ class SessionManager:
         Returns:
             True if deleted, False if not found
         """
+        self._token_totals.pop(session_id, None)
         if self._legacy_mode:
             session_path = self._get_session_path(session_id)
             if not session_path.exists():
                 return False
             session_path.unlink()
+            meta_path = self._get_meta_path(session_id)
+            meta_path.unlink(missing_ok=True)
+            self._list_cache.pop(str(meta_path), None)
+            self._list_cache.pop(str(session_path), None)
             return True
 
         row = self._db.execute(
@@ -533,10 +653,18 @@ class SessionManager:
 
     def _prune_old_sessions(self) -> None:
         """Remove oldest sessions if session count exceeds cap."""
-        sessions = self.list()
-        if len(sessions) <= self._session_cap:
-            return
-        ids_to_delete = [s["id"] for s in sessions[self._session_cap:]]
+        if self._legacy_mode:
+            headers = self._collect_json_headers()
+            excess = len(headers) - self._session_cap
+            if excess <= 0:
+                return
+            ids_to_delete = [s["id"] for s in heapq.nsmallest(excess, headers, key=_recency_key)]
+        else:
+            rows = self._db.execute(
+                "SELECT id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+                (self._session_cap,),
+            ).fetchall()
+            ids_to_delete = [r["id"] for r in rows]
         for session_id in ids_to_delete:
             self.delete(session_id)
 
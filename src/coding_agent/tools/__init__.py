@@ -105,6 +105,9 @@ def build_tools(
 
 tool_registry: dict[str, ToolDefinition] = {}
 
+# workspace_root -> (tool definitions, OpenAI-format schemas); default policy only
+_openai_tools_cache: dict[str, tuple[list[ToolDefinition], list[dict[str, Any]]]] = {}
+
 
 def register_tool(tool: ToolDefinition) -> None:
     tool_registry[tool.name] = tool
@@ -114,11 +117,24 @@ def get_openai_tools(
     workspace_root: str,
     policy: Optional[dict[str, Any]] = None,
 ) -> list[dict[str, Any]]:
-    """Return OpenAI-format tool schemas and populate tool_registry."""
+    """Return OpenAI-format tool schemas and populate tool_registry.
+
+    With the default policy the tools and their schemas are built once per
+    workspace root; later calls re-register the cached definitions and
+    return a fresh list of the same schema dicts, which callers must not
+    mutate.
+    """
+    cached = _openai_tools_cache.get(workspace_root) if policy is None else None
+    if cached is not None:
+        tools, schemas = cached
+        for t in tools:
+            tool_registry[t.name] = t
+        return list(schemas)
+
     tools = build_tools(workspace_root, policy)
     for t in tools:
         tool_registry[t.name] = t
-    return [
+    schemas = [
         {
             "type": "function",
             "function": {
@@ -133,6 +149,9 @@ def get_openai_tools(
         }
         for t in tools
     ]
+    if policy is None:
+        _openai_tools_cache[workspace_root] = (tools, schemas)
+    return list(schemas)
 
 
 def register_spawn_sub_agent_tool(llm_client, session_manager, config, workspace_root, renderer) -> None:
@@ -17,7 +17,7 @@ def execute(params: dict) -> ToolResult:
     pattern = params.get("pattern", "")
 
     if not pattern:
-        return ToolResult(output="", error="Pattern is required", is_error=True)
+        return ToolResult.from_legacy(output="", error="Pattern is required", is_error=True)
 
     try:
         base = Path(".")
@@ -26,9 +26,9 @@ def execute(params: dict) -> ToolResult:
         matches = matches[:200]
 
         result = "\n".join(str(m) for m in matches)
-        return ToolResult(output=result, error=None, is_error=False)
+        return ToolResult.from_legacy(output=result, error=None, is_error=False)
     except Exception as e:
-        return ToolResult(output="", error=f"Glob failed: {str(e)}", is_error=True)
+        return ToolResult.from_legacy(output="", error=f"Glob failed: {str(e)}", is_error=True)
 
 
 definition = ToolDefinition(
@@ -19,7 +19,7 @@ def execute(params: dict) -> ToolResult:
     mode = params.get("mode", "lines")
 
     if not pattern:
-        return ToolResult(output="", error="Pattern is required", is_error=True)
+        return ToolResult.from_legacy(output="", error="Pattern is required", is_error=True)
 
     cmd = ["rg", "--smart-case"]
     if mode == "files":
@@ -41,13 +41,13 @@ def execute(params: dict) -> ToolResult:
         output = result.stdout
         if len(output) > 30000:
             output = output[:30000] + "\n[Output truncated]"
-        return ToolResult(output=output, error=None, is_error=False)
+        return ToolResult.from_legacy(output=output, error=None, is_error=False)
     except subprocess.TimeoutExpired:
-        return ToolResult(output="", error="Search timed out", is_error=True)
+        return ToolResult.from_legacy(output="", error="Search timed out", is_error=True)
     except FileNotFoundError:
-        return ToolResult(output="", error="ripgrep (rg) not found", is_error=True)
+        return ToolResult.from_legacy(output="", error="ripgrep (rg) not found", is_error=True)
     except Exception as e:
-        return ToolResult(output="", error=f"Grep failed: {str(e)}", is_error=True)
+        return ToolResult.from_legacy(output="", error=f"Grep failed: {str(e)}", is_error=True)
 
 
 definition = ToolDefinition(
@@ -55,7 +55,7 @@ from coding_agent.config import (
 )
 from coding_agent.ui.progress import set_progress_config_override, ProgressConfig, ProgressStyle
 from coding_agent.core.conversation import ConversationManager
-from coding_agent.core.llm import LLMClient
+from coding_agent.core.llm import LLMClient, close_http_client
 from coding_agent.config.project_instructions import get_enhanced_system_prompt
 from coding_agent.ui.renderer import Renderer
 from coding_agent.state.session import SessionManager
@@ -68,9 +68,6 @@ from coding_agent.workflow import WorkflowManager, WorkflowState
 
 import re as _re
 
-import litellm
-litellm.suppress_debug_info = True
-
 
 def _extract_skill_suggestion(response: str, skills: dict) -> str | None:
     """Return skill name if agent embedded a suggestion marker."""
@@ -457,8 +454,12 @@ def run(ctx, model: str | None, api_base: str | None, temperature: float | None,
         click.echo(str(e), err=True)
         sys.exit(1)
 
+    import litellm
+    litellm.suppress_debug_info = True
+
     try:
         llm_client = LLMClient(config)
+        llm_client.prewarm()
         llm_client.verify_connection()
     except ConnectionError as e:
         click.echo(str(e), err=True)
@@ -509,7 +510,7 @@ def run(ctx, model: str | None, api_base: str | None, temperature: float | None,
             }
             if suggestible:
                 lines = "\n".join(f"- /{n}: {sk.description}" for n, sk in suggestible.items())
-                conversation._messages[0]["content"] += (
+                conversation.append_to_system_prompt(
                     "\n\n## Available Skills\n"
                     "When the user's request would clearly benefit from one of these skills, "
                     "end your response with exactly this line (and nothing after it):\n"
@@ -684,56 +685,60 @@ def run(ctx, model: str | None, api_base: str | None, temperature: float | None,
         renderer.print_warning(f"prompt_toolkit setup failed ({_pt_err}), using basic input (no toolbar/autocomplete)")
         input_func = lambda: input("You > ")
 
-    while True:
-        try:
-            text = input_func()
-        except KeyboardInterrupt:
-            renderer.print_info("\nUse Ctrl+D or type 'exit' to quit.")
-            continue
-        except EOFError:
-            conversation.clear()
-            break
-
-        text = text.strip()
-        if not text:
-            continue
-
-        # Handle bare exit/quit commands
-        if text.lower() in ("exit", "quit"):
-            break
-
-        # Check for slash commands
-        should_continue = execute_command(text, conversation, session_manager, renderer, llm_client, agent)
-        if should_continue is False:
-            break
-        if should_continue is True:
-            continue
-
-        # Regular message - create session if needed
-        if session_data is None:
-            session_data = session_manager.create_session(
-                first_message=text,
-                model=config.model,
-                messages=conversation.get_messages()
-            )
-            renderer.print_info(f"Session created: {session_data['title']}")
-            agent.set_session(session_manager, session_data)
-            from coding_agent.tools.spawn_sub_agent import update_session_data
-            update_session_data(session_data)
-
-        # Delegate to Agent for ReAct loop
-        try:
-            response = agent.run(text)
-            # Handle skill suggestion embedded in response
-            if response and filtered_skills:
-                _handle_skill_suggestion(response, filtered_skills, conversation,
-                                         session_manager, renderer, llm_client, agent)
-            # Show status line after response
-            token_count = conversation.token_count
-            session_id = session_data.get("id") if session_data else None
-            renderer.render_status_line(config.model, token_count, session_id)
-        except ConnectionError as e:
-            renderer.print_error(str(e))
+    try:
+        while True:
+            try:
+                text = input_func()
+            except KeyboardInterrupt:
+                renderer.print_info("\nUse Ctrl+D or type 'exit' to quit.")
+                continue
+            except EOFError:
+                conversation.clear()
+                break
+
+            text = text.strip()
+            if not text:
+                continue
+
+            # Handle bare exit/quit commands
+            if text.lower() in ("exit", "quit"):
+                break
+
+            # Check for slash commands
+            should_continue = execute_command(text, conversation, session_manager, renderer, llm_client, agent)
+            if should_continue is False:
+                break
+            if should_continue is True:
+                continue
+
+            # Regular message - create session if needed
+            if session_data is None:
+                session_data = session_manager.create_session(
+                    first_message=text,
+                    model=config.model,
+                    messages=conversation.get_messages_copy()
+                )
+                renderer.print_info(f"Session created: {session_data['title']}")
+                agent.set_session(session_manager, session_data)
+                from coding_agent.tools.spawn_sub_agent import update_session_data
+                update_session_data(session_data)
+
+            # Delegate to Agent for ReAct loop
+            try:
+                response = agent.run(text)
+                # Handle skill suggestion embedded in response
+                if response and filtered_skills:
+                    _handle_skill_suggestion(response, filtered_skills, conversation,
+                                             session_manager, renderer, llm_client, agent)
+                # Show status line after response
+                token_count = conversation.token_count
+                session_id = session_data.get("id") if session_data else None
+                renderer.render_status_line(config.model, token_count, session_id)
+            except ConnectionError as e:
+                renderer.print_error(str(e))
+    finally:
+        llm_client.close()
+        close_http_client()
 
 
 # Alias for test compatibility
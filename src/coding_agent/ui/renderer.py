@@ -1,6 +1,11 @@
 """Rich terminal output helpers for the CLI."""
 
 import difflib
+import functools
+import itertools
+import os
+import re
+import threading
 import time
 
 _LIVE_REFRESH_HZ = 8
@@ -8,7 +13,10 @@ _SPINNER_REFRESH_HZ = 4
 _SPINNER_FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
 _MAX_DIFF_LINES = 80
 _MAX_ARG_DISPLAY = 80
+_MAX_ARG_ITEMS = 10
 _SHORT_SESSION_ID_LEN = 12
+_PLAIN_FLUSH_BYTES = 4096
+_PLAIN_FLUSH_INTERVAL = 0.05
 
 from rich.align import Align
 from rich.console import Console
@@ -16,26 +24,179 @@ from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.rule import Rule
+from rich.segment import Segment
 from rich.spinner import Spinner
 from rich.syntax import Syntax
 from rich.status import Status
+from rich.style import Style
 from rich.text import Text
 
+# Pre-built styles so frequent output skips markup and style-string parsing.
+_DIM_STYLE = Style(dim=True)
+_ERROR_STYLE = Style(color="red")
+_WARNING_STYLE = Style(color="yellow")
+_SUCCESS_STYLE = Style(color="green")
+_CONFIG_VALUE_STYLE = Style(color="#888888")
+
+
+@functools.lru_cache(maxsize=4)
+def _markdown(text: str) -> Markdown:
+    """Parse ``text`` into a Markdown renderable, reusing recent parses.
+
+    A replayed or retried response renders the same text again; the small
+    cache skips re-parsing it while bounding the memory held.
+    """
+    return Markdown(text)
+
+
+clear_md_cache = _markdown.cache_clear
+
+
+@functools.lru_cache(maxsize=8)
+def _split_keepends(content: str) -> tuple[str, ...]:
+    """Split ``content`` into lines with endings, reusing recent splits.
+
+    Consecutive edit previews of one file pass the same pre-edit content
+    again.  The cache is kept small because each entry pins a whole file.
+    """
+    return tuple(content.splitlines(keepends=True))
+
+@functools.lru_cache(maxsize=None)
+def _diff_lexer():
+    """Return a shared Pygments diff lexer for diff previews."""
+    from pygments.lexers import get_lexer_by_name
+
+    return get_lexer_by_name("diff")
+
+
+_HUNK_HEADER_RE = re.compile(r"@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@")
+
+
+def _unified_diff(
+    old_lines: tuple[str, ...],
+    new_lines: tuple[str, ...],
+    fromfile: str,
+    tofile: str,
+    n: int = 3,
+):
+    """Yield ``difflib.unified_diff`` lines, matching only the changed region.
+
+    Lines shared at the start and end of both inputs are trimmed (keeping
+    ``n`` lines of context) before the SequenceMatcher runs, so a small edit
+    in a large file costs O(edit) matching instead of O(file).  Hunk headers
+    are shifted back to the original line numbers.
+    """
+    limit = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+    head = max(prefix - n, 0)
+    tail = max(suffix - n, 0)
+
+    lines = difflib.unified_diff(
+        old_lines[head:len(old_lines) - tail],
+        new_lines[head:len(new_lines) - tail],
+        fromfile=fromfile,
+        tofile=tofile,
+        n=n,
+    )
+    if not head:
+        yield from lines
+        return
+
+    def shift(match: re.Match) -> str:
+        old_start = int(match.group(1)) + head
+        new_start = int(match.group(3)) + head
+        return f"@@ -{old_start}{match.group(2) or ''} +{new_start}{match.group(4) or ''} @@"
+
+    for line in lines:
+        if line.startswith("@@ "):
+            line = _HUNK_HEADER_RE.sub(shift, line, count=1)
+        yield line
+
+
+_FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})")
+# Lines that may continue the previous block across a blank line: list
+# items, block quotes and indented content.
+# Link reference definitions (``[foo]: http://...``) apply to the whole
+# document, so once one appears blocks can no longer be parsed in isolation.
+_LINK_REF_DEF_RE = re.compile(r"^ {0,3}\[[^\]\n]+\]:", re.MULTILINE)
+_CONTINUATION_RE = re.compile(r"\s|[-+*>]|\d{1,9}[.)]")
+
+
+def _stable_prefix_end(text: str, start: int) -> int:
+    """Return the offset up to which streamed markdown blocks are complete.
+
+    A block is complete once a blank line is followed by a full line that
+    starts a new top-level block outside any code fence.  Such a prefix
+    renders the same on its own, so it never has to be parsed again.
+
+    Args:
+        text: Accumulated markdown text.
+        start: Offset of the first character not yet known to be stable;
+            always outside a code fence.
+
+    Returns:
+        Offset where the next unfinished block begins (``start`` if none).
+    """
+    stable = start
+    fence: str | None = None
+    prev_blank = False
+    pos = start
+    while True:
+        nl = text.find("\n", pos)
+        if nl == -1:
+            return stable  # the last line is still streaming in
+        line = text[pos:nl]
+        match = _FENCE_RE.match(line)
+        if fence is not None:
+            if match and match.group(1).startswith(fence):
+                fence = None
+        elif not line.strip():
+            prev_blank = True
+            pos = nl + 1
+            continue
+        else:
+            if prev_blank and not _CONTINUATION_RE.match(line):
+                stable = pos
+            if match:
+                fence = match.group(1)
+        prev_blank = False
+        pos = nl + 1
+
 
 class _LazyMarkdown:
     """Renderable that rebuilds Markdown only when text has changed.
 
-    Rich Live calls ``__rich_console__`` at most ``refresh_per_second`` times.
-    This avoids building a new ``Markdown`` object on every token received.
+    Rich Live calls ``__rich_console__`` at most ``refresh_per_second`` times
+    from its refresh thread.  The producer's ``append`` only records the
+    delta and sets a dirty flag; the join and Markdown rebuild happen on the
+    next refresh, so their cost follows the refresh rate, not the token rate.
+    Completed top-level blocks are parsed once and kept; each refresh only
+    re-parses the unfinished tail (unless the text defines link references).
     While waiting for the first token it renders an animated spinner instead.
     When thinking tokens arrive they are shown in a dim panel above the content.
     """
 
     def __init__(self) -> None:
-        self._text = ""
+        # Deltas are collected in lists and joined only when a refresh needs
+        # them; ``str +=`` would recopy the whole buffer on every token.  The
+        # lock keeps a refresh from collapsing a list the producer is
+        # appending to.
+        self._lock = threading.Lock()
+        self._chunks: list[str] = []
+        self._dirty = False
         self._cached: Markdown | None = None
+        self._stable_blocks: list[Markdown] = []
+        self._stable_len = 0
+        self._ref_scan_pos = 0
+        self._has_link_refs = False
         self._thinking = False
-        self._thinking_text = ""
+        self._thinking_chunks: list[str] = []
+        self._thinking_dirty = False
         self._thinking_cached: Panel | None = None
         self._spinner = Spinner("dots", text=Text(" Thinking...", style="dim"))
 
@@ -44,33 +205,76 @@ class _LazyMarkdown:
         self._thinking = True
 
     def append(self, delta: str) -> None:
-        """Append new text, invalidate the cache, and stop the spinner."""
-        self._thinking = False
-        self._text += delta
-        self._cached = None
+        """Append new text, mark the render stale, and stop the spinner."""
+        with self._lock:
+            self._thinking = False
+            self._chunks.append(delta)
+            self._dirty = True
 
     def append_thinking(self, delta: str) -> None:
-        """Append thinking text, invalidate the thinking cache, and stop the spinner."""
-        self._thinking = False
-        self._thinking_text += delta
-        self._thinking_cached = None
+        """Append thinking text, mark the panel stale, and stop the spinner."""
+        with self._lock:
+            self._thinking = False
+            self._thinking_chunks.append(delta)
+            self._thinking_dirty = True
+
+    @staticmethod
+    def _collapse(chunks: list[str]) -> str:
+        """Join ``chunks`` in place into a single string and return it."""
+        if len(chunks) > 1:
+            chunks[:] = ["".join(chunks)]
+        return chunks[0] if chunks else ""
+
+    @property
+    def text(self) -> str:
+        """Return the accumulated response text."""
+        with self._lock:
+            return self._collapse(self._chunks)
+
+    def _rebuild(self, text: str) -> Markdown:
+        """Move newly completed blocks into the stable list and parse the tail.
+
+        Once the text contains a link reference definition, earlier blocks
+        may depend on it, so freezing stops and the whole text is parsed.
+        """
+        if not self._has_link_refs:
+            # Rescan from the start of the last (possibly partial) line only.
+            self._has_link_refs = _LINK_REF_DEF_RE.search(text, self._ref_scan_pos) is not None
+            self._ref_scan_pos = text.rfind("\n") + 1
+        if self._has_link_refs:
+            self._stable_blocks.clear()
+            self._stable_len = 0
+            return Markdown(text)
+        end = _stable_prefix_end(text, self._stable_len)
+        if end > self._stable_len:
+            self._stable_blocks.append(Markdown(text[self._stable_len:end]))
+            self._stable_len = end
+        return Markdown(text[self._stable_len:])
 
     def __rich_console__(self, console, options):
-        if self._thinking and not self._text and not self._thinking_text:
+        with self._lock:
+            text = self._collapse(self._chunks) if self._dirty else None
+            thinking = self._collapse(self._thinking_chunks) if self._thinking_dirty else None
+            self._dirty = self._thinking_dirty = False
+            show_spinner = self._thinking and not self._chunks and not self._thinking_chunks
+        if show_spinner:
             yield from self._spinner.__rich_console__(console, options)
             return
-        if self._thinking_text:
-            if self._thinking_cached is None:
-                self._thinking_cached = Panel(
-                    Text(self._thinking_text, style="dim"),
-                    title=Text("Thinking", style="dim italic"),
-                    border_style="dim",
-                    padding=(0, 1),
-                )
+        if thinking is not None:
+            self._thinking_cached = Panel(
+                Text(thinking, style="dim"),
+                title=Text("Thinking", style="dim italic"),
+                border_style="dim",
+                padding=(0, 1),
+            )
+        if self._thinking_cached is not None:
             yield from self._thinking_cached.__rich_console__(console, options)
-        if self._text:
-            if self._cached is None:
-                self._cached = Markdown(self._text)
+        if text is not None:
+            self._cached = self._rebuild(text)
+        if self._cached is not None:
+            for block in self._stable_blocks:
+                yield from block.__rich_console__(console, options)
+                yield Segment.line()
             yield from self._cached.__rich_console__(console, options)
 
 
@@ -114,41 +318,67 @@ class StreamingDisplay:
     @property
     def full_text(self) -> str:
         """Return the accumulated text."""
-        return self._renderable._text
+        return self._renderable.text
 
 
 class PlainStreamingDisplay:
     """Fallback streaming display for non-capable terminals (piped/dumb).
 
-    Uses plain print() calls instead of Rich Live.
+    Uses plain print() calls instead of Rich Live.  Deltas are written in
+    batches (every ``_PLAIN_FLUSH_BYTES`` characters or
+    ``_PLAIN_FLUSH_INTERVAL`` seconds) rather than one write and flush per
+    token; anything pending is written on exit.
     """
 
     def __init__(self) -> None:
-        self._text = ""
+        self._chunks: list[str] = []
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._last_flush = 0.0
 
     def __enter__(self) -> "PlainStreamingDisplay":
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self._text.strip():
+        self._flush()
+        # Stops at the first non-blank chunk instead of joining the response.
+        if any(chunk.strip() for chunk in self._chunks):
             print()
 
     def start_thinking(self) -> None:
         """No-op for plain display."""
 
     def update(self, delta: str) -> None:
-        """Print delta directly to stdout."""
-        self._text += delta
-        print(delta, end="", flush=True)
+        """Queue delta for stdout."""
+        self._chunks.append(delta)
+        self._write(delta)
 
     def update_thinking(self, delta: str) -> None:
-        """Print thinking token prefixed with a dim marker (plain fallback)."""
-        print(delta, end="", flush=True)
+        """Queue thinking token for stdout (plain fallback)."""
+        self._write(delta)
+
+    def _write(self, delta: str) -> None:
+        """Buffer ``delta`` and flush once the size or time threshold is hit."""
+        self._pending.append(delta)
+        self._pending_size += len(delta)
+        if (
+            self._pending_size >= _PLAIN_FLUSH_BYTES
+            or time.monotonic() - self._last_flush >= _PLAIN_FLUSH_INTERVAL
+        ):
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write out any buffered deltas."""
+        if self._pending:
+            print("".join(self._pending), end="", flush=True)
+            self._pending.clear()
+            self._pending_size = 0
+        self._last_flush = time.monotonic()
 
     @property
     def full_text(self) -> str:
         """Return the accumulated text."""
-        return self._text
+        return "".join(self._chunks)
 
 
 class BufferedMarkdownDisplay:
@@ -163,8 +393,8 @@ class BufferedMarkdownDisplay:
 
     def __init__(self, console: Console) -> None:
         self._console = console
-        self._text = ""
-        self._thinking_text = ""
+        self._chunks: list[str] = []
+        self._thinking_chunks: list[str] = []
         self._status: Status | None = None
 
     def __enter__(self) -> "BufferedMarkdownDisplay":
@@ -174,15 +404,17 @@ class BufferedMarkdownDisplay:
         if self._status is not None:
             self._status.stop()
             self._status = None
-        if self._thinking_text.strip():
+        thinking_text = "".join(self._thinking_chunks)
+        if thinking_text.strip():
             self._console.print(Panel(
-                Text(self._thinking_text, style="dim"),
+                Text(thinking_text, style="dim"),
                 title=Text("Thinking", style="dim italic"),
                 border_style="dim",
                 padding=(0, 1),
             ))
-        if self._text.strip():
-            self._console.print(Markdown(self._text))
+        text = self.full_text
+        if text.strip():
+            self._console.print(_markdown(text))
 
     def start_thinking(self) -> None:
         """Show an animated spinner while waiting for the first token."""
@@ -196,19 +428,19 @@ class BufferedMarkdownDisplay:
         if self._status is not None:
             self._status.stop()
             self._status = None
-        self._text += delta
+        self._chunks.append(delta)
 
     def update_thinking(self, delta: str) -> None:
         """Buffer thinking token; stop spinner on first thinking token."""
         if self._status is not None:
             self._status.stop()
             self._status = None
-        self._thinking_text += delta
+        self._thinking_chunks.append(delta)
 
     @property
     def full_text(self) -> str:
         """Return the accumulated text."""
-        return self._text
+        return "".join(self._chunks)
 
 
 class _TimedSpinnerRenderable:
@@ -269,15 +501,46 @@ class TimedSpinner:
             self._live = None
 
 
+_default_console: Console | None = None
+
+
+def _get_default_console() -> Console:
+    """Return the process-wide Console, creating it on first use.
+
+    Constructing a ``Console`` probes the terminal (tty, size, colour
+    support), so every ``Renderer`` shares one instance.  Tests that need
+    their own console assign ``renderer.console`` directly.
+    """
+    global _default_console
+    if _default_console is None:
+        _default_console = Console()
+    return _default_console
+
+
 class Renderer:
     """Render markdown and styled status/error output in terminal."""
 
     def __init__(self) -> None:
-        self.console = Console()
+        self.console = _get_default_console()
+        self._terminal_console: Console | None = None
+        self._terminal = False
+
+    @property
+    def _is_terminal(self) -> bool:
+        """Whether ``self.console`` is a terminal, probed once per console.
+
+        Keyed on the console object so assigning a different
+        ``renderer.console`` re-probes instead of using a stale answer.
+        """
+        console = self.console
+        if console is not self._terminal_console:
+            self._terminal = console.is_terminal
+            self._terminal_console = console
+        return self._terminal
 
     def render_markdown(self, text: str) -> None:
         """Render markdown content with Rich formatting."""
-        self.console.print(Markdown(text))
+        self.console.print(_markdown(text))
 
     def render_streaming_live(self) -> "StreamingDisplay | BufferedMarkdownDisplay | PlainStreamingDisplay":
         """Return a streaming display context manager.
@@ -293,10 +556,9 @@ class Renderer:
         Returns:
             A streaming display context manager.
         """
-        import os
         import sys
 
-        if not self.console.is_terminal:
+        if not self._is_terminal:
             return PlainStreamingDisplay()
         if sys.platform == "win32" and not os.environ.get("CODING_AGENT_FORCE_STREAMING"):
             return BufferedMarkdownDisplay(self.console)
@@ -304,19 +566,37 @@ class Renderer:
 
     def print_error(self, message: str) -> None:
         """Print a styled error message."""
-        self.console.print(f"[red]{message}[/red]", highlight=False)
+        self.console.print(Text(message, style=_ERROR_STYLE), highlight=False)
 
     def print_info(self, message: str) -> None:
         """Print a styled informational message."""
-        self.console.print(f"[dim]{message}[/dim]", highlight=False)
+        self.console.print(Text(message, style=_DIM_STYLE), highlight=False)
 
     def print_warning(self, message: str) -> None:
         """Print a styled warning message."""
-        self.console.print(f"[yellow]{message}[/yellow]", highlight=False)
+        self.console.print(Text(message, style=_WARNING_STYLE), highlight=False)
 
     def print_success(self, message: str) -> None:
         """Print a styled success message."""
-        self.console.print(f"[green]{message}[/green]", highlight=False)
+        self.console.print(Text(message, style=_SUCCESS_STYLE), highlight=False)
+
+    def print_lines(self, messages: list[tuple[str, str]]) -> None:
+        """Print several styled lines in a single console render.
+
+        Adjacent lines that share a style are written as one run, so a burst
+        of messages costs one render pass instead of one per line.
+
+        Args:
+            messages: ``(message, style)`` pairs, e.g. ``("boom", "red")``.
+        """
+        if not messages:
+            return
+        text = Text()
+        for i, (message, style) in enumerate(messages):
+            if i:
+                text.append("\n")
+            text.append(message, style=style)
+        self.console.print(text, highlight=False)
 
     def status_spinner(self, message: str) -> "TimedSpinner":
         """Return a spinner context manager with live elapsed time.
@@ -374,12 +654,15 @@ class Renderer:
         Args:
             config_items: Dict of config key -> value to display.
         """
-        for key, value in config_items.items():
-            line = Text.assemble(
-                (f"{key}: ", "dim"),
-                (value, "#888888"),
-            )
-            self.console.print(line, highlight=False)
+        if not config_items:
+            return
+        text = Text()
+        for i, (key, value) in enumerate(config_items.items()):
+            if i:
+                text.append("\n")
+            text.append(f"{key}: ", style=_DIM_STYLE)
+            text.append(value, style=_CONFIG_VALUE_STYLE)
+        self.console.print(text, highlight=False)
 
     def render_status_line(self, model: str, token_count: int | None, session_id: str | None) -> None:
         """Render compact status line after each assistant response.
@@ -396,7 +679,7 @@ class Renderer:
             short_id = session_id[:_SHORT_SESSION_ID_LEN] + "..." if len(session_id) > _SHORT_SESSION_ID_LEN else session_id
             parts.append(short_id)
 
-        line = Text(" | ".join(parts), style="dim")
+        line = Text(" | ".join(parts), style=_DIM_STYLE)
         self.console.print(line)
 
     def render_tool_panel(self, tool_name: str, tool_args: dict) -> None:
@@ -405,10 +688,26 @@ class Renderer:
         Args:
             tool_name: Name of the tool being executed
             tool_args: Dictionary of tool arguments
+
+        Skipped on non-terminal output (CI, log capture) unless
+        ``CODING_AGENT_FORCE_RENDER=1`` is set.
         """
+        if not self._is_terminal and not os.environ.get("CODING_AGENT_FORCE_RENDER"):
+            return
         self.console.print(f"[dim]→[/dim] [blue]{tool_name}[/blue]", highlight=False)
+        # Newline collapsing can at most halve a string, so this many source
+        # characters always decide the truncated display exactly.
+        source_limit = 2 * _MAX_ARG_DISPLAY + 2
         for key, value in tool_args.items():
-            value_str = str(value).replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+            if isinstance(value, str):
+                value_str = value[:source_limit]
+            elif isinstance(value, (bytes, bytearray)):
+                value_str = bytes(value[:source_limit]).decode("utf-8", "replace")
+            elif isinstance(value, (list, tuple, dict)) and len(value) > _MAX_ARG_ITEMS:
+                value_str = f"<{type(value).__name__} len={len(value)}>"
+            else:
+                value_str = str(value)
+            value_str = value_str.replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
             if len(value_str) > _MAX_ARG_DISPLAY:
                 value_str = value_str[:_MAX_ARG_DISPLAY - 1] + "…"
             self.console.print(f"[dim]{key}:[/dim] {value_str}", highlight=False)
@@ -421,17 +720,22 @@ class Renderer:
             new_content: New file content
             file_path: File path for diff header labels
         """
-        diff = list(difflib.unified_diff(
-            old_content.splitlines(keepends=True),
-            new_content.splitlines(keepends=True),
+        if old_content == new_content:
+            return
+        diff_iter = _unified_diff(
+            _split_keepends(old_content),
+            _split_keepends(new_content),
             fromfile=f"a/{file_path}" if file_path else "before",
             tofile=f"b/{file_path}" if file_path else "after",
             n=3,
-        ))
-        if not diff:
+        )
+        # Only the visible head is kept; the rest is counted, not stored.
+        shown = list(itertools.islice(diff_iter, _MAX_DIFF_LINES))
+        if not shown:
             return
-        diff_text = "".join(diff[:_MAX_DIFF_LINES])
-        if len(diff) > _MAX_DIFF_LINES:
-            diff_text += f"\n  ... ({len(diff) - _MAX_DIFF_LINES} more lines)"
-        self.console.print(Syntax(diff_text, "diff", theme="ansi_dark"))
+        diff_text = "".join(shown)
+        remaining = sum(1 for _ in diff_iter)
+        if remaining:
+            diff_text += f"\n  ... ({remaining} more lines)"
+        self.console.print(Syntax(diff_text, _diff_lexer(), theme="ansi_dark"))
 
@@ -1,6 +1,7 @@
 """Bottom toolbar content for the prompt session."""
 
 import shutil
+from collections import namedtuple
 
 from coding_agent.workflow import Workflow, WorkflowState
 
@@ -19,6 +20,16 @@ _WORKFLOW_STYLE_MAP = {
 }
 
 _SEP = ("fg:#555555", "  │  ")
+_PAD = ("", " ")
+_DIM = "fg:#888888"
+_CTX_LABEL = (_DIM, "ctx ")
+_TEAM_PARTS = [("fg:ansibrightyellow bold", "⚡ TEAM"), _SEP]
+
+# Everything the toolbar displays; an unchanged key means an unchanged toolbar.
+_StateKey = namedtuple(
+    "_StateKey",
+    "token_count sub_agent model team_mode state total completed blocked in_progress_desc",
+)
 
 
 def _make_context_bar(percentage: float, width: int = _CTX_BAR_WIDTH) -> str:
@@ -62,9 +73,44 @@ def make_toolbar(
         A callable that returns a list of (style, text) tuples (FormattedText).
     """
 
+    # The branch is fixed for the life of the prompt, so its fragment is built once.
+    branch_style = _DIM if branch in ("N/A", "", "unknown") else "fg:ansiwhite"
+    branch_part = (branch_style, f"⎇  {branch}")
+
+    last_key: list["_StateKey | None"] = [None]
+    last_parts: list[list[tuple[str, str]]] = [[]]
+
     def _toolbar() -> list[tuple[str, str]]:
-        token_count = getattr(conversation, "token_count", 0)
-        percentage = (token_count / context_limit) * 100
+        # Snapshot everything the toolbar shows; prompt_toolkit redraws on every
+        # keystroke, and while the user is typing none of this changes.
+        state = workflow.state if workflow else WorkflowState.IDLE
+        total = completed = blocked = 0
+        in_progress_desc = None
+        if workflow and workflow.todo_list.total > 0:
+            todos = workflow.todo_list
+            total = todos.total
+            completed = todos.completed_count
+            blocked = len(todos.get_blocked())
+            in_progress = next(
+                (i for i in todos.items if i.status.value == "in_progress"), None
+            )
+            if in_progress:
+                in_progress_desc = in_progress.description
+        key = _StateKey(
+            getattr(conversation, "token_count", 0),
+            get_active_sub_agent() if get_active_sub_agent is not None else None,
+            get_model() if get_model is not None else None,
+            get_team_mode() if get_team_mode is not None else False,
+            state,
+            total,
+            completed,
+            blocked,
+            in_progress_desc,
+        )
+        if key == last_key[0]:
+            return last_parts[0]
+
+        percentage = (key.token_count / context_limit) * 100
 
         if percentage > _CTX_CRITICAL:
             ctx_style = "fg:ansibrightred bold"
@@ -73,73 +119,57 @@ def make_toolbar(
         else:
             ctx_style = "fg:ansibrightgreen"
 
-        parts: list[tuple[str, str]] = [("", " ")]
+        parts: list[tuple[str, str]] = [_PAD]
 
         # Sub-agent indicator — shown prominently when active
-        active_sub_agent = get_active_sub_agent() if get_active_sub_agent is not None else None
-        if active_sub_agent:
+        if key.sub_agent:
             parts += [
-                ("fg:ansibrightmagenta bold", f"◈ {active_sub_agent.capitalize()}"),
+                ("fg:ansibrightmagenta bold", f"◈ {key.sub_agent.capitalize()}"),
                 _SEP,
             ]
 
         # Model name
-        model_name = get_model() if get_model is not None else None
-        if model_name:
-            short_model = model_name.split("/")[-1] if "/" in model_name else model_name
+        if key.model:
+            short_model = key.model.split("/")[-1] if "/" in key.model else key.model
             parts += [
                 ("fg:ansicyan", f"◉ {short_model}"),
                 _SEP,
             ]
 
         # Team mode indicator
-        team_mode = get_team_mode() if get_team_mode is not None else False
-        if team_mode:
-            parts += [
-                ("fg:ansibrightyellow bold", "⚡ TEAM"),
-                _SEP,
-            ]
+        if key.team_mode:
+            parts += _TEAM_PARTS
 
         # Context usage bar
         ctx_bar = _make_context_bar(percentage)
         parts += [
-            ("fg:#888888", "ctx "),
+            _CTX_LABEL,
             (ctx_style, ctx_bar),
-            ("fg:#888888", f" {percentage:.0f}%"),
+            (_DIM, f" {percentage:.0f}%"),
             _SEP,
-        ]
-
-        # Git branch — dim when unknown
-        branch_style = "fg:#888888" if branch in ("N/A", "", "unknown") else "fg:ansiwhite"
-        parts += [
-            (branch_style, f"⎇  {branch}"),
+            branch_part,  # dim when unknown
         ]
 
         # Workflow state
-        if workflow and workflow.state != WorkflowState.IDLE:
-            wf_style = _WORKFLOW_STYLE_MAP.get(workflow.state, "")
+        if state != WorkflowState.IDLE:
+            wf_style = _WORKFLOW_STYLE_MAP.get(state, "")
             parts += [
                 _SEP,
-                (wf_style, f"● {workflow.state.value}"),
+                (wf_style, f"● {state.value}"),
             ]
 
         # Todo progress
-        if workflow and workflow.todo_list.total > 0:
-            todos = workflow.todo_list
-            in_progress = next(
-                (i for i in todos.items if i.status.value == "in_progress"), None
-            )
-            blocked_count = len(todos.get_blocked())
-            summary = f"{todos.completed_count}/{todos.total}"
-            if blocked_count:
-                summary += f" ✗{blocked_count}"
-            if in_progress:
-                desc = in_progress.description
+        if total > 0:
+            summary = f"{completed}/{total}"
+            if blocked:
+                summary += f" ✗{blocked}"
+            if in_progress_desc:
+                desc = in_progress_desc
                 label = desc[:28] + "…" if len(desc) > 28 else desc
                 parts += [
                     _SEP,
                     ("fg:ansibrightcyan", f"✦ {summary}"),
-                    ("fg:#888888", f"  ▶ {label}"),
+                    (_DIM, f"  ▶ {label}"),
                 ]
             else:
                 parts += [
@@ -147,7 +177,9 @@ def make_toolbar(
                     ("fg:ansibrightcyan", f"✦ {summary}"),
                 ]
 
-        parts.append(("", " "))
+        parts.append(_PAD)
+        last_key[0] = key
+        last_parts[0] = parts
         return parts
 
     return _toolbar
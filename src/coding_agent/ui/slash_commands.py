@@ -10,7 +10,6 @@ from socket import timeout as socket_timeout
 
 import yaml
 
-import litellm
 from prompt_toolkit.completion import Completer, Completion
 from rich.table import Table
 
@@ -577,6 +576,8 @@ def cmd_model(args: str, conversation: ConversationManager, session_manager: Ses
 
     # Validate the model by making a test completion call
     # Note: litellm.validate_model() does not exist - using test completion instead
+    import litellm
+
     try:
         litellm.completion(
             model=model_name,
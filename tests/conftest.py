@@ -10,6 +10,24 @@ from coding_agent.core.tool_guard import ToolGuard
 from coding_agent.core.tool_result import ToolResult
 
 
+@pytest.fixture(autouse=True)
+def _isolated_capabilities_cache(tmp_path, monkeypatch):
+    """Keep the persisted model capabilities cache out of the real home directory."""
+    import coding_agent.config.config as config_module
+
+    monkeypatch.setattr(config_module, "_capabilities_cache_path", lambda: tmp_path / "model_capabilities.json")
+
+
+@pytest.fixture(autouse=True)
+def _clear_git_root_cache():
+    """Tests create .git folders on the fly, so never reuse a cached lookup."""
+    from coding_agent.config.project_instructions import clear_git_root_cache
+
+    clear_git_root_cache()
+    yield
+    clear_git_root_cache()
+
+
 @pytest.fixture
 def workspace(tmp_path):
     """A temporary directory that acts as the workspace root."""
@@ -273,3 +273,35 @@ class TestAgentToolFallback:
         assert result is False
         assert mock_llm.send_message_stream.call_count == 1  # No retry
         mock_renderer.print_error.assert_called()
+
+
+class TestAgentToolOutputIngestion:
+    """Tool output passes through the conversation's ingestion cap."""
+
+    @patch("coding_agent.core.agent.get_openai_tools")
+    def test_large_tool_output_is_capped_in_history(self, _):
+        """A large tool result is stored cut to the conversation's ingestion cap."""
+        from coding_agent.core.conversation import ConversationManager
+
+        conversation = ConversationManager("System")
+        renderer = MagicMock()
+        spinner = MagicMock()
+        spinner.__enter__ = MagicMock(return_value=spinner)
+        spinner.__exit__ = MagicMock(return_value=False)
+        renderer.status_spinner.return_value = spinner
+
+        tool_call = MagicMock()
+        tool_call.id = "tc_1"
+        tool_call.function.name = "shell"
+        tool_call.function.arguments = '{"command": "cat big.log"}'
+
+        with patch("coding_agent.core.agent.execute_tool") as mock_exec, \
+                patch("coding_agent.core.agent.PermissionSystem") as mock_perm_cls:
+            mock_exec.return_value = MagicMock(is_error=False, output="z" * 50000, message="")
+            mock_perm_cls.return_value.check_approval.return_value = True
+            agent = Agent(MagicMock(), conversation, renderer)
+            agent._handle_tool_call(tool_call)
+
+        stored = conversation.get_messages()[-1]
+        assert stored["role"] == "tool"
+        assert stored["content"] == "z" * 8000 + "\n...[truncated]"
@@ -394,6 +394,27 @@ class TestCLIOverrides:
         with pytest.raises(ConfigError):
             apply_cli_overrides(config, model=None, api_base="not-a-url")
 
+    def test_invalid_temperature_override_rejected(self):
+        """CLI --temperature outside the valid range is rejected by validation."""
+        config = self._base_config()
+        with pytest.raises(ConfigError, match="temperature"):
+            apply_cli_overrides(config, temperature=5.0)
+
+    def test_api_base_override_normalized(self):
+        """CLI --api-base override still runs the api_base validator."""
+        config = self._base_config()
+        result = apply_cli_overrides(config, api_base="https://new.server.com/")
+        assert result.api_base == "https://new.server.com"
+
+    def test_output_override_leaves_original_untouched(self):
+        """Output overrides produce a new OutputConfig without mutating the original."""
+        config = self._base_config()
+        result = apply_cli_overrides(config, output_enabled=False, output_max_lines=10)
+        assert result.output.enabled is False
+        assert result.output.max_lines == 10
+        assert config.output.enabled is True
+        assert config.output.max_lines == 50
+
 
 class TestCLIIntegration:
     """Test CLI integration with config loading."""
@@ -643,3 +664,46 @@ class TestCreateTemplateConfig:
         data = _yaml.safe_load(fake_path.read_text())
         assert data["model"] == "ollama_chat/llama3.2"
         assert data["api_base"] == OLLAMA_DEFAULT_API_BASE
+
+
+class TestModelCapabilitiesPersistence:
+    """Model capabilities survive restarts via a JSON file with a 30-day TTL."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        import coding_agent.config.config as config_module
+
+        monkeypatch.setattr(config_module, "_model_capabilities_cache", {})
+        monkeypatch.setattr(config_module, "_model_capabilities_ts", {})
+        monkeypatch.setattr(config_module, "_model_capabilities_loaded", False)
+        return config_module
+
+    def test_set_persists_and_reloads(self, fresh_cache, monkeypatch):
+        from coding_agent.config.config import ModelCapabilities
+
+        fresh_cache.set_model_capabilities("m", ModelCapabilities(False, True))
+        assert fresh_cache._capabilities_cache_path().exists()
+
+        monkeypatch.setattr(fresh_cache, "_model_capabilities_cache", {})
+        monkeypatch.setattr(fresh_cache, "_model_capabilities_loaded", False)
+        caps = fresh_cache.get_model_capabilities("m")
+        assert caps == ModelCapabilities(temperature_supported=False, top_p_supported=True)
+
+    def test_expired_entries_ignored(self, fresh_cache):
+        import json
+        import time
+
+        path = fresh_cache._capabilities_cache_path()
+        old = time.time() - 31 * 24 * 60 * 60
+        path.write_text(json.dumps({
+            "old": {"temperature_supported": True, "top_p_supported": True, "ts": old},
+            "legacy": {"temperature_supported": True, "top_p_supported": True},
+            "new": {"temperature_supported": True, "top_p_supported": False, "ts": time.time()},
+        }), encoding="utf-8")
+        assert fresh_cache.get_model_capabilities("old") is None
+        assert fresh_cache.get_model_capabilities("legacy") is None
+        assert fresh_cache.get_model_capabilities("new").top_p_supported is False
+
+    def test_corrupt_file_ignored(self, fresh_cache):
+        fresh_cache._capabilities_cache_path().write_text("{not json", encoding="utf-8")
+        assert fresh_cache.get_model_capabilities("m") is None
@@ -33,14 +33,25 @@ class TestConversationManager:
         assert len(messages) == 4
         assert messages[3] == {"role": "tool", "content": "file content here"}
 
-    def test_get_messages_returns_copy(self):
-        """get_messages() returns a copy, not the original list."""
+    def test_get_messages_copy_returns_copy(self):
+        """get_messages_copy() returns a copy, not the shared list."""
         cm = ConversationManager("System prompt")
         cm.add_message("user", "Hello")
-        messages = cm.get_messages()
+        messages = cm.get_messages_copy()
         messages.append({"role": "user", "content": "tampered"})
         assert len(cm.get_messages()) == 2  # Original unchanged
 
+    def test_get_messages_reuses_shared_list(self):
+        """get_messages() hands out the same up-to-date list without copying."""
+        cm = ConversationManager("System prompt")
+        first = cm.get_messages()
+        assert cm.get_messages() is first
+        cm.add_message("user", "Hello")
+        assert cm.get_messages() is first
+        assert first[-1] == {"role": "user", "content": "Hello"}
+        cm._remove_oldest_message_pair()
+        assert cm.get_messages() == [{"role": "system", "content": "System prompt"}]
+
     def test_system_prompt_included(self):
         """get_messages() includes system prompt."""
         cm = ConversationManager("Important system prompt")
@@ -225,3 +236,331 @@ class TestConversationManager:
         tool_msg = [m for m in messages if m.get("role") == "tool"][0]
         assert len(tool_msg["content"]) < len(long_output)
         assert "[truncated]" in tool_msg["content"]
+
+    def test_tool_call_id_kwarg_round_trips(self):
+        """add_message() keeps tool_call_id and extra fields in the API dict."""
+        cm = ConversationManager("System")
+        cm.add_message("tool", "ok", tool_call_id="c1")
+        assert cm.get_messages()[1] == {"role": "tool", "content": "ok", "tool_call_id": "c1"}
+
+    def test_append_to_system_prompt(self):
+        """append_to_system_prompt() extends the system prompt in place."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "Hello")
+        cm.append_to_system_prompt("\nExtra")
+        messages = cm.get_messages()
+        assert messages[0] == {"role": "system", "content": "System\nExtra"}
+        assert len(messages) == 2
+
+    def test_heuristic_counts_utf8_bytes_and_tool_arguments(self):
+        """_estimate_tokens_heuristic() counts UTF-8 bytes and tool-call arguments."""
+        cm = ConversationManager("")
+        cm.add_message("user", "é" * 4)  # 8 bytes -> 2 tokens
+        assert cm._estimate_tokens_heuristic() == 2
+        cm.add_assistant_tool_call("", [{"id": "c1", "name": "shell", "arguments": "x" * 40}])
+        assert cm._estimate_tokens_heuristic() == 2 + 10 + 50
+
+    def test_heuristic_running_total_tracks_removals(self):
+        """Running heuristic totals stay consistent after prune, removal and clear."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "List files")
+        cm.add_assistant_tool_call("", [{"id": "c1", "name": "shell", "arguments": "{}"}])
+        cm.add_tool_result("c1", "file1.txt\n" * 500)
+        cm._prune_oldest_tool_output()
+        cm._remove_oldest_message_pair()
+        expected = sum(len(m["content"] or "") for m in cm.get_messages()) // 4 + 50
+        assert cm._estimate_tokens_heuristic() == expected
+        cm.clear()
+        assert cm._estimate_tokens_heuristic() == len("System") // 4
+
+    def test_estimate_tokens_matches_full_count(self):
+        """Per-message cached counts sum to litellm's whole-conversation count."""
+        import litellm
+
+        cm = ConversationManager("System prompt")
+        cm.add_message("user", "Hello there friend")
+        cm.add_assistant_tool_call("Hi", [{"id": "c1", "name": "shell", "arguments": '{"command":"ls"}'}])
+        cm.add_tool_result("c1", "file1.py\nfile2.py")
+        expected = litellm.token_counter(model="gpt-4", messages=cm.get_messages())
+        assert cm._estimate_tokens() == expected
+
+    def test_estimate_tokens_only_counts_new_messages(self):
+        """_estimate_tokens() tokenizes each message once across calls."""
+        from unittest.mock import patch
+
+        from coding_agent.core import conversation
+
+        conversation._token_count_cache.clear()
+        cm = ConversationManager("System")
+        cm.add_message("user", "Hello")
+        with patch("litellm.token_counter", return_value=5) as counter:
+            cm._estimate_tokens()
+            first_calls = counter.call_count
+            cm._estimate_tokens()
+            assert counter.call_count == first_calls
+            cm.add_message("assistant", "Hi")
+            cm._estimate_tokens()
+            assert counter.call_count == first_calls + 1
+
+    def test_token_counts_shared_across_conversations(self):
+        """Identical messages are tokenized once across ConversationManager instances."""
+        from unittest.mock import patch
+
+        from coding_agent.core import conversation
+
+        conversation._token_count_cache.clear()
+        with patch("litellm.token_counter", return_value=7) as counter:
+            for _ in range(3):
+                cm = ConversationManager("Shared system prompt")
+                cm.add_message("user", "Same question")
+                cm._estimate_tokens()
+            # priming + system + user, counted once each
+            assert counter.call_count == 3
+        conversation._token_count_cache.clear()
+
+    def test_prune_skips_already_pruned_outputs(self):
+        """Successive prunes move on to the next long output, oldest first."""
+        cm = ConversationManager("System")
+        cm.add_message("tool", "a" * 5000)  # no separators: stays just over the cap
+        cm.add_message("tool", "b" * 5000)
+        assert cm._prune_oldest_tool_output() is True
+        assert cm._prune_oldest_tool_output() is True
+        messages = cm.get_messages()
+        assert messages[1]["content"].startswith("a")
+        assert messages[2]["content"].startswith("b")
+        assert "[truncated]" in messages[2]["content"]
+        assert cm._prune_oldest_tool_output() is False
+
+    def test_prune_resumes_after_removal_and_new_outputs(self):
+        """Removing older messages and adding new long outputs keeps pruning correct."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "First")
+        cm.add_message("tool", "x" * 5000)
+        assert cm._prune_oldest_tool_output() is True
+        cm._remove_oldest_message_pair()
+        cm.add_message("tool", "y" * 5000)
+        assert cm._prune_oldest_tool_output() is True
+        assert "[truncated]" in cm.get_messages()[-1]["content"]
+
+    def test_remove_oldest_pair_removes_tool_block(self):
+        """_remove_oldest_message_pair() drops an assistant turn and its tool results together."""
+        cm = ConversationManager("System")
+        cm.add_assistant_tool_call("", [{"id": "c1", "name": "a", "arguments": "{}"},
+                                        {"id": "c2", "name": "b", "arguments": "{}"}])
+        cm.add_tool_result("c1", "one")
+        cm.add_tool_result("c2", "two")
+        cm.add_message("user", "Next")
+        assert cm._remove_oldest_message_pair() is True
+        assert cm.get_messages() == [
+            {"role": "system", "content": "System"},
+            {"role": "user", "content": "Next"},
+        ]
+        assert cm._estimate_tokens_heuristic() == len("SystemNext") // 4
+
+    def test_remove_oldest_pair_nothing_to_remove(self):
+        """_remove_oldest_message_pair() returns False when only system messages remain."""
+        cm = ConversationManager("System")
+        assert cm._remove_oldest_message_pair() is False
+
+    def test_truncation_removes_pairs_in_one_deletion(self):
+        """truncate_if_needed() drops all excess pairs in a single slice deletion."""
+        cm = ConversationManager("System")
+        for i in range(50):
+            cm.add_message("user", f"Question {i}: " + "q" * 400)
+            cm.add_message("assistant", f"Answer {i}: " + "a" * 400)
+        deletions = []
+        original = cm._delete
+
+        def counting_delete(start, end):
+            deletions.append((start, end))
+            original(start, end)
+
+        cm._delete = counting_delete
+        cm.truncate_if_needed(max_tokens=2000)
+        assert cm.token_count <= 2000
+        assert len(deletions) == 1
+        messages = cm.get_messages()
+        assert messages[0]["role"] == "system"
+        assert messages[-1]["content"].startswith("Answer 49")
+
+    def test_truncation_stops_at_injected_system_message(self):
+        """Block removal never deletes a system message injected mid-conversation."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "Old " + "x" * 400)
+        cm.add_message("system", "Skill context")
+        cm.add_message("user", "New " + "y" * 400)
+        cm._remove_oldest_messages(10_000)
+        roles = [m["role"] for m in cm.get_messages()]
+        assert roles == ["system", "system", "user"]
+
+    def test_litellm_loaded_on_first_estimate(self):
+        """litellm is resolved lazily and cached by _get_litellm()."""
+        import litellm
+
+        from coding_agent.core import conversation
+
+        assert conversation._get_litellm() is litellm
+        assert conversation._litellm is litellm
+
+    def test_truncation_skips_exact_count_when_far_below_limit(self):
+        """truncate_if_needed() avoids litellm when the cheap estimate is well under the limit."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "Hello")
+        calls = [0]
+        original = cm._estimate_tokens
+
+        def counting_estimate():
+            calls[0] += 1
+            return original()
+
+        cm._estimate_tokens = counting_estimate
+        cm.truncate_if_needed(max_tokens=128000)
+        assert calls[0] == 0
+        cm.truncate_if_needed(max_tokens=1)
+        assert calls[0] > 0
+
+    def test_truncation_with_many_short_messages(self):
+        """Many tiny messages are truncated even though their byte total is small."""
+        cm = ConversationManager("System")
+        for _ in range(1000):
+            cm.add_message("user", "hi")
+
+        cm.truncate_if_needed(max_tokens=1000)
+
+        assert len(cm.get_messages()) < 1001
+        assert cm._estimate_tokens() <= 1000
+
+    def test_truncation_skips_pre_check_when_total_known_over_limit(self):
+        """A known exact total over the limit is never overridden by the cheap estimate."""
+        cm = ConversationManager("System")
+        for _ in range(50):
+            cm.add_message("user", "hi")
+        exact = cm.token_count
+
+        cm.truncate_if_needed(max_tokens=exact - 1)
+
+        assert cm.token_count <= exact - 1
+
+    def test_get_messages_simplified_exact_flattened_content(self):
+        """get_messages_simplified() joins content, tool calls and results in order."""
+        cm = ConversationManager("System")
+        cm.add_assistant_tool_call("Looking", [{"id": "c1", "name": "read", "arguments": '{"p":1}'}])
+        cm.add_tool_result("c1", "")
+        cm.add_tool_result("c2", "r" * 500)
+        cm.add_message("user", "Thanks")
+
+        simplified = cm.get_messages_simplified()
+
+        assert simplified[1]["content"] == (
+            'Looking\n[Tool: read({"p":1})]\n[Result: ' + "r" * 300 + "]"
+        )
+        assert simplified[2] == {"role": "user", "content": "Thanks"}
+
+    def test_tool_call_arguments_serialized_once(self):
+        """add_assistant_tool_call() stores dict arguments as a JSON string."""
+        cm = ConversationManager("")
+        cm.add_assistant_tool_call("", [{"id": "c1", "name": "shell", "arguments": {"command": "ls"}}])
+        stored = cm.get_messages()[1]["tool_calls"][0]["function"]["arguments"]
+        assert stored == '{"command": "ls"}'
+        assert cm._estimate_tokens_heuristic() == len(stored) // 4 + 50
+
+    def test_remove_message_never_removes_system_prompt(self):
+        """remove_message() keeps the system prompt pinned at index 0."""
+        cm = ConversationManager("Same text")
+        cm.add_message("system", "Same text")
+        assert cm.remove_message("Same text") is True
+        assert cm.get_messages() == [{"role": "system", "content": "Same text"}]
+        assert cm.remove_message("Same text") is False
+
+    def test_tool_output_capped_at_ingestion(self):
+        """Tool results beyond max_tool_output_chars are cut when added."""
+        cm = ConversationManager("System", max_tool_output_chars=100)
+        cm.add_tool_result("c1", "x" * 500)
+        cm.add_message("tool", "y" * 500, tool_call_id="c2")
+        cm.add_message("user", "z" * 500)
+        messages = cm.get_messages()
+        assert messages[1]["content"] == "x" * 100 + "\n...[truncated]"
+        assert messages[2]["content"] == "y" * 100 + "\n...[truncated]"
+        assert messages[3]["content"] == "z" * 500  # only tool output is capped
+
+    def test_truncation_uses_known_total_without_estimating(self):
+        """truncate_if_needed() returns early when the counted total is under the limit."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "x" * 400)
+        total = cm.token_count
+        calls = [0]
+        original = cm._estimate_tokens
+
+        def counting_estimate():
+            calls[0] += 1
+            return original()
+
+        cm._estimate_tokens = counting_estimate
+        # Heuristic * slack exceeds this limit, but the exact total does not
+        cm.truncate_if_needed(max_tokens=total)
+        assert calls[0] == 0
+        assert len(cm.get_messages()) == 2
+
+    def test_roles_and_tool_names_interned(self):
+        """Roles and tool names are interned so repeated values share one object."""
+        import json
+        import sys
+
+        cm = ConversationManager("System")
+        restored = json.loads('[{"role": "user", "content": "a"}, {"role": "user", "content": "b"}]')
+        for msg in restored:
+            cm.add_message(msg["role"], msg["content"])
+        name = "".join(["file", "_read"])
+        cm.add_assistant_tool_call("", [{"id": "c1", "name": name, "arguments": "{}"}])
+        messages = cm.get_messages()
+        assert messages[1]["role"] is messages[2]["role"] is sys.intern("user")
+        assert messages[3]["tool_calls"][0]["function"]["name"] is sys.intern("file_read")
+
+    def test_messages_fingerprint_stable_and_content_sensitive(self):
+        """messages_fingerprint() is equal for identical histories and changes on mutation."""
+        def build(call_id):
+            cm = ConversationManager("System")
+            cm.add_message("user", "Go")
+            cm.add_assistant_tool_call("", [{"id": call_id, "name": "shell", "arguments": "{}"}])
+            cm.add_tool_result(call_id, "done")
+            return cm
+
+        a, b = build("c1"), build("c2")
+        assert a.messages_fingerprint() == b.messages_fingerprint()
+        assert len(a.messages_fingerprint()) == 16
+        before = a.messages_fingerprint()
+        a.add_message("user", "More")
+        assert a.messages_fingerprint() != before
+
+    def test_messages_fingerprint_respects_message_boundaries(self):
+        """Moving text between adjacent messages changes the fingerprint."""
+        a = ConversationManager("System")
+        a.add_message("user", "ab")
+        a.add_message("user", "c")
+        b = ConversationManager("System")
+        b.add_message("user", "a")
+        b.add_message("user", "bc")
+        assert a.messages_fingerprint() != b.messages_fingerprint()
+
+    def test_batch_defers_invalidation_until_exit(self):
+        """batch() keeps caches until the block exits, then invalidates once."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "Go")
+        before = cm.token_count
+        with cm.batch():
+            cm.add_assistant_tool_call("", [{"id": "c1", "name": "shell", "arguments": "{}"}])
+            cm.add_tool_result("c1", "x" * 400)
+            assert cm._token_cache == before
+        assert cm._token_cache is None
+        assert cm.token_count > before
+
+    def test_batch_does_not_hide_growth_from_truncation(self):
+        """truncate_if_needed() inside a batch ignores the stale cached total."""
+        cm = ConversationManager("System")
+        cm.add_message("user", "Go")
+        _ = cm.token_count
+        with cm.batch():
+            for i in range(20):
+                cm.add_message("user", f"{i} " + "word " * 200)
+            cm.truncate_if_needed(max_tokens=500)
+        assert cm.token_count <= 500
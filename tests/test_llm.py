@@ -56,16 +56,28 @@ class TestLLMClientInit:
         assert client.api_key is None
 
 
+class TestLazyLitellmImport:
+    """Importing the package does not pay for importing litellm."""
+
+    def test_cli_import_does_not_load_litellm(self):
+        import subprocess
+        import sys
+
+        code = "import sys, coding_agent.ui.cli; print('litellm' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "False"
+
+
 class TestVerifyConnectionSuccess:
     """AC #1: Successful connectivity verification."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_returns_without_error(self, mock_completion, config):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config)
         client.verify_connection()  # Should not raise
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_passes_correct_model(self, mock_completion, config):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config)
@@ -73,7 +85,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["model"] == "litellm/gpt-4o"
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_passes_correct_api_base(self, mock_completion, config):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config)
@@ -81,7 +93,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["api_base"] == "http://localhost:4000"
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_passes_api_key(self, mock_completion, config_with_key):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config_with_key)
@@ -89,7 +101,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["api_key"] == "sk-secret-key-12345"
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_passes_none_api_key(self, mock_completion, config):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config)
@@ -97,7 +109,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["api_key"] is None
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_uses_max_tokens_1(self, mock_completion, config):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config)
@@ -105,7 +117,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["max_tokens"] == 1
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_uses_short_timeout(self, mock_completion, config):
         mock_completion.return_value = MagicMock()
         client = LLMClient(config)
@@ -113,7 +125,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["timeout"] == 10
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_passes_temperature(self, mock_completion, config):
         """AC: temperature is passed to LiteLLM."""
         mock_completion.return_value = MagicMock()
@@ -123,7 +135,7 @@ class TestVerifyConnectionSuccess:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["temperature"] == 0.7
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_passes_top_p(self, mock_completion, config):
         """AC: top_p is passed to LiteLLM."""
         mock_completion.return_value = MagicMock()
@@ -134,10 +146,86 @@ class TestVerifyConnectionSuccess:
         assert call_kwargs["top_p"] == 0.9
 
 
+class TestHttpClientPool:
+    """Completions share one pooled keep-alive HTTP client."""
+
+    @patch("litellm.completion")
+    def test_verify_installs_shared_client_session(self, mock_completion, config):
+        import coding_agent.core.llm as llm_module
+
+        mock_completion.return_value = MagicMock()
+        with LLMClient(config) as client:
+            client.verify_connection()
+            first = litellm.client_session
+            assert first is llm_module._http_client
+            client.verify_connection()
+            assert litellm.client_session is first
+        # Closing one LLMClient leaves the process-wide pool to other users.
+        assert not first.is_closed
+        llm_module.close_http_client()
+        assert first.is_closed
+        assert litellm.client_session is None
+
+    @pytest.mark.parametrize("available", [True, False])
+    def test_http2_enabled_only_when_h2_installed(self, available, monkeypatch):
+        import coding_agent.core.llm as llm_module
+
+        monkeypatch.setattr(llm_module, "_HTTP2_AVAILABLE", available)
+        llm_module.close_http_client()
+        with patch("coding_agent.core.llm.httpx.Client") as mock_client_cls:
+            llm_module._get_http_client()
+        assert mock_client_cls.call_args[1]["http2"] is available
+        monkeypatch.setattr(llm_module, "_http_client", None)
+        litellm.client_session = None
+
+    def test_closed_client_is_recreated(self):
+        from coding_agent.core.llm import _get_http_client, close_http_client
+
+        first = _get_http_client()
+        close_http_client()
+        second = _get_http_client()
+        assert second is not first
+        assert not second.is_closed
+        close_http_client()
+
+
+class TestConnectionPrewarm:
+    """LLMClient.prewarm() opens a connection to api_base in the background."""
+
+    @patch("coding_agent.core.llm._get_http_client")
+    def test_construction_does_not_prewarm(self, mock_get_client, config):
+        client = LLMClient(config)
+        assert client._prewarm_thread is None
+        mock_get_client.assert_not_called()
+
+    @patch("coding_agent.core.llm._get_http_client")
+    def test_prewarm_sends_head_to_api_base(self, mock_get_client, config):
+        client = LLMClient(config)
+        client.prewarm()
+        client._wait_for_prewarm()
+        mock_get_client.return_value.head.assert_called_once()
+        assert mock_get_client.return_value.head.call_args[0][0] == "http://localhost:4000"
+
+    @patch("coding_agent.core.llm._get_http_client")
+    def test_prewarm_errors_are_swallowed(self, mock_get_client, config):
+        mock_get_client.return_value.head.side_effect = OSError("refused")
+        client = LLMClient(config)
+        client.prewarm()
+        client._wait_for_prewarm()
+        assert client._prewarm_thread is None
+
+    @patch("coding_agent.core.llm._get_http_client")
+    def test_prewarm_skipped_for_ollama(self, mock_get_client):
+        client = LLMClient(AgentConfig(model="ollama/llama3", api_base="http://localhost:11434"))
+        client.prewarm()
+        assert client._prewarm_thread is None
+        mock_get_client.return_value.head.assert_not_called()
+
+
 class TestVerifyConnectionUnreachable:
     """AC #2: Unreachable server produces clear error with URL and suggestions."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_raises_connection_error(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -148,7 +236,7 @@ class TestVerifyConnectionUnreachable:
         with pytest.raises(ConnectionError):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_server_url(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -159,7 +247,7 @@ class TestVerifyConnectionUnreachable:
         with pytest.raises(ConnectionError, match="http://localhost:4000"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_cannot_connect(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -170,7 +258,7 @@ class TestVerifyConnectionUnreachable:
         with pytest.raises(ConnectionError, match="Cannot connect"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_suggestions(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -183,47 +271,47 @@ class TestVerifyConnectionUnreachable:
 
 
 class TestOllamaConnectionError:
-    """Ollama-specific APIConnectionError gives actionable hints."""
+    """Ollama-specific connection failures give actionable hints."""
 
     @pytest.fixture()
     def ollama_config(self):
         return AgentConfig(model="ollama_chat/llama3.2")
 
-    @patch("coding_agent.core.llm.litellm.completion")
-    def test_ollama_error_mentions_ollama_serve(self, mock_completion, ollama_config):
-        mock_completion.side_effect = litellm.APIConnectionError(
-            message="Connection refused",
-            model="ollama_chat/llama3.2",
-            llm_provider="ollama",
-        )
+    @pytest.fixture()
+    def unreachable(self):
+        import httpx
+
+        with patch("coding_agent.core.llm._get_http_client") as mock_get_client:
+            mock_get_client.return_value.get.side_effect = httpx.ConnectError("Connection refused")
+            yield mock_get_client
+
+    def test_ollama_error_mentions_ollama_serve(self, unreachable, ollama_config):
         client = LLMClient(ollama_config)
         with pytest.raises(ConnectionError, match="ollama serve"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
-    def test_ollama_error_mentions_ollama_pull(self, mock_completion, ollama_config):
-        mock_completion.side_effect = litellm.APIConnectionError(
-            message="Connection refused",
-            model="ollama_chat/llama3.2",
-            llm_provider="ollama",
-        )
+    def test_ollama_error_mentions_ollama_pull(self, unreachable, ollama_config):
         client = LLMClient(ollama_config)
         with pytest.raises(ConnectionError, match="ollama pull llama3.2"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
-    def test_ollama_error_does_not_mention_litellm(self, mock_completion, ollama_config):
-        mock_completion.side_effect = litellm.APIConnectionError(
-            message="Connection refused",
-            model="ollama_chat/llama3.2",
-            llm_provider="ollama",
-        )
+    def test_ollama_error_does_not_mention_litellm(self, unreachable, ollama_config):
         client = LLMClient(ollama_config)
         with pytest.raises(ConnectionError) as exc_info:
             client.verify_connection()
         assert "LiteLLM server" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
+    @patch("coding_agent.core.llm._get_http_client")
+    def test_ollama_verify_skips_completion(self, mock_get_client, mock_completion, ollama_config):
+        """A reachable server is enough; no completion (which would load the model) is sent."""
+        mock_get_client.return_value.get.return_value = MagicMock(status_code=404)
+        client = LLMClient(ollama_config)
+        client.verify_connection()
+        mock_completion.assert_not_called()
+        assert mock_get_client.return_value.get.call_args[0][0].endswith("/api/tags")
+
+    @patch("litellm.completion")
     def test_non_ollama_error_does_not_mention_ollama(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -239,7 +327,7 @@ class TestOllamaConnectionError:
 class TestVerifyConnectionAuthError:
     """AC #3: Auth error is distinguishable from connectivity failure."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_raises_connection_error(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.AuthenticationError(
             message="Invalid API key",
@@ -250,7 +338,7 @@ class TestVerifyConnectionAuthError:
         with pytest.raises(ConnectionError):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_authentication_failed(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.AuthenticationError(
             message="Invalid API key",
@@ -261,7 +349,7 @@ class TestVerifyConnectionAuthError:
         with pytest.raises(ConnectionError, match="Authentication failed"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_distinguishable_from_connectivity(self, mock_completion, config_with_key):
         """Auth error message must NOT contain 'Cannot connect' to be distinguishable."""
         mock_completion.side_effect = litellm.AuthenticationError(
@@ -275,7 +363,7 @@ class TestVerifyConnectionAuthError:
         assert "Cannot connect" not in str(exc_info.value)
         assert "Authentication failed" in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_server_url(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.AuthenticationError(
             message="Invalid API key",
@@ -290,7 +378,7 @@ class TestVerifyConnectionAuthError:
 class TestVerifyConnectionTimeout:
     """Timeout produces clear error."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_raises_connection_error(self, mock_completion, config):
         mock_completion.side_effect = litellm.Timeout(
             message="Request timed out",
@@ -301,7 +389,7 @@ class TestVerifyConnectionTimeout:
         with pytest.raises(ConnectionError, match="timed out"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_server_url(self, mock_completion, config):
         mock_completion.side_effect = litellm.Timeout(
             message="Request timed out",
@@ -316,7 +404,7 @@ class TestVerifyConnectionTimeout:
 class TestVerifyConnectionServerError:
     """Generic API error produces clear error."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_raises_connection_error(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIError(
             status_code=500,
@@ -328,7 +416,7 @@ class TestVerifyConnectionServerError:
         with pytest.raises(ConnectionError, match="request failed"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_error_contains_status_code(self, mock_completion, config):
         mock_completion.side_effect = litellm.APIError(
             status_code=503,
@@ -340,7 +428,7 @@ class TestVerifyConnectionServerError:
         with pytest.raises(ConnectionError, match="503"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_client_error_caught(self, mock_completion, config):
         """400-level errors (e.g., bad model name) are caught by APIError fallback."""
         mock_completion.side_effect = litellm.APIError(
@@ -357,7 +445,7 @@ class TestVerifyConnectionServerError:
 class TestVerifyConnectionBadRequestError:
     """BadRequestError (e.g. provider rejects message format) is handled cleanly."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_bad_request_raises_connection_error(self, mock_completion, config):
         mock_completion.side_effect = litellm.BadRequestError(
             message="Unrecognized chat message.",
@@ -368,7 +456,7 @@ class TestVerifyConnectionBadRequestError:
         with pytest.raises(ConnectionError, match="rejected the request"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_bad_request_message_contains_hint(self, mock_completion, config):
         mock_completion.side_effect = litellm.BadRequestError(
             message="Unrecognized chat message.",
@@ -379,7 +467,7 @@ class TestVerifyConnectionBadRequestError:
         with pytest.raises(ConnectionError, match="/model"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_bad_request_no_traceback_in_message(self, mock_completion, config):
         mock_completion.side_effect = litellm.BadRequestError(
             message="Unrecognized chat message.",
@@ -391,32 +479,46 @@ class TestVerifyConnectionBadRequestError:
             client.verify_connection()
         assert "Traceback" not in str(exc_info.value)
 
+    @patch("litellm.completion")
+    def test_bad_request_subclass_is_rejection(self, mock_completion, config):
+        """Subclasses without their own handler fall back to their base class's handler."""
+        from coding_agent.core.llm import ModelRejectionError
+
+        mock_completion.side_effect = litellm.ContextWindowExceededError(
+            message="context too long",
+            model="litellm/gpt-4o",
+            llm_provider="openai",
+        )
+        client = LLMClient(config)
+        with pytest.raises(ModelRejectionError):
+            client.verify_connection()
+
 
 class TestVerifyConnectionUnexpectedException:
     """Unexpected exceptions are caught gracefully without leaking tracebacks."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_unexpected_error_raises_connection_error(self, mock_completion, config):
         mock_completion.side_effect = RuntimeError("something completely unexpected")
         client = LLMClient(config)
         with pytest.raises(ConnectionError, match="Unexpected error"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_unexpected_error_contains_server_url(self, mock_completion, config):
         mock_completion.side_effect = ValueError("bad value")
         client = LLMClient(config)
         with pytest.raises(ConnectionError, match="http://localhost:4000"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_unexpected_error_includes_exception_type(self, mock_completion, config):
         mock_completion.side_effect = KeyError("missing_key")
         client = LLMClient(config)
         with pytest.raises(ConnectionError, match="KeyError"):
             client.verify_connection()
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_unexpected_error_no_traceback_in_message(self, mock_completion, config):
         mock_completion.side_effect = RuntimeError("boom")
         client = LLMClient(config)
@@ -428,7 +530,7 @@ class TestVerifyConnectionUnexpectedException:
 class TestVerifyConnectionApiKeySecurity:
     """NFR7: API key never appears in error messages."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_connection_error(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -440,7 +542,7 @@ class TestVerifyConnectionApiKeySecurity:
             client.verify_connection()
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_auth_error(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.AuthenticationError(
             message="Invalid API key",
@@ -452,7 +554,7 @@ class TestVerifyConnectionApiKeySecurity:
             client.verify_connection()
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_timeout_error(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.Timeout(
             message="Request timed out",
@@ -464,7 +566,7 @@ class TestVerifyConnectionApiKeySecurity:
             client.verify_connection()
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_server_error(self, mock_completion, config_with_key):
         mock_completion.side_effect = litellm.APIError(
             status_code=500,
@@ -477,7 +579,7 @@ class TestVerifyConnectionApiKeySecurity:
             client.verify_connection()
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_unexpected_error(self, mock_completion, config_with_key):
         mock_completion.side_effect = RuntimeError("unexpected")
         client = LLMClient(config_with_key)
@@ -494,12 +596,29 @@ def _make_stream_chunks(texts):
     chunks = []
     for text in texts:
         chunk = MagicMock()
+        chunk.id = "chatcmpl-1"
+        chunk.created = 1
+        chunk.model = "gpt-4o"
         chunk.choices = [MagicMock()]
         chunk.choices[0].delta.content = text
+        chunk.choices[0].delta.tool_calls = None
+        chunk.choices[0].finish_reason = None
         chunks.append(chunk)
+    if chunks:
+        chunks[-1].choices[0].finish_reason = "stop"
     return chunks
 
 
+def _make_tool_call_delta(index, arguments, call_id=None, name=None):
+    """Create a mock streamed tool-call delta fragment."""
+    tc = MagicMock()
+    tc.index = index
+    tc.id = call_id
+    tc.function.name = name
+    tc.function.arguments = arguments
+    return tc
+
+
 @pytest.fixture()
 def sample_messages():
     """Provide sample conversation messages for streaming tests."""
@@ -512,8 +631,8 @@ def sample_messages():
 class TestSendMessageStreamSuccess:
     """AC #2: Streaming returns text deltas in real-time."""
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_yields_text_deltas_in_order(self, mock_completion, mock_builder, config, sample_messages):
         chunks = _make_stream_chunks(["Hello", " world", "!"])
         mock_completion.return_value = iter(chunks)
@@ -523,8 +642,8 @@ class TestSendMessageStreamSuccess:
         deltas = list(client.send_message_stream(sample_messages))
         assert deltas == [StreamToken("Hello"), StreamToken(" world"), StreamToken("!")]
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_skips_none_deltas(self, mock_completion, mock_builder, config, sample_messages):
         """Chunks with None content (e.g., role-only chunks) are skipped."""
         chunks = _make_stream_chunks([None, "Hello", None, " world"])
@@ -535,39 +654,129 @@ class TestSendMessageStreamSuccess:
         deltas = list(client.send_message_stream(sample_messages))
         assert deltas == [StreamToken("Hello"), StreamToken(" world")]
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
-    def test_calls_stream_chunk_builder(self, mock_completion, mock_builder, config, sample_messages):
-        chunks = _make_stream_chunks(["Hi"])
-        mock_completion.return_value = iter(chunks)
-        mock_builder.return_value = MagicMock()
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
+    def test_does_not_rebuild_from_chunks(self, mock_completion, mock_builder, config, sample_messages):
+        mock_completion.return_value = iter(_make_stream_chunks(["Hi"]))
 
         client = LLMClient(config)
         list(client.send_message_stream(sample_messages))
-        mock_builder.assert_called_once()
-        # The chunks list passed to builder should contain all chunks
-        assert len(mock_builder.call_args[0][0]) == 1
-
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
-    def test_full_response_available_after_streaming(self, mock_completion, mock_builder, config, sample_messages):
-        chunks = _make_stream_chunks(["Hello", " world"])
+        mock_builder.assert_not_called()
+
+    @patch("litellm.completion")
+    def test_full_response_available_after_streaming(self, mock_completion, config, sample_messages):
+        mock_completion.return_value = iter(_make_stream_chunks(["Hello", " world"]))
+
+        client = LLMClient(config)
+        list(client.send_message_stream(sample_messages))
+        message = client.last_response.choices[0].message
+        assert message.content == "Hello world"
+        assert not message.tool_calls
+        assert client.last_response.choices[0].finish_reason == "stop"
+
+
+class TestSendMessageStreamAssembly:
+    """Content and tool calls are assembled while streaming."""
+
+    @patch("litellm.completion")
+    def test_chunks_without_choices_are_skipped(self, mock_completion, config, sample_messages):
+        usage_chunk = MagicMock()
+        usage_chunk.choices = []
+        mock_completion.return_value = iter(_make_stream_chunks(["Hi"]) + [usage_chunk])
+
+        client = LLMClient(config)
+        deltas = list(client.send_message_stream(sample_messages))
+        assert deltas == [StreamToken("Hi")]
+        assert client.last_response.choices[0].message.content == "Hi"
+
+    @patch("litellm.completion")
+    def test_tool_call_fragments_joined_by_index(self, mock_completion, config, sample_messages):
+        chunks = _make_stream_chunks(["Let me check", None, None, None])
+        chunks[1].choices[0].delta.tool_calls = [
+            _make_tool_call_delta(0, '{"path": ', call_id="call_a", name="file_read"),
+        ]
+        chunks[2].choices[0].delta.tool_calls = [
+            _make_tool_call_delta(1, '{"pattern": "x"}', call_id="call_b", name="grep"),
+            _make_tool_call_delta(0, '"a.py"}'),
+        ]
+        chunks[3].choices[0].finish_reason = "tool_calls"
         mock_completion.return_value = iter(chunks)
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message.content = "Hello world"
-        mock_builder.return_value = mock_response
 
         client = LLMClient(config)
         list(client.send_message_stream(sample_messages))
-        assert client.last_response == mock_response
+        message = client.last_response.choices[0].message
+        assert message.content == "Let me check"
+        assert [(tc.id, tc.function.name, tc.function.arguments) for tc in message.tool_calls] == [
+            ("call_a", "file_read", '{"path": "a.py"}'),
+            ("call_b", "grep", '{"pattern": "x"}'),
+        ]
+        assert client.last_llm_response.tool_calls[0]["arguments"] == {"path": "a.py"}
+
+    def test_tool_names_interned(self):
+        import sys
+
+        from coding_agent.core.llm import _accumulate_tool_call_deltas
+
+        accum: dict = {}
+        name = "".join(["file_", "read"])
+        _accumulate_tool_call_deltas(accum, [_make_tool_call_delta(0, "{}", call_id="c", name=name)])
+        assert accum[0][1] is sys.intern("file_read")
+
+
+class TestSendMessageStreamToolArguments:
+    """Tool-call argument strings are decoded, with malformed JSON mapped to {}."""
+
+    @staticmethod
+    def _tool_call_chunks(arguments):
+        chunks = _make_stream_chunks([None])
+        chunks[0].choices[0].delta.tool_calls = [
+            _make_tool_call_delta(0, arguments, call_id="call_1", name="file_read"),
+        ]
+        return chunks
+
+    @patch("litellm.completion")
+    def test_decodes_arguments(self, mock_completion, config, sample_messages):
+        mock_completion.return_value = iter(self._tool_call_chunks('{"path": "a.py", "limit": 5}'))
+
+        client = LLMClient(config)
+        list(client.send_message_stream(sample_messages))
+        assert client.last_llm_response.tool_calls[0]["arguments"] == {"path": "a.py", "limit": 5}
+
+    @patch("litellm.completion")
+    def test_malformed_arguments_become_empty(self, mock_completion, config, sample_messages):
+        mock_completion.return_value = iter(self._tool_call_chunks('{"path": '))
+
+        client = LLMClient(config)
+        list(client.send_message_stream(sample_messages))
+        assert client.last_llm_response.tool_calls[0]["arguments"] == {}
+
+
+class TestSystemPromptCaching:
+    """Claude requests mark the system prompt as cacheable without mutating the input."""
+
+    @patch("litellm.completion")
+    def test_claude_system_prompt_marked(self, mock_completion, sample_messages):
+        mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
+        client = LLMClient(AgentConfig(model="anthropic/claude-sonnet-4-5", api_base="http://localhost:4000"))
+        list(client.send_message_stream(sample_messages))
+        sent = mock_completion.call_args[1]["messages"]
+        assert sent[0]["cache_control"] == {"type": "ephemeral"}
+        assert sent[1] is sample_messages[1]
+        assert "cache_control" not in sample_messages[0]
+
+    @patch("litellm.completion")
+    def test_other_models_unchanged(self, mock_completion, config, sample_messages):
+        mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
+        client = LLMClient(config)
+        list(client.send_message_stream(sample_messages))
+        assert mock_completion.call_args[1]["messages"] is sample_messages
 
 
 class TestSendMessageStreamParams:
     """Verify correct parameters are passed to litellm.completion."""
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_correct_model(self, mock_completion, mock_builder, config, sample_messages):
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
         mock_builder.return_value = MagicMock()
@@ -577,8 +786,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["model"] == "litellm/gpt-4o"
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_correct_api_base(self, mock_completion, mock_builder, config, sample_messages):
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
         mock_builder.return_value = MagicMock()
@@ -588,8 +797,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["api_base"] == "http://localhost:4000"
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_api_key(self, mock_completion, mock_builder, config_with_key, sample_messages):
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
         mock_builder.return_value = MagicMock()
@@ -599,8 +808,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["api_key"] == "sk-secret-key-12345"
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_stream_true(self, mock_completion, mock_builder, config, sample_messages):
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
         mock_builder.return_value = MagicMock()
@@ -610,8 +819,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["stream"] is True
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_messages(self, mock_completion, mock_builder, config, sample_messages):
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
         mock_builder.return_value = MagicMock()
@@ -621,8 +830,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["messages"] == sample_messages
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_timeout(self, mock_completion, mock_builder, config, sample_messages):
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
         mock_builder.return_value = MagicMock()
@@ -632,8 +841,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["timeout"] == 300
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_temperature_stream(self, mock_completion, mock_builder, config, sample_messages):
         """AC: temperature is passed to LiteLLM in streaming."""
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
@@ -645,8 +854,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["temperature"] == 0.7
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_max_tokens_stream(self, mock_completion, mock_builder, config, sample_messages):
         """AC: max_output_tokens is passed to LiteLLM in streaming."""
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
@@ -658,8 +867,8 @@ class TestSendMessageStreamParams:
         call_kwargs = mock_completion.call_args[1]
         assert call_kwargs["max_tokens"] == 8192
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_passes_top_p_stream(self, mock_completion, mock_builder, config, sample_messages):
         """AC: top_p is passed to LiteLLM in streaming."""
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
@@ -675,7 +884,7 @@ class TestSendMessageStreamParams:
 class TestSendMessageStreamErrors:
     """Streaming errors produce clear ConnectionError messages."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_connection_error(self, mock_completion, config, sample_messages):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -686,7 +895,7 @@ class TestSendMessageStreamErrors:
         with pytest.raises(ConnectionError, match="Cannot connect"):
             list(client.send_message_stream(sample_messages))
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_auth_error(self, mock_completion, config_with_key, sample_messages):
         mock_completion.side_effect = litellm.AuthenticationError(
             message="Invalid API key",
@@ -697,7 +906,7 @@ class TestSendMessageStreamErrors:
         with pytest.raises(ConnectionError, match="Authentication failed"):
             list(client.send_message_stream(sample_messages))
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_timeout_error(self, mock_completion, config, sample_messages):
         mock_completion.side_effect = litellm.Timeout(
             message="Request timed out",
@@ -708,7 +917,7 @@ class TestSendMessageStreamErrors:
         with pytest.raises(ConnectionError, match="timed out"):
             list(client.send_message_stream(sample_messages))
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_error(self, mock_completion, config, sample_messages):
         mock_completion.side_effect = litellm.APIError(
             status_code=500,
@@ -720,7 +929,7 @@ class TestSendMessageStreamErrors:
         with pytest.raises(ConnectionError, match="request failed"):
             list(client.send_message_stream(sample_messages))
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_unexpected_error(self, mock_completion, config, sample_messages):
         mock_completion.side_effect = RuntimeError("something unexpected")
         client = LLMClient(config)
@@ -731,7 +940,7 @@ class TestSendMessageStreamErrors:
 class TestSendMessageStreamMidStreamError:
     """Mid-stream errors (during chunk iteration) are handled gracefully."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_mid_stream_connection_error(self, mock_completion, config, sample_messages):
         """Error raised during chunk iteration (not at call time)."""
         chunk1 = MagicMock()
@@ -751,7 +960,7 @@ class TestSendMessageStreamMidStreamError:
         with pytest.raises(ConnectionError, match="Cannot connect"):
             list(client.send_message_stream(sample_messages))
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_mid_stream_error_resets_last_response(self, mock_completion, config, sample_messages):
         """last_response stays None when mid-stream error occurs."""
         chunk1 = MagicMock()
@@ -772,7 +981,7 @@ class TestSendMessageStreamMidStreamError:
             list(client.send_message_stream(sample_messages))
         assert client.last_response is None
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_mid_stream_unexpected_error(self, mock_completion, config, sample_messages):
         """Unexpected exception during chunk iteration is caught."""
         chunk1 = MagicMock()
@@ -792,7 +1001,7 @@ class TestSendMessageStreamMidStreamError:
 class TestSendMessageStreamApiKeySecurity:
     """NFR7: API key never appears in streaming error messages."""
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_connection_error(self, mock_completion, config_with_key, sample_messages):
         mock_completion.side_effect = litellm.APIConnectionError(
             message="Connection refused",
@@ -804,7 +1013,7 @@ class TestSendMessageStreamApiKeySecurity:
             list(client.send_message_stream(sample_messages))
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_auth_error(self, mock_completion, config_with_key, sample_messages):
         mock_completion.side_effect = litellm.AuthenticationError(
             message="Invalid API key",
@@ -816,7 +1025,7 @@ class TestSendMessageStreamApiKeySecurity:
             list(client.send_message_stream(sample_messages))
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_timeout_error(self, mock_completion, config_with_key, sample_messages):
         mock_completion.side_effect = litellm.Timeout(
             message="Request timed out",
@@ -828,7 +1037,7 @@ class TestSendMessageStreamApiKeySecurity:
             list(client.send_message_stream(sample_messages))
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_api_error(self, mock_completion, config_with_key, sample_messages):
         mock_completion.side_effect = litellm.APIError(
             status_code=500,
@@ -841,7 +1050,7 @@ class TestSendMessageStreamApiKeySecurity:
             list(client.send_message_stream(sample_messages))
         assert "sk-secret-key-12345" not in str(exc_info.value)
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_api_key_not_in_unexpected_error(self, mock_completion, config_with_key, sample_messages):
         mock_completion.side_effect = RuntimeError("unexpected")
         client = LLMClient(config_with_key)
@@ -883,16 +1092,28 @@ class TestSamplingParamsUnsupported:
         assert "temperature" in params
         assert "top_p" in params
 
-    @patch("coding_agent.core.llm.litellm.completion")
-    def test_verify_connection_detects_caps_and_omits_unsupported(self, mock_completion, config):
+    def test_params_reused_until_inputs_change(self, config):
+        """The params mapping is cached and rebuilt when temperature, top_p or caps change."""
+        client = LLMClient(config)
+        first = client._get_sampling_params()
+        assert client._get_sampling_params() is first
+        client.temperature = 0.1
+        assert client._get_sampling_params()["temperature"] == 0.1
+        client.top_p = 0.5
+        assert client._get_sampling_params()["top_p"] == 0.5
+        client.set_capabilities(ModelCapabilities(temperature_supported=False, top_p_supported=True))
+        assert "temperature" not in client._get_sampling_params()
+
+    @patch("litellm.completion")
+    def test_verify_connection_detects_caps_and_omits_unsupported(self, mock_completion):
         """verify_connection detects capabilities; models that reject params get none sent."""
         mock_completion.side_effect = litellm.BadRequestError(
             message="temperature not supported",
-            model="litellm/gpt-4o",
+            model="litellm/custom-model",
             llm_provider="openai",
             response=MagicMock(status_code=400),
         )
-        client = LLMClient(config)
+        client = LLMClient(AgentConfig(model="litellm/custom-model", api_base="http://localhost:4000"))
         # Both detect and ping will fail with BadRequestError → ConnectionError
         with pytest.raises(ConnectionError):
             client.verify_connection()
@@ -902,22 +1123,22 @@ class TestSamplingParamsUnsupported:
         assert caps.temperature_supported is False
         assert caps.top_p_supported is False
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_stream_omits_temperature_when_unsupported(self, mock_completion, config, sample_messages):
         """send_message_stream omits temperature when model capability says unsupported."""
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
-        with patch("coding_agent.core.llm.litellm.stream_chunk_builder", return_value=MagicMock()):
+        with patch("litellm.stream_chunk_builder", return_value=MagicMock()):
             client = LLMClient(config)
             client.set_capabilities(ModelCapabilities(temperature_supported=False, top_p_supported=True))
             list(client.send_message_stream(sample_messages))
         call_kwargs = mock_completion.call_args[1]
         assert "temperature" not in call_kwargs
 
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.completion")
     def test_stream_omits_top_p_when_unsupported(self, mock_completion, config, sample_messages):
         """send_message_stream omits top_p when model capability says unsupported."""
         mock_completion.return_value = iter(_make_stream_chunks(["ok"]))
-        with patch("coding_agent.core.llm.litellm.stream_chunk_builder", return_value=MagicMock()):
+        with patch("litellm.stream_chunk_builder", return_value=MagicMock()):
             client = LLMClient(config)
             client.set_capabilities(ModelCapabilities(temperature_supported=True, top_p_supported=False))
             list(client.send_message_stream(sample_messages))
@@ -925,6 +1146,52 @@ class TestSamplingParamsUnsupported:
         assert "top_p" not in call_kwargs
 
 
+class TestKnownCapabilities:
+    """Well-known models skip the capability probe request."""
+
+    @pytest.mark.parametrize("model, expected", [
+        ("litellm/gpt-4o", (True, True)),
+        ("openai/o3-mini", (False, False)),
+        ("gpt-5", (False, False)),
+        ("ollama/llama3", (True, True)),
+    ])
+    @patch("litellm.completion")
+    def test_known_model_skips_probe(self, mock_completion, model, expected):
+        from coding_agent.core.llm import detect_model_capabilities
+
+        client = LLMClient(AgentConfig(model=model, api_base="http://localhost:4000"))
+        caps = detect_model_capabilities(client)
+        mock_completion.assert_not_called()
+        assert (caps.temperature_supported, caps.top_p_supported) == expected
+
+    @patch("litellm.completion")
+    def test_unknown_model_is_probed(self, mock_completion):
+        from coding_agent.core.llm import detect_model_capabilities
+
+        client = LLMClient(AgentConfig(model="anthropic/claude-sonnet-4-5", api_base="http://localhost:4000"))
+        caps = detect_model_capabilities(client)
+        mock_completion.assert_called_once()
+        assert caps.temperature_supported is True
+
+
+class TestDetectModelCapabilitiesMany:
+    """Several models are probed concurrently, once per distinct model."""
+
+    @patch("litellm.completion")
+    def test_probes_each_distinct_model_once(self, mock_completion):
+        from coding_agent.core.llm import detect_model_capabilities_many
+
+        clients = [
+            LLMClient(AgentConfig(model=model, api_base="http://localhost:4000"))
+            for model in ("litellm/custom-a", "litellm/custom-b", "litellm/custom-a", "litellm/gpt-4o")
+        ]
+        caps = detect_model_capabilities_many(clients)
+        assert set(caps) == {"litellm/custom-a", "litellm/custom-b", "litellm/gpt-4o"}
+        probed = sorted(call[1]["model"] for call in mock_completion.call_args_list)
+        assert probed == ["litellm/custom-a", "litellm/custom-b"]
+        assert _config_module.get_model_capabilities("litellm/custom-b") is caps["litellm/custom-b"]
+
+
 class TestIsMinimaxOpenrouter:
     """Unit tests for _is_minimax_openrouter helper."""
 
@@ -1045,8 +1312,8 @@ class TestMinimaxOpenRouterFallback:
         mock_response.choices[0].message.tool_calls = None
         return mock_response
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_parses_xml_tool_call_when_tool_calls_absent(self, mock_completion, mock_builder, sample_messages):
         xml_content = (
             "<minimax:tool_call>\n"
@@ -1083,8 +1350,8 @@ class TestMinimaxOpenRouterFallback:
         assert result.tool_calls[0]["name"] == "read_file"
         assert result.tool_calls[0]["arguments"] == {"path": "foo.py"}
 
-    @patch("coding_agent.core.llm.litellm.stream_chunk_builder")
-    @patch("coding_agent.core.llm.litellm.completion")
+    @patch("litellm.stream_chunk_builder")
+    @patch("litellm.completion")
     def test_xml_fallback_not_triggered_for_non_minimax(self, mock_completion, mock_builder, config, sample_messages):
         """Non-MiniMax models with empty tool_calls and XML-like content are unaffected."""
         xml_content = (
@@ -3,7 +3,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 
-from coding_agent.core.permissions import PermissionSystem, TOOLS_REQUIRING_APPROVAL
+from coding_agent.core.permissions import PermissionSystem, TOOLS_REQUIRING_APPROVAL, _fmt_params, _MAX_PARAM_DISPLAY
 
 
 class TestPermissionSystemInit:
@@ -14,13 +14,13 @@ class TestPermissionSystemInit:
         renderer = MagicMock()
         ps = PermissionSystem(renderer)
         assert ps.renderer is renderer
-        assert ps.approved_operations == {}
+        assert ps.approved_operations == set()
 
     def test_init_without_renderer(self):
         """Test initialization without renderer."""
         ps = PermissionSystem()
         assert ps.renderer is None
-        assert ps.approved_operations == {}
+        assert ps.approved_operations == set()
 
 
 class TestToolsRequiringApproval:
@@ -85,6 +85,42 @@ class TestCheckApproval:
             assert result is True
 
 
+class TestApprovalDispatch:
+    """Test per-tool approval dispatch."""
+
+    def test_handlers_cover_tools_requiring_approval(self):
+        """Every tool that needs approval has a handler, and nothing else does."""
+        ps = PermissionSystem()
+        assert set(ps._handlers) == set(TOOLS_REQUIRING_APPROVAL)
+
+    def test_file_ops_skip_destructive_check(self):
+        """file_write never runs the destructive shell check."""
+        ps = PermissionSystem()
+        with patch.object(ps, "_is_destructive") as mock_destructive:
+            with patch.object(ps, "_prompt_user", return_value=True):
+                ps.check_approval("file_write", {"path": "/tmp/rm -rf"})
+            mock_destructive.assert_not_called()
+
+
+class TestFormatParams:
+    """Test parameter formatting for display."""
+
+    def test_short_values_unchanged(self):
+        """Short values are shown in full."""
+        assert _fmt_params({"path": "a.txt", "n": 3}) == "{path='a.txt', n='3'}"
+
+    def test_long_string_truncated_with_length(self):
+        """Long strings are cut to the display limit and report their length."""
+        out = _fmt_params({"content": "x" * 5000})
+        assert "x" * _MAX_PARAM_DISPLAY + "... (5000 chars)" in out
+        assert "x" * (_MAX_PARAM_DISPLAY + 1) not in out
+
+    def test_long_bytes_truncated_with_length(self):
+        """Long bytes are decoded only up to the display limit."""
+        out = _fmt_params({"data": b"y" * 300})
+        assert "y" * _MAX_PARAM_DISPLAY + "... (300 bytes)" in out
+
+
 class TestDestructiveCommandDetection:
     """Test destructive command detection."""
 
@@ -126,6 +162,25 @@ class TestDestructiveCommandDetection:
         assert ps._is_destructive("pwd") is False
         assert ps._is_destructive("cat file.txt") is False
 
+    def test_detection_is_case_insensitive(self):
+        """Test uppercase variants are still flagged."""
+        ps = PermissionSystem()
+        assert ps._is_destructive("RM -RF /tmp") is True
+        assert ps._is_destructive("DEL /S /Q C:\\Windows") is True
+
+    def test_dev_null_redirect_not_destructive(self):
+        """Test redirects to /dev/null are allowed but other devices are not."""
+        ps = PermissionSystem()
+        assert ps._is_destructive("make > /dev/null") is False
+        assert ps._is_destructive("echo x > /dev/NULL") is False
+        assert ps._is_destructive("cat img > /dev/sda") is True
+
+    def test_detect_dd_and_compact_redirect(self):
+        """Test dd and unspaced device redirects pass the literal prefilter."""
+        ps = PermissionSystem()
+        assert ps._is_destructive("dd if=/dev/zero of=disk.img") is True
+        assert ps._is_destructive("cat img >/dev/sdb") is True
+
 
 class TestDestructiveShellApproval:
     """Test approval for destructive shell commands."""
@@ -155,7 +210,7 @@ class TestSessionMemory:
         """Test approve stores operation in memory."""
         ps = PermissionSystem()
         ps.approve("file_write", {"path": "/tmp/test.txt"})
-        keys = list(ps.approved_operations.keys())
+        keys = list(ps.approved_operations)
         assert any("file_write" in key for key in keys)
 
     def test_clears_operations(self):
@@ -163,7 +218,7 @@ class TestSessionMemory:
         ps = PermissionSystem()
         ps.approve("file_write", {"path": "/tmp/test.txt"})
         ps.clear()
-        assert ps.approved_operations == {}
+        assert ps.approved_operations == set()
 
     def test_auto_approve_remembered_operation(self):
         """Test previously approved operation is auto-approved."""
@@ -204,6 +259,43 @@ class TestApprovalKeyGeneration:
         key = ps._get_approval_key("file_edit", {"path": "/home/user/file.txt"})
         assert "file_edit:" in key
 
+    def test_relative_path_key_follows_cwd(self, tmp_path, monkeypatch):
+        """Keys for relative paths resolve against the current cwd."""
+        ps = PermissionSystem()
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        monkeypatch.chdir(tmp_path / "a")
+        key_a = ps._get_approval_key("file_write", {"path": "x.txt"})
+        monkeypatch.chdir(tmp_path / "b")
+        key_b = ps._get_approval_key("file_write", {"path": "x.txt"})
+        assert key_a != key_b
+
+    def test_repointed_symlink_requires_new_approval(self, tmp_path):
+        """Approving a write through a symlink does not carry over once it is repointed."""
+        ps = PermissionSystem()
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "b.txt").write_text("b")
+        link = tmp_path / "link.txt"
+        link.symlink_to(tmp_path / "a.txt")
+        params = {"path": str(link)}
+
+        ps.approve("file_write", params)
+        assert ps.check_approval("file_write", params) is True
+
+        link.unlink()
+        link.symlink_to(tmp_path / "b.txt")
+        with patch("builtins.input", return_value="n"):
+            assert ps.check_approval("file_write", params) is False
+
+    def test_check_approval_passes_key_to_prompt(self):
+        """The key computed in check_approval is reused when remembering approval."""
+        ps = PermissionSystem()
+        with patch.object(ps, "_get_approval_key", wraps=ps._get_approval_key) as mock_key:
+            with patch("builtins.input", return_value="y"):
+                assert ps.check_approval("shell", {"command": "echo hi"}) is True
+            assert mock_key.call_count == 1
+        assert "shell:echo hi" in ps.approved_operations
+
     def test_destructive_bypasses_session_memory(self):
         """Test destructive commands ALWAYS require approval even if previously approved."""
         ps = PermissionSystem()
@@ -0,0 +1,126 @@
+"""Tests for project instructions discovery."""
+
+from coding_agent.config.project_instructions import (
+    clear_git_root_cache,
+    find_git_root,
+    find_project_instructions,
+)
+
+
+class TestFindGitRoot:
+    """Tests for find_git_root."""
+
+    def test_finds_root_from_nested_directory(self, tmp_path):
+        """Walks upward from a nested directory to the .git folder."""
+        (tmp_path / ".git").mkdir()
+        nested = tmp_path / "a" / "b"
+        nested.mkdir(parents=True)
+
+        assert find_git_root(nested) == tmp_path.resolve()
+
+    def test_returns_none_outside_repository(self, tmp_path):
+        """Returns None when no ancestor contains .git."""
+        assert find_git_root(tmp_path) is None
+
+    def test_result_is_cached_until_cleared(self, tmp_path):
+        """Repeated lookups reuse the cached walk until the cache is cleared."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        (repo / ".git").mkdir()
+        assert find_git_root(repo) == repo.resolve()
+
+        (repo / ".git").rmdir()
+        assert find_git_root(repo) == repo.resolve()
+
+        clear_git_root_cache()
+        assert find_git_root(repo) != repo.resolve()
+
+    def test_missing_root_is_not_cached(self, tmp_path):
+        """A directory that later becomes a repository is found without clearing the cache."""
+        assert find_git_root(tmp_path) is None
+
+        (tmp_path / ".git").mkdir()
+        assert find_git_root(tmp_path) == tmp_path.resolve()
+
+
+class TestFindProjectInstructions:
+    """Tests for find_project_instructions."""
+
+    def test_agents_md_takes_priority(self, tmp_path):
+        """AGENTS.md wins over CLAUDE.md when both exist."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "AGENTS.md").write_text("agents", encoding="utf-8")
+        (tmp_path / "CLAUDE.md").write_text("claude", encoding="utf-8")
+
+        path, content = find_project_instructions(tmp_path)
+        assert path.name == "AGENTS.md"
+        assert content == "agents"
+
+    def test_picks_up_edited_content(self, tmp_path):
+        """A modified instructions file is re-read instead of served from cache."""
+        (tmp_path / ".git").mkdir()
+        agents = tmp_path / "AGENTS.md"
+        agents.write_text("first", encoding="utf-8")
+        assert find_project_instructions(tmp_path)[1] == "first"
+
+        agents.write_text("second version", encoding="utf-8")
+        assert find_project_instructions(tmp_path)[1] == "second version"
+
+
+class TestGetEnhancedSystemPrompt:
+    """Tests for get_enhanced_system_prompt."""
+
+    def test_sections_precede_default_prompt(self, tmp_path, monkeypatch):
+        """Project instructions come before the default prompt, one blank line apart."""
+        import coding_agent.config.project_instructions as pi
+
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "AGENTS.md").write_text("Use tabs.", encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(pi, "load_global_instructions", lambda: None)
+        monkeypatch.setattr(pi, "load_agent_docs", lambda: None)
+
+        prompt, loaded = pi.get_enhanced_system_prompt("DEFAULT")
+
+        assert prompt == "# Project Instructions\n\nUse tabs.\n\nDEFAULT"
+        assert loaded == [str(tmp_path.resolve() / "AGENTS.md")]
+
+    def test_default_prompt_unchanged_without_instructions(self, tmp_path, monkeypatch):
+        """With nothing to add the default prompt is returned as-is."""
+        import coding_agent.config.project_instructions as pi
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(pi, "load_global_instructions", lambda: None)
+        monkeypatch.setattr(pi, "load_agent_docs", lambda: None)
+
+        assert pi.get_enhanced_system_prompt("DEFAULT") == ("DEFAULT", [])
+
+
+class TestLoadGlobalInstructions:
+    """Tests for load_global_instructions."""
+
+    def test_rereads_only_when_file_changes(self, tmp_path, monkeypatch):
+        """Unchanged global instructions are served from cache; edits are picked up."""
+        import os
+        import coding_agent.config.project_instructions as pi
+
+        global_md = tmp_path / "AGENTS.md"
+        global_md.write_text("global v1", encoding="utf-8")
+        monkeypatch.setattr(pi, "get_global_instructions_path", lambda cwd=None: global_md)
+        assert pi.load_global_instructions() == "global v1"
+
+        # Same size and mtime: the cached content is returned without a re-read.
+        st = global_md.stat()
+        global_md.write_text("global v9", encoding="utf-8")
+        os.utime(global_md, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert pi.load_global_instructions() == "global v1"
+
+        os.utime(global_md, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert pi.load_global_instructions() == "global v9"
+
+    def test_missing_file_returns_none(self, tmp_path, monkeypatch):
+        """A missing global instructions file yields None."""
+        import coding_agent.config.project_instructions as pi
+
+        monkeypatch.setattr(pi, "get_global_instructions_path", lambda cwd=None: tmp_path / "nope.md")
+        assert pi.load_global_instructions() is None
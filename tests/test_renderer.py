@@ -8,9 +8,16 @@ from rich.panel import Panel
 from rich.rule import Rule
 from rich.text import Text
 
+import coding_agent.ui.renderer as renderer_module
 from coding_agent.ui.renderer import BufferedMarkdownDisplay, PlainStreamingDisplay, Renderer, StreamingDisplay, TimedSpinner
 
 
+@pytest.fixture(autouse=True)
+def _fresh_default_console(monkeypatch):
+    """Make each test build its own shared Console so Console patches apply."""
+    monkeypatch.setattr(renderer_module, "_default_console", None)
+
+
 class TestRenderer:
     """Verify Renderer behavior for markdown and status output."""
 
@@ -41,6 +48,48 @@ class TestRenderer:
         assert isinstance(rendered, Markdown)
         assert "```python" in rendered.markup
 
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_markdown_reuses_parse_for_same_text(self, mock_console_cls):
+        """Rendering identical text twice reuses the parsed Markdown."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+        renderer_module.clear_md_cache()
+
+        renderer.render_markdown("# Same")
+        renderer.render_markdown("# Same")
+        renderer.render_markdown("# Other")
+
+        first, second, third = (c.args[0] for c in mock_console.print.call_args_list)
+        assert first is second
+        assert third is not first
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_print_lines_renders_once(self, mock_console_cls):
+        """print_lines() emits all messages as one styled Text."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.print_lines([("first", "red"), ("second", "dim")])
+
+        mock_console.print.assert_called_once()
+        text = mock_console.print.call_args.args[0]
+        assert isinstance(text, Text)
+        assert text.plain == "first\nsecond"
+        assert [str(span.style) for span in text.spans] == ["red", "dim"]
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_print_lines_empty_is_noop(self, mock_console_cls):
+        """print_lines() with no messages prints nothing."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.print_lines([])
+
+        mock_console.print.assert_not_called()
+
     @patch("coding_agent.ui.renderer.Console")
     def test_print_error_outputs_styled_message(self, mock_console_cls):
         """print_error() prints red-styled message without auto-highlighting."""
@@ -50,7 +99,12 @@ class TestRenderer:
 
         renderer.print_error("boom")
 
-        mock_console.print.assert_called_once_with("[red]boom[/red]", highlight=False)
+        mock_console.print.assert_called_once()
+        text = mock_console.print.call_args.args[0]
+        assert isinstance(text, Text)
+        assert text.plain == "boom"
+        assert text.style.color.name == "red"
+        assert mock_console.print.call_args.kwargs == {"highlight": False}
 
     @patch("coding_agent.ui.renderer.Console")
     def test_print_info_outputs_styled_message(self, mock_console_cls):
@@ -61,7 +115,23 @@ class TestRenderer:
 
         renderer.print_info("Connected")
 
-        mock_console.print.assert_called_once_with("[dim]Connected[/dim]", highlight=False)
+        mock_console.print.assert_called_once()
+        text = mock_console.print.call_args.args[0]
+        assert isinstance(text, Text)
+        assert text.plain == "Connected"
+        assert text.style.dim is True
+        assert mock_console.print.call_args.kwargs == {"highlight": False}
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_print_info_keeps_square_brackets(self, mock_console_cls):
+        """Usage hints like [name] are printed literally, not parsed as markup."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.print_info("Usage: /auto-allow [on|off]")
+
+        assert mock_console.print.call_args.args[0].plain == "Usage: /auto-allow [on|off]"
 
     @patch("coding_agent.ui.renderer.Console")
     def test_status_spinner_returns_timed_spinner(self, mock_console_cls):
@@ -134,6 +204,20 @@ class TestRenderStatusLine:
         call_arg = mock_console.print.call_args.args[0]
         assert "abcdefghijkl..." in call_arg.plain
 
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_status_line_is_dim(self, mock_console_cls):
+        """The status line uses the shared pre-parsed dim style."""
+        from coding_agent.ui.renderer import _DIM_STYLE
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.render_status_line("gpt-4", None, None)
+
+        call_arg = mock_console.print.call_args.args[0]
+        assert call_arg.style is _DIM_STYLE
+        assert call_arg.style.dim is True
+
 
 class TestRenderSeparator:
     """Verify separator rendering."""
@@ -189,6 +273,19 @@ class TestRenderConfig:
         assert "Model" in call_args_str
         assert "API" in call_args_str
 
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_config_single_print(self, mock_console_cls):
+        """render_config() renders all items in one console call."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.render_config({"Model": "gpt-4", "API": "http://localhost:4000"})
+
+        mock_console.print.assert_called_once()
+        text = mock_console.print.call_args.args[0]
+        assert text.plain == "Model: gpt-4\nAPI: http://localhost:4000"
+
 
 class TestRenderStreamingLive:
     """Verify render_streaming_live() returns correct display type."""
@@ -246,6 +343,130 @@ class TestStreamingDisplay:
         display = StreamingDisplay(mock_console)
         assert display.full_text == ""
 
+    def test_markdown_built_once_per_refresh(self):
+        """Deltas are joined into Markdown only when the display renders."""
+        from rich.console import Console
+        from coding_agent.ui.renderer import _LazyMarkdown
+        console = Console(file=MagicMock(), width=40)
+        lazy = _LazyMarkdown()
+
+        for delta in ("Hello", " ", "world"):
+            lazy.append(delta)
+        assert lazy._cached is None
+
+        list(lazy.__rich_console__(console, console.options))
+        first = lazy._cached
+        list(lazy.__rich_console__(console, console.options))
+
+        assert first is lazy._cached
+        assert first.markup == "Hello world"
+
+
+class TestLazyMarkdownRefresh:
+    """Verify the producer/refresh handoff in _LazyMarkdown."""
+
+    def test_append_only_marks_dirty(self):
+        """append() records the delta without joining or parsing."""
+        from coding_agent.ui.renderer import _LazyMarkdown
+        lazy = _LazyMarkdown()
+
+        with patch("coding_agent.ui.renderer.Markdown") as mock_md:
+            lazy.append("a")
+            lazy.append("b")
+            mock_md.assert_not_called()
+
+        assert lazy._dirty is True
+        assert lazy._chunks == ["a", "b"]
+
+    def test_concurrent_refreshes_do_not_lose_tokens(self):
+        """Refreshing from another thread while tokens arrive keeps every token."""
+        import io
+        import threading
+        from rich.console import Console
+        from coding_agent.ui.renderer import _LazyMarkdown
+        lazy = _LazyMarkdown()
+        console = Console(file=io.StringIO(), width=40)
+        done = threading.Event()
+
+        def refresher():
+            while not done.is_set():
+                console.print(lazy)
+
+        thread = threading.Thread(target=refresher)
+        thread.start()
+        try:
+            for i in range(2000):
+                lazy.append(f"{i} ")
+        finally:
+            done.set()
+            thread.join()
+
+        assert lazy.text == "".join(f"{i} " for i in range(2000))
+
+
+class TestStableMarkdownBlocks:
+    """Verify completed markdown blocks are parsed once while streaming."""
+
+    def test_split_after_completed_paragraph(self):
+        """A blank line followed by a new complete block marks the boundary."""
+        from coding_agent.ui.renderer import _stable_prefix_end
+        text = "para one\n\npara two\n"
+        assert _stable_prefix_end(text, 0) == text.index("para two")
+
+    def test_no_split_inside_code_fence(self):
+        """Blank lines inside a fenced code block are not boundaries."""
+        from coding_agent.ui.renderer import _stable_prefix_end
+        text = "```py\nx = 1\n\ny = 2\n"
+        assert _stable_prefix_end(text, 0) == 0
+
+    def test_no_split_before_list_item_or_partial_line(self):
+        """List continuations and unfinished lines keep the block open."""
+        from coding_agent.ui.renderer import _stable_prefix_end
+        assert _stable_prefix_end("- a\n\n- b\n", 0) == 0
+        assert _stable_prefix_end("para\n\nnext", 0) == 0
+
+    def test_streamed_render_matches_full_render(self):
+        """Rendering block by block looks the same as one Markdown pass."""
+        import io
+        from rich.console import Console
+        from coding_agent.ui.renderer import _LazyMarkdown
+        doc = "# Title\n\nSome **text**.\n\n```py\nx = 1\n\ny = 2\n```\n\n- a\n\n- b\n\nDone."
+
+        def render(renderable):
+            buf = io.StringIO()
+            Console(file=buf, width=40, color_system=None).print(renderable)
+            return buf.getvalue()
+
+        lazy = _LazyMarkdown()
+        for i, ch in enumerate(doc):
+            lazy.append(ch)
+            if i % 5 == 0:
+                render(lazy)
+
+        assert len(lazy._stable_blocks) >= 2
+        assert render(lazy) == render(Markdown(doc))
+
+    def test_link_reference_defined_later_matches_full_render(self):
+        """A reference definition after its use still resolves in earlier blocks."""
+        import io
+        from rich.console import Console
+        from coding_agent.ui.renderer import _LazyMarkdown
+        doc = "See [foo] here.\n\nMore text.\n\n[foo]: http://example.com\n\nEnd."
+
+        def render(renderable):
+            buf = io.StringIO()
+            Console(file=buf, width=40, color_system=None).print(renderable)
+            return buf.getvalue()
+
+        lazy = _LazyMarkdown()
+        for i, ch in enumerate(doc):
+            lazy.append(ch)
+            if i % 3 == 0:
+                render(lazy)
+
+        assert lazy._stable_blocks == []
+        assert render(lazy) == render(Markdown(doc))
+
 
 class TestPlainStreamingDisplay:
     """Verify PlainStreamingDisplay behavior."""
@@ -279,6 +500,31 @@ class TestPlainStreamingDisplay:
                 pass
             mock_print.assert_not_called()
 
+    def test_updates_are_batched_and_drained_on_exit(self):
+        """Quick successive deltas share one write; the rest is flushed on exit."""
+        display = PlainStreamingDisplay()
+
+        with patch("builtins.print") as mock_print:
+            with display:
+                display.update("first")
+                for word in (" a", " b", " c"):
+                    display.update(word)
+                assert mock_print.call_count == 1
+            written = "".join(c.args[0] for c in mock_print.call_args_list if c.args)
+
+        assert written == "first a b c"
+        mock_print.assert_called_with()
+
+    def test_large_pending_buffer_is_flushed(self):
+        """Crossing the size threshold writes without waiting for the timer."""
+        display = PlainStreamingDisplay()
+
+        with patch("builtins.print") as mock_print:
+            display.update("x")
+            display.update("y" * 5000)
+
+        assert mock_print.call_count == 2
+
     def test_start_thinking_is_noop(self):
         """start_thinking() is a no-op for plain display."""
         display = PlainStreamingDisplay()
@@ -321,6 +567,97 @@ class TestRenderToolPanel:
 
         assert mock_console.print.call_count == 1
 
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_tool_panel_truncates_large_values(self, mock_console_cls):
+        """Large strings are cut at the display width; big containers are summarized."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.render_tool_panel("file_write", {
+            "content": "x" * 1_000_000,
+            "short": "a\r\nb",
+            "items": list(range(1000)),
+        })
+
+        content_line, short_line, items_line = (c.args[0] for c in mock_console.print.call_args_list[1:])
+        assert content_line.endswith("x" * 79 + "…")
+        assert short_line.endswith("a b")
+        assert items_line.endswith("<list len=1000>")
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_tool_panel_skipped_on_non_terminal(self, mock_console_cls, monkeypatch):
+        """render_tool_panel() prints nothing when output is not a terminal."""
+        monkeypatch.delenv("CODING_AGENT_FORCE_RENDER", raising=False)
+        mock_console = MagicMock()
+        mock_console.is_terminal = False
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.render_tool_panel("shell", {"command": "ls"})
+
+        mock_console.print.assert_not_called()
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_tool_panel_forced_on_non_terminal(self, mock_console_cls, monkeypatch):
+        """CODING_AGENT_FORCE_RENDER keeps tool output on non-terminals."""
+        monkeypatch.setenv("CODING_AGENT_FORCE_RENDER", "1")
+        mock_console = MagicMock()
+        mock_console.is_terminal = False
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.render_tool_panel("shell", {"command": "ls"})
+
+        assert mock_console.print.call_count == 2
+
+
+class TestSharedConsole:
+    """Verify renderers share one lazily created Console."""
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_renderers_share_default_console(self, mock_console_cls):
+        """Console is constructed once and reused by later renderers."""
+        first = Renderer()
+        second = Renderer()
+
+        assert first.console is second.console
+        mock_console_cls.assert_called_once_with()
+
+    def test_console_can_be_overridden_per_instance(self):
+        """Assigning renderer.console does not affect other renderers."""
+        first = Renderer()
+        second = Renderer()
+        first.console = MagicMock()
+
+        assert second.console is not first.console
+
+
+class TestTerminalDetection:
+    """Verify is_terminal is probed once per console."""
+
+    def test_is_terminal_probed_once(self):
+        """Repeated streaming starts reuse the first is_terminal answer."""
+        renderer = Renderer()
+        console = MagicMock()
+        probe = PropertyMock(return_value=False)
+        type(console).is_terminal = probe
+        renderer.console = console
+
+        renderer.render_streaming_live()
+        renderer.render_streaming_live()
+
+        assert probe.call_count == 1
+
+    def test_reprobes_when_console_replaced(self):
+        """Assigning a new console re-reads is_terminal."""
+        renderer = Renderer()
+        renderer.console = MagicMock(is_terminal=False)
+        assert isinstance(renderer.render_streaming_live(), PlainStreamingDisplay)
+
+        renderer.console = MagicMock(is_terminal=True)
+        assert not isinstance(renderer.render_streaming_live(), PlainStreamingDisplay)
+
 
 class TestRenderDiffPreview:
     """Verify diff preview rendering."""
@@ -341,6 +678,20 @@ class TestRenderDiffPreview:
         call_arg = mock_console.print.call_args.args[0]
         assert isinstance(call_arg, Syntax)
 
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_diff_preview_reuses_diff_lexer(self, mock_console_cls):
+        """Each preview is highlighted with the same cached diff lexer."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        renderer.render_diff_preview("a\n", "b\n")
+        renderer.render_diff_preview("c\n", "d\n")
+
+        first, second = (c.args[0] for c in mock_console.print.call_args_list)
+        assert first.lexer is second.lexer
+        assert "diff" in first.lexer.aliases
+
     @patch("coding_agent.ui.renderer.Console")
     def test_render_diff_preview_empty_content(self, mock_console_cls):
         """render_diff_preview() handles empty content."""
@@ -352,6 +703,80 @@ class TestRenderDiffPreview:
 
         assert mock_console.print.call_count == 1
 
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_diff_preview_identical_content_skips_diff(self, mock_console_cls):
+        """Identical content prints nothing and never runs difflib."""
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        with patch("coding_agent.ui.renderer.difflib.unified_diff") as mock_diff:
+            renderer.render_diff_preview("same\n" * 5000, "same\n" * 5000)
+
+        mock_diff.assert_not_called()
+        mock_console.print.assert_not_called()
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_diff_preview_reuses_old_content_split(self, mock_console_cls):
+        """Previewing several edits of the same content splits it only once."""
+        from coding_agent.ui.renderer import _split_keepends
+        mock_console_cls.return_value = MagicMock()
+        renderer = Renderer()
+        _split_keepends.cache_clear()
+
+        old_content = "a\nb\nc\n"
+        renderer.render_diff_preview(old_content, "a\nB\nc\n")
+        renderer.render_diff_preview(old_content, "a\nb\nC\n")
+
+        info = _split_keepends.cache_info()
+        assert info.hits == 1
+        assert info.misses == 3
+
+    @patch("coding_agent.ui.renderer.Console")
+    def test_render_diff_preview_truncates_long_diff(self, mock_console_cls):
+        """render_diff_preview() caps output and reports the hidden line count."""
+        from coding_agent.ui.renderer import _MAX_DIFF_LINES
+        mock_console = MagicMock()
+        mock_console_cls.return_value = mock_console
+        renderer = Renderer()
+
+        old_content = "".join(f"old {i}\n" for i in range(100))
+        new_content = "".join(f"new {i}\n" for i in range(100))
+        renderer.render_diff_preview(old_content, new_content)
+
+        syntax = mock_console.print.call_args.args[0]
+        total = 3 + 200  # ---/+++/@@ headers plus every removed and added line
+        assert f"... ({total - _MAX_DIFF_LINES} more lines)" in syntax.code
+
+
+class TestTrimmedUnifiedDiff:
+    """Verify the prefix/suffix-trimmed unified diff helper."""
+
+    def test_matches_difflib_for_localized_edit(self):
+        """A single edit deep in a large file gives the same diff as difflib."""
+        import difflib
+        from coding_agent.ui.renderer import _unified_diff
+        old = tuple(f"line {i}\n" for i in range(5000))
+        new = old[:2500] + ("changed\n", "added\n") + old[2501:]
+
+        expected = list(difflib.unified_diff(old, new, "a/f.py", "b/f.py", n=3))
+        assert list(_unified_diff(old, new, "a/f.py", "b/f.py", n=3)) == expected
+        assert expected[2] == "@@ -2498,7 +2498,8 @@\n"
+
+    def test_matcher_only_sees_changed_region(self):
+        """The SequenceMatcher input excludes the common prefix and suffix."""
+        import difflib
+        from coding_agent.ui.renderer import _unified_diff
+        old = tuple(f"line {i}\n" for i in range(1000))
+        new = old[:500] + ("changed\n",) + old[501:]
+
+        with patch("coding_agent.ui.renderer.difflib.unified_diff", wraps=difflib.unified_diff) as spy:
+            list(_unified_diff(old, new, "a", "b", n=3))
+
+        old_window, new_window = spy.call_args.args[:2]
+        assert len(old_window) == 7
+        assert len(new_window) == 7
+
 
 class TestTimedSpinner:
     """Verify TimedSpinner context manager behaviour."""
@@ -178,3 +178,133 @@ class TestSessionManager:
 
         loaded = session_manager.load(session["id"])
         assert loaded is not None
+
+    def test_list_reuses_parsed_headers_for_unchanged_files(self, session_manager, monkeypatch):
+        """list() only re-parses session files whose mtime or size changed."""
+        first = session_manager.create_session("First", "model", [])
+        session_manager.create_session("Second", "model", [])
+        session_manager.list()
+
+        import coding_agent.state.session as session_module
+
+        parsed = []
+        real_loads = session_module.json_loads
+
+        def counting_loads(data):
+            parsed.append(data)
+            return real_loads(data)
+
+        monkeypatch.setattr(session_module, "json_loads", counting_loads)
+        assert len(session_manager.list()) == 2
+        assert parsed == []
+
+        first["title"] = "Renamed"
+        session_manager.save(first)
+        titles = {s["title"] for s in session_manager.list()}
+        assert titles == {"Renamed", "Second"}
+        assert len(parsed) == 1
+
+    def test_list_drops_deleted_sessions_from_cache(self, session_manager, temp_sessions_dir):
+        """Files removed outside delete() disappear from list() and the cache."""
+        session = session_manager.create_session("Gone", "model", [])
+        assert len(session_manager.list()) == 1
+
+        (temp_sessions_dir / f"{session['id']}.json").unlink()
+        assert session_manager.list() == []
+        assert session_manager._list_cache == {}
+
+    def test_save_writes_header_sidecar(self, session_manager, temp_sessions_dir):
+        """save() writes a small .meta.json next to the session holding only header fields."""
+        session = session_manager.create_session("Sidecar", "model", [{"role": "user", "content": "hi"}])
+
+        meta = json.loads((temp_sessions_dir / f"{session['id']}.meta.json").read_text(encoding="utf-8"))
+        assert meta["title"] == "Sidecar"
+        assert "messages" not in meta
+        assert len(session_manager.list()) == 1
+
+    def test_list_falls_back_to_full_file_without_sidecar(self, session_manager, temp_sessions_dir):
+        """Sessions saved before sidecars existed are still listed from the full file."""
+        session = session_manager.create_session("Old style", "model", [])
+        (temp_sessions_dir / f"{session['id']}.meta.json").unlink()
+
+        sessions = session_manager.list()
+        assert [s["title"] for s in sessions] == ["Old style"]
+
+    def test_delete_removes_sidecar(self, session_manager, temp_sessions_dir):
+        """delete() unlinks both the session file and its sidecar."""
+        session = session_manager.create_session("Both", "model", [])
+        session_manager.delete(session["id"])
+
+        assert list(temp_sessions_dir.iterdir()) == []
+
+    def test_saved_file_round_trips_non_ascii(self, session_manager, temp_sessions_dir):
+        """Session files are UTF-8 JSON and keep non-ASCII text unescaped."""
+        session = session_manager.create_session("Xin chào", "model", [{"role": "user", "content": "héllo"}])
+
+        raw = (temp_sessions_dir / f"{session['id']}.json").read_text(encoding="utf-8")
+        assert "Xin chào" in raw
+        assert json.loads(raw)["messages"] == [{"role": "user", "content": "héllo"}]
+
+    def test_save_counts_only_appended_messages(self, session_manager, monkeypatch):
+        """Repeated saves of a growing history only estimate the new messages."""
+        session = session_manager.create_session("Grow", "model", [{"role": "user", "content": "aaaa"}])
+        session_manager.save(session)
+
+        estimated = []
+        real_estimate = session_manager._estimate_tokens
+
+        def tracking_estimate(messages, model="gpt-4"):
+            estimated.append(len(messages))
+            return real_estimate(messages, model)
+
+        before = session["token_count"]
+        new_message = {"role": "assistant", "content": "bbbbbbbb"}
+        monkeypatch.setattr(session_manager, "_estimate_tokens", tracking_estimate)
+        session["messages"] = session["messages"] + [new_message]
+        session_manager.save(session)
+
+        assert estimated == [1]
+        assert session["token_count"] == before + real_estimate([new_message])
+
+    def test_save_recounts_after_history_rewrite(self, session_manager):
+        """A shortened or rewritten history gets a full recount."""
+        session = session_manager.create_session(
+            "Rewrite", "model",
+            [{"role": "user", "content": "a" * 40}, {"role": "assistant", "content": "b" * 40}],
+        )
+        session["messages"] = [{"role": "user", "content": "summary!"}]
+        session_manager.save(session)
+        assert session["token_count"] == session_manager._estimate_tokens(session["messages"])
+
+    def test_list_ignores_temp_files_and_directories(self, session_manager, temp_sessions_dir):
+        """Leftover .tmp files and directories named *.json are not listed."""
+        session_manager.create_session("Real", "model", [])
+        (temp_sessions_dir / "half-written.tmp").write_text("{", encoding="utf-8")
+        (temp_sessions_dir / "folder.json").mkdir()
+
+        assert [s["title"] for s in session_manager.list()] == ["Real"]
+
+    def test_list_missing_directory_returns_empty(self, session_manager, temp_sessions_dir):
+        """list() returns [] when the sessions directory has been removed."""
+        temp_sessions_dir.rmdir()
+        assert session_manager.list() == []
+
+    def test_cold_list_parses_many_files_in_parallel(self, temp_sessions_dir):
+        """A fresh manager lists a directory of many sessions in the usual order."""
+        writer = SessionManager(sessions_dir=temp_sessions_dir)
+        for i in range(10):
+            writer.create_session(f"Session {i}", "model", [])
+
+        reader = SessionManager(sessions_dir=temp_sessions_dir)
+        titles = [s["title"] for s in reader.list()]
+        assert titles == [f"Session {i}" for i in reversed(range(10))]
+
+    def test_prune_keeps_newest_after_resave(self, temp_sessions_dir):
+        """Re-saving an old session makes it recent enough to survive pruning."""
+        manager = SessionManager(sessions_dir=temp_sessions_dir, session_cap=2)
+        first = manager.create_session("First", "model", [])
+        manager.create_session("Second", "model", [])
+        manager.save(first)
+        manager.create_session("Third", "model", [])
+
+        assert {s["title"] for s in manager.list()} == {"First", "Third"}
@@ -187,3 +187,36 @@ class TestToolbarWithSubAgent:
 
         assert "Context:" in text
         assert "Branch: main" in text
+
+
+class TestToolbarBranch:
+    def test_known_branch_shown_bright(self, mock_conversation, mock_workflow):
+        parts = make_toolbar(mock_conversation, mock_workflow, branch="main")()
+        assert ("fg:ansiwhite", "⎇  main") in parts
+
+    def test_unknown_branch_dimmed(self, mock_conversation, mock_workflow):
+        parts = make_toolbar(mock_conversation, mock_workflow, branch="unknown")()
+        assert ("fg:#888888", "⎇  unknown") in parts
+
+
+class TestToolbarMemoization:
+    def test_unchanged_state_reuses_previous_parts(self, mock_conversation, mock_workflow):
+        toolbar = make_toolbar(mock_conversation, mock_workflow, branch="main")
+        assert toolbar() is toolbar()
+
+    def test_token_change_rebuilds_parts(self, mock_conversation, mock_workflow):
+        toolbar = make_toolbar(mock_conversation, mock_workflow, branch="main", context_limit=10000)
+        first = toolbar()
+        mock_conversation.token_count = 9500
+
+        second = toolbar()
+        assert second is not first
+        assert "95%" in _text(second)
+
+    def test_model_switch_rebuilds_parts(self, mock_conversation, mock_workflow):
+        model = ["openai/gpt-4o"]
+        toolbar = make_toolbar(mock_conversation, mock_workflow, branch="main", get_model=lambda: model[0])
+        assert "◉ gpt-4o" in _text(toolbar())
+
+        model[0] = "anthropic/other"
+        assert "◉ other" in _text(toolbar())
@@ -70,6 +70,67 @@ Skill content here."""
         assert frontmatter["model"] == "litellm/gpt-4o"
         assert frontmatter["argument-hint"] == "[issue-number]"
 
+    def test_nested_block_uses_yaml_quoting_and_comments(self):
+        """Blocks with nested structure follow YAML rules for quotes and comments."""
+        content = (
+            "---\n"
+            "# skill metadata\n"
+            'description: "Fix: the build"\n'
+            "user-invocable: no\n"
+            "hooks:\n  pre: echo start\n"
+            "---\nbody"
+        )
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter == {
+            "description": "Fix: the build",
+            "user-invocable": False,
+            "hooks": {"pre": "echo start"},
+        }
+
+    def test_parses_nested_hooks_and_block_list(self):
+        """Nested mappings and block lists are supported."""
+        content = (
+            "---\n"
+            "allowed-tools:\n  - Read\n  - Grep\n"
+            "hooks:\n  pre: echo start\n"
+            "---\nbody"
+        )
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter["allowed-tools"] == ["Read", "Grep"]
+        assert frontmatter["hooks"] == {"pre": "echo start"}
+
+    def test_scalars_kept_as_written(self):
+        """Numbers, YAML booleans and null in string fields keep their literal text."""
+        content = "---\nname: on\nversion: 1.10\nmodel: null\nagent: no\n---\nbody"
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter == {"name": "on", "version": "1.10", "model": "null", "agent": "no"}
+
+    def test_hash_in_unquoted_value_is_not_a_comment(self):
+        """An unquoted ' #' stays part of the value, as in the line-based format."""
+        content = "---\ndescription: Review PR #123 and fix\nmodel: gpt-4o\n---\nbody"
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter["description"] == "Review PR #123 and fix"
+        assert frontmatter["model"] == "gpt-4o"
+
+    def test_flat_block_keeps_quotes_as_written(self):
+        """Flat blocks are not YAML-unquoted."""
+        content = '---\ndescription: "Fix #1 first"\n---\nbody'
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter["description"] == '"Fix #1 first"'
+
+    def test_flat_value_containing_colon(self):
+        """Unquoted values containing ': ' parse as before."""
+        content = "---\ndescription: Use when: tests fail\nuser-invocable: false\n---\nbody"
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter["description"] == "Use when: tests fail"
+        assert frontmatter["user-invocable"] is False
+
+    def test_invalid_nested_block_falls_back_to_line_parsing(self):
+        """A nested block that is not valid YAML is parsed line by line."""
+        content = "---\ndescription: Use when: tests fail\nhooks:\n  pre: x\n---\nbody"
+        frontmatter, _ = parse_yaml_frontmatter(content)
+        assert frontmatter["description"] == "Use when: tests fail"
+
 
 class TestParseSkills:
     """Tests for parse_skills function."""
@@ -30,6 +30,36 @@ class TestToolResultFields:
         assert r.warnings == []
         assert r.artifacts == []
 
+    def test_uses_slots(self):
+        r = ToolResult(ok=False, error_code=None, message="hi")
+        assert not hasattr(r, "__dict__")
+        assert r.is_error is True
+        assert r.output == "hi"
+
+
+class TestFromLegacy:
+    def test_output_maps_to_data_and_message(self):
+        r = ToolResult.from_legacy(output="file content", is_error=False)
+        assert r.ok is True
+        assert r.data == {"output": "file content"}
+        assert r.message == "file content"
+
+    def test_error_preferred_for_message(self):
+        r = ToolResult.from_legacy(output="", error="boom", is_error=True)
+        assert r.ok is False
+        assert r.message == "boom"
+        assert r.data == {"output": ""}
+
+    def test_explicit_message_and_data_win(self):
+        r = ToolResult.from_legacy(output="x", error="e", message="m", data={"k": 1})
+        assert r.ok is True
+        assert r.message == "m"
+        assert r.data == {"k": 1}
+
+    def test_legacy_kwargs_rejected_by_constructor(self):
+        with pytest.raises(TypeError):
+            ToolResult(output="x", is_error=False)
+
 
 class TestSuccessFactory:
     def test_ok_true(self):
@@ -71,6 +101,13 @@ class TestSuccessFactory:
 
 
 class TestFailureFactory:
+    def test_error_code_interned(self):
+        import sys
+
+        code = "".join(["FILE_", "NOT_FOUND"])
+        r = ToolResult.failure(code, "missing")
+        assert r.error_code is sys.intern("FILE_NOT_FOUND")
+
     def test_ok_false(self):
         r = ToolResult.failure("ERR", "bad")
         assert r.ok is False
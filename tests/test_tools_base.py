@@ -13,14 +13,14 @@ class TestToolResult:
 
     def test_tool_result_fields(self):
         """ToolResult has output, message, is_error fields."""
-        result = ToolResult(output="file content", is_error=False)
+        result = ToolResult.from_legacy(output="file content", is_error=False)
         assert result.output == "file content"
         assert result.message == "file content"
         assert result.is_error is False
 
     def test_tool_result_error_case(self):
         """ToolResult with error sets is_error True."""
-        result = ToolResult(output="", message="File not found", is_error=True)
+        result = ToolResult.from_legacy(output="", message="File not found", is_error=True)
         assert result.is_error is True
         assert result.message == "File not found"
 
@@ -31,7 +31,7 @@ class TestToolDefinition:
     def test_tool_definition_fields(self):
         """ToolDefinition has name, description, parameters, handler."""
         def dummy_handler(params):
-            return ToolResult(output="ok", message="", is_error=False)
+            return ToolResult.from_legacy(output="ok", message="", is_error=False)
 
         tool_def = ToolDefinition(
             name="test_tool",
@@ -57,12 +57,26 @@ class TestToolRegistry:
         tools = get_openai_tools(str(Path.cwd()))
         assert isinstance(tools, list)
 
+    def test_get_openai_tools_builds_once_per_workspace(self, tmp_path):
+        """Repeated calls reuse the cached schemas and re-register the tools."""
+        from unittest.mock import patch
+
+        import coding_agent.tools as tools_module
+
+        with patch.object(tools_module, "build_tools", wraps=tools_module.build_tools) as spy:
+            first = get_openai_tools(str(tmp_path))
+            tool_registry.pop("file_read")
+            second = get_openai_tools(str(tmp_path))
+        assert spy.call_count == 1
+        assert second == first and second is not first
+        assert "file_read" in tool_registry
+
     def test_register_tool_adds_to_registry(self):
         """register_tool adds tool to registry."""
         initial_count = len(tool_registry)
 
         def dummy_handler(params):
-            return ToolResult(output="ok", message="", is_error=False)
+            return ToolResult.from_legacy(output="ok", message="", is_error=False)
 
         tool_def = ToolDefinition(
             name="test_register_tool",
@@ -79,7 +93,7 @@ class TestToolRegistry:
     def test_get_openai_tools_includes_registered(self):
         """Registered tools appear in get_openai_tools output."""
         def dummy_handler(params):
-            return ToolResult(output="ok", message="", is_error=False)
+            return ToolResult.from_legacy(output="ok", message="", is_error=False)
 
         tool_def = ToolDefinition(
             name="test_get_tools",